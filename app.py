@@ -5,6 +5,7 @@ Permite que clientes busquem e visualizem seus boletos através do navegador.
 
 import os
 import sys
+import heapq
 import logging
 from pathlib import Path
 
@@ -24,10 +25,17 @@ except ImportError:
     pass
 
 # Importar módulos do Flask e da aplicação
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for, flash
 import yaml
 from libs.auth import CoraAuth
 from libs.consulta import ConsultaBoletos
+from libs.cache import CacheBoletos, CacheBoletosPersistente
+from libs.agendador import LimitadorTaxa
+from libs.espelho import EspelhoBoletos
+from libs.prazo import TemposLimite, definir_prazo, encerrar_prazo
+from libs.redundancia import RequisicoesRedundantes
+from libs.webhook import ErroWebhook, ProcessadorWebhook, interpretar_evento
+from libs.visualizacao import CacheVisualizacoes
 
 # Configurar logging (será ajustado após carregar configuração)
 logging.basicConfig(
@@ -36,6 +44,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Quantidade de boletos exibidos na busca por CPF/CNPJ
+LIMITE_LISTAGEM = 12
+
 # Variável global para armazenar configuração de debug
 debug_mode = False
 
@@ -80,6 +91,13 @@ app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-producti
 
 # Variáveis globais para armazenar instâncias
 consulta_boletos = None
+processador_webhook = None
+
+# Prazo, em segundos, de cada requisição (tempos_limite.requisicao no config)
+prazo_requisicao = None
+
+# Dados de exibição dos boletos, calculados uma vez por versão do boleto
+visualizacoes = CacheVisualizacoes()
 
 
 def validar_cpf(cpf: str) -> bool:
@@ -203,7 +221,7 @@ def inicializar_consulta():
     """
     Inicializa a instância de consulta de boletos.
     """
-    global consulta_boletos
+    global consulta_boletos, processador_webhook, prazo_requisicao
     
     try:
         # Carregar configuração
@@ -217,7 +235,7 @@ def inicializar_consulta():
         cert_path = config['certificates']['cert_path']
         key_path = config['certificates']['key_path']
         # Obter debug da configuração (pode estar em diferentes locais)
-        debug = config.get('debug', False) or config.get('config', {}).get('debug', False)
+        debug = config.get('debug', False) or (config.get('config') or {}).get('debug', False)
         
         # Configurar logging baseado no debug
         configurar_logging_debug(debug)
@@ -226,22 +244,82 @@ def inicializar_consulta():
             logger.debug(f"Debug mode: {debug}")
             logger.debug(f"Config carregado: {config_path}")
         
+        # Tempos de conexão/leitura das chamadas à API e prazo de cada requisição
+        tempos_config = config.get('tempos_limite') or {}
+        tempos_limite = TemposLimite.de_config(tempos_config)
+        prazo_requisicao = tempos_config.get('requisicao', 20)
+        
         # Inicializar autenticação
         auth = CoraAuth(
             auth_url=auth_url,
             client_id=client_id,
             cert_path=cert_path,
             key_path=key_path,
-            debug=debug
+            debug=debug,
+            tempos_limite=tempos_limite
         )
         
+        # Cache das consultas por ID (boletos pagos/cancelados não expiram)
+        cache_config = config.get('cache') or {}
+        cache = None
+        if cache_config.get('habilitado', True):
+            opcoes_cache = {
+                'tamanho_maximo': cache_config.get('tamanho_maximo', 1024),
+                'ttl_pendente': cache_config.get('ttl_pendente', 30),
+                'ttl_definitivo': cache_config.get('ttl_definitivo'),
+                'max_obsoleto': cache_config.get('max_obsoleto', 86400),
+                'max_bytes': cache_config.get('max_bytes', 32 * 1024 * 1024),
+            }
+            # Com caminho, o cache também é gravado em disco e compartilhado pelos workers
+            if cache_config.get('caminho'):
+                cache = CacheBoletosPersistente(cache_config['caminho'], **opcoes_cache)
+            else:
+                cache = CacheBoletos(**opcoes_cache)
+        
+        # Limite de requisições por segundo da credencial (opcional)
+        taxa = (config.get('agendador') or {}).get('taxa_por_segundo')
+        
+        # Espelho local dos boletos, sincronizado com `cora-boletos --sincronizar` (opcional)
+        caminho_espelho = (config.get('espelho') or {}).get('caminho')
+        
+        # Requisição redundante nas consultas por ID lentas (opcional)
+        redundancia_config = config.get('redundancia') or {}
+        redundancia = None
+        if redundancia_config.get('habilitado', False):
+            redundancia = RequisicoesRedundantes(
+                percentil=redundancia_config.get('percentil', 0.95),
+                taxa_maxima=redundancia_config.get('taxa_maxima', 0.05),
+                atraso_inicial=redundancia_config.get('atraso_inicial', 1.0),
+                max_workers=redundancia_config.get('max_workers', 10),
+            )
+        
         # Inicializar consulta
         consulta_boletos = ConsultaBoletos(
             api_base_url=api_base_url,
             auth=auth,
-            debug=debug
+            debug=debug,
+            cache=cache,
+            limitador=LimitadorTaxa(taxa) if taxa else None,
+            espelho=EspelhoBoletos(
+                caminho_espelho,
+                resumido=(config.get('espelho') or {}).get('resumido', False),
+                idade_maxima=(config.get('espelho') or {}).get('idade_maxima', 3600)
+            ) if caminho_espelho else None,
+            revalidar_em_segundo_plano=cache_config.get('revalidar_em_segundo_plano', True),
+            ttl_negativo=cache_config.get('ttl_negativo', 60),
+            antecipar_detalhes=cache_config.get('antecipar_detalhes', 0) if cache is not None else 0,
+            # Das listagens, apenas o resumo dos boletos fica em memória e no cache
+            resumir_listagem=True,
+            redundancia=redundancia,
+            tempos_limite=tempos_limite,
+            http2=(config.get('transporte') or {}).get('http2', False)
         )
         
+        # Webhook da Cora (habilitado apenas com token configurado)
+        token_webhook = (config.get('webhook') or {}).get('token')
+        if token_webhook:
+            processador_webhook = ProcessadorWebhook(consulta_boletos, token_webhook)
+        
         logger.info("Consulta de boletos inicializada com sucesso")
         
     except Exception as e:
@@ -260,6 +338,25 @@ def before_request():
             inicializar_consulta()
         except Exception as e:
             logger.error(f"Erro ao inicializar aplicação: {str(e)}")
+    
+    # Cada boleto é buscado na API no máximo uma vez por requisição
+    if consulta_boletos is not None:
+        consulta_boletos.iniciar_escopo_requisicao()
+    
+    # Token e chamadas à API feitos nesta requisição respeitam o mesmo prazo
+    g.prazo = definir_prazo(prazo_requisicao)
+
+
+@app.teardown_request
+def teardown_request(exc):
+    """
+    Função executada ao final de cada requisição.
+    """
+    if consulta_boletos is not None:
+        consulta_boletos.encerrar_escopo_requisicao()
+    token_prazo = g.pop('prazo', None)
+    if token_prazo is not None:
+        encerrar_prazo(token_prazo)
 
 
 @app.route('/')
@@ -299,69 +396,32 @@ def buscar():
         return redirect(url_for('index'))
     
     try:
-        # Listar boletos por CPF
-        resultado = consulta_boletos.listar_boletos_por_cpf(cpf)
-        
-        # Processar boletos
-        boletos = resultado.get('data', [])
-        
-        # Processar e formatar boletos (usando apenas dados da lista, sem buscar detalhes)
-        boletos_formatados = []
-        for boleto in boletos:
-            invoice_id = boleto.get('id')
-            if not invoice_id:
-                continue
-            
-            # Extrair dados básicos da lista (sem fazer requisição adicional)
-            status_boleto = boleto.get('status', 'PENDING')
-            esta_pago = status_boleto in ['PAID', 'SETTLED', 'CONFIRMED']
-            
-            # Extrair descrição dos serviços (se disponível na lista)
-            descricao = ""
-            services = boleto.get('services', [])
-            if services:
-                descricoes = []
-                for s in services:
-                    desc = s.get('description', '') or s.get('name', '')
-                    if desc:
-                        descricoes.append(desc)
-                descricao = ' | '.join(descricoes) if descricoes else ''
-            
-            # Extrair nome do cliente (se disponível na lista)
-            nome_cliente = ""
-            customer = boleto.get('customer', {})
-            if customer:
-                nome_cliente = customer.get('name', '')
-            
-            # Extrair data de vencimento (due_date) - pode estar em payment_terms ou diretamente
-            due_date = boleto.get('due_date')
-            if not due_date:
-                payment_terms = boleto.get('payment_terms', {})
-                if payment_terms and isinstance(payment_terms, dict):
-                    due_date = payment_terms.get('due_date')
-            
-            # Extrair data de pagamento (se pago) - campo é 'occurrence_date'
-            data_pagamento = None
-            if esta_pago:
-                data_pagamento = boleto.get('occurrence_date')
-            
-            boleto_formatado = {
-                'id': invoice_id,
-                'code': boleto.get('code'),
-                'status': status_boleto,
-                'esta_pago': esta_pago,
-                'due_date': due_date,
-                'data_pagamento': data_pagamento,
-                'nome_cliente': nome_cliente,
-                'descricao': descricao,
-                'created_at': boleto.get('created_at', '')
-            }
-            
-            boletos_formatados.append(boleto_formatado)
+        # Percorrer todas as páginas mantendo apenas os mais recentes (heap),
+        # sem montar a lista completa de boletos
+        contador = {'total': 0, 'ultima_atualizacao': None}
+        
+        def contar(boletos):
+            for boleto in boletos:
+                contador['total'] += 1
+                # Páginas servidas desatualizadas do cache trazem a data da última atualização
+                ultima_atualizacao = boleto.get('ultima_atualizacao')
+                if ultima_atualizacao and (contador['ultima_atualizacao'] is None or ultima_atualizacao < contador['ultima_atualizacao']):
+                    contador['ultima_atualizacao'] = ultima_atualizacao
+                if boleto.get('id'):
+                    yield boleto
+        
+        mais_recentes = heapq.nlargest(
+            LIMITE_LISTAGEM,
+            contar(consulta_boletos.iterar_boletos_por_cpf(cpf)),
+            key=lambda boleto: boleto.get('created_at') or ''
+        )
+        
+        # Formatar apenas os boletos exibidos (usando apenas dados da lista, sem buscar detalhes)
+        boletos_formatados = [visualizacoes.item_listagem(boleto) for boleto in mais_recentes]
         
-        # Ordenar por data de criação (mais recente primeiro) e limitar a 12
-        boletos_formatados.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        boletos_formatados = boletos_formatados[:12]
+        # O cliente quase sempre abre um dos boletos exibidos: busca os detalhes
+        # em segundo plano (cache.antecipar_detalhes)
+        consulta_boletos.antecipar_detalhes(boleto['id'] for boleto in boletos_formatados)
         
         # Limpar CPF para exibição (adicionar formatação)
         cpf_limpo = cpf.replace('.', '').replace('-', '').replace('/', '').replace(' ', '')
@@ -377,7 +437,8 @@ def buscar():
             'cpf_limpo': cpf_limpo,
             'boletos': boletos_formatados,
             'total': len(boletos_formatados),
-            'total_original': len(resultado.get('data', []))
+            'total_original': contador['total'],
+            'ultima_atualizacao': contador['ultima_atualizacao']
         }
         
         return render_template('listar_boletos.html', dados=dados)
@@ -404,86 +465,10 @@ def visualizar(invoice_id: str):
             return redirect(url_for('index'))
     
     try:
-        # Consultar boleto completo
-        boleto = consulta_boletos.consultar_boleto_por_id(invoice_id)
-        
-        # Verificar status de pagamento
-        status = boleto.get('status', 'UNKNOWN')
-        esta_pago = consulta_boletos.boleto_esta_pago(invoice_id)
-        
-        # Formatar valores monetários
-        if 'amount' in boleto:
-            valor_centavos = boleto['amount']
-            valor_reais = valor_centavos / 100.0
-            boleto['valor_formatado'] = f"R$ {valor_reais:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-        elif 'total_amount' in boleto:
-            valor_centavos = boleto['total_amount']
-            valor_reais = valor_centavos / 100.0
-            boleto['valor_formatado'] = f"R$ {valor_reais:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-        
-        # Extrair descrição dos serviços
-        descricao = ""
-        services = boleto.get('services', [])
-        if services:
-            descricoes = []
-            for s in services:
-                desc = s.get('description', '') or s.get('name', '')
-                if desc:
-                    descricoes.append(desc)
-            descricao = ' | '.join(descricoes) if descricoes else ''
-        
-        # Extrair data de vencimento (due_date) - pode estar em payment_terms ou diretamente
-        due_date = boleto.get('due_date')
-        if not due_date:
-            payment_terms = boleto.get('payment_terms', {})
-            if payment_terms and isinstance(payment_terms, dict):
-                due_date = payment_terms.get('due_date')
-        
-        # Extrair data de pagamento (se pago) - campo é 'occurrence_date'
-        data_pagamento = None
-        if esta_pago:
-            data_pagamento = boleto.get('occurrence_date')
-        
-        # Extrair linha digitável, URL do PDF e PIX EMV (se disponível)
-        linha_digitavel = None
-        url_boleto_pdf = None
-        pix_emv = None
-        
-        # Linha digitável, código de barras e URL do PDF vêm de payment_options.bank_slip
-        payment_options = boleto.get('payment_options', {})
-        barcode = None
-        if payment_options:
-            bank_slip = payment_options.get('bank_slip', {})
-            if bank_slip:
-                linha_digitavel = bank_slip.get('digitable')
-                url_boleto_pdf = bank_slip.get('url')
-                barcode = bank_slip.get('barcode')
-        
-        # PIX vem diretamente do boleto.pix.emv (não de payment_options)
-        pix = boleto.get('pix', {})
-        if pix:
-            pix_emv = pix.get('emv')
-        
-        # Preparar dados para o template
-        dados_boleto = {
-            'id': boleto.get('id'),
-            'code': boleto.get('code'),
-            'status': status,
-            'esta_pago': esta_pago,
-            'amount': boleto.get('amount'),
-            'valor_formatado': boleto.get('valor_formatado', ''),
-            'due_date': due_date,
-            'data_pagamento': data_pagamento,
-            'descricao': descricao,
-            'customer': boleto.get('customer', {}),
-            'payment_forms': boleto.get('payment_forms', []),
-            'linha_digitavel': linha_digitavel,
-            'url_boleto_pdf': url_boleto_pdf,
-            'barcode': barcode,
-            'pix_emv': pix_emv,
-            'created_at': boleto.get('created_at'),
-            'updated_at': boleto.get('updated_at')
-        }
+        # Consultar boleto e montar os dados de exibição (reaproveitados enquanto
+        # o boleto não mudar)
+        boleto = consulta_boletos.consultar_boleto_bruto(invoice_id)
+        dados_boleto = visualizacoes.visualizacao(boleto)
         
         return render_template('visualizar.html', boleto=dados_boleto)
         
@@ -508,11 +493,11 @@ def api_consultar(invoice_id: str):
             return jsonify({'erro': f'Erro ao inicializar sistema: {str(e)}'}), 500
     
     try:
-        boleto = consulta_boletos.consultar_boleto_por_id(invoice_id)
-        esta_pago = consulta_boletos.boleto_esta_pago(invoice_id)
+        # Reenvia o JSON recebido da Cora, acrescentando apenas o campo calculado
+        boleto = consulta_boletos.consultar_boleto_bruto(invoice_id)
+        esta_pago = consulta_boletos.esta_pago(boleto.indice)
         
-        boleto['esta_pago'] = esta_pago
-        return jsonify(boleto), 200
+        return Response(boleto.com_campos(esta_pago=esta_pago), status=200, mimetype='application/json')
         
     except ValueError as e:
         return jsonify({'erro': str(e)}), 404
@@ -533,7 +518,8 @@ def api_listar_boletos(cpf: str):
             return jsonify({'erro': f'Erro ao inicializar sistema: {str(e)}'}), 500
     
     try:
-        resultado = consulta_boletos.listar_boletos_por_cpf(cpf)
+        # Boletos completos, como retornados pela API (o resumo é só para a listagem HTML)
+        resultado = consulta_boletos.listar_boletos_por_cpf(cpf, resumir=False)
         return jsonify(resultado), 200
         
     except ValueError as e:
@@ -543,6 +529,36 @@ def api_listar_boletos(cpf: str):
         return jsonify({'erro': str(e)}), 500
 
 
+@app.route('/webhook/cora', methods=['POST'])
+def webhook_cora():
+    """
+    Recebe eventos de boletos da Cora e atualiza o cache e o espelho local.
+    O token configurado em webhook.token deve vir no header X-Webhook-Token
+    ou no parâmetro token da URL cadastrada na Cora.
+    """
+    if processador_webhook is None:
+        return jsonify({'erro': 'Webhook não configurado'}), 404
+    
+    token = request.headers.get('X-Webhook-Token') or request.args.get('token')
+    if not processador_webhook.autenticar(token):
+        logger.warning(f"Webhook recusado: token inválido (origem: {request.remote_addr})")
+        return jsonify({'erro': 'Token inválido'}), 401
+    
+    try:
+        evento = interpretar_evento(request.headers, request.get_data())
+    except ErroWebhook as e:
+        logger.warning(f"Webhook inválido: {str(e)}")
+        return jsonify({'erro': str(e)}), 400
+    
+    try:
+        processado = processador_webhook.processar(evento)
+    except Exception as e:
+        logger.error(f"Erro ao processar webhook {evento.id}: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+    
+    return jsonify({'recebido': True, 'repetido': not processado}), 200
+
+
 if __name__ == '__main__':
     # Verificação rápida de dependências antes de iniciar
     try:
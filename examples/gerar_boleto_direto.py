@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from libs.auth import CoraAuth
 from libs.gerador import GeradorBoletos, BoletoData
+from libs.fila import FilaEmissao
 
 def criar_dados_boleto() -> List[Dict[str, Any]]:
     """
@@ -125,6 +126,11 @@ def main():
             debug=True
         )
         
+        # Fila de emissão opcional: os boletos são apenas enfileirados e
+        # emitidos depois por `cora-boletos --fila ... --trabalhador`
+        caminho_fila = config.get('fila', {}).get('caminho')
+        fila = FilaEmissao(caminho_fila) if caminho_fila else None
+        
         # Obtém dados dos boletos
         dados_boletos = criar_dados_boleto()
         
@@ -134,6 +140,11 @@ def main():
             print(f"\nProcessando boleto {dados['codigo']} para {dados['nome']}")
             
             try:
+                if fila:
+                    # Cria o payload e grava na fila
+                    print(f"Enfileirado: {gerador.enfileirar_individual(dados, fila)}")
+                    continue
+                
                 # Cria o payload e envia para a API
                 response = gerador.gerar_boleto_individual(dados)
                 print(response)
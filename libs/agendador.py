@@ -0,0 +1,279 @@
+"""
+Módulo responsável por agendar as chamadas à API da Cora por prioridade.
+Emissões interativas (um boleto pedido por um operador) passam à frente das
+emissões em lote, que ocupam a capacidade restante da credencial.
+"""
+
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from .prazo import verificar
+
+
+# Classes de prioridade (menor valor = maior prioridade)
+PRIORIDADES = {
+    'interativa': 0,
+    'lote': 1,
+}
+
+
+class LimitadorTaxa:
+    """
+    Limitador de taxa (token bucket) compartilhado entre as threads que
+    chamam a API, para respeitar o limite de requisições da credencial.
+    """
+
+    def __init__(self, taxa_por_segundo: float, capacidade: Optional[int] = None):
+        """
+        Inicializa o limitador.
+
+        Args:
+            taxa_por_segundo (float): Requisições permitidas por segundo
+            capacidade (int): Rajada máxima (padrão: uma requisição por segundo de taxa)
+        """
+        if taxa_por_segundo <= 0:
+            raise ValueError(f"Taxa deve ser maior que zero: {taxa_por_segundo}")
+        self.taxa_por_segundo = taxa_por_segundo
+        self.capacidade = capacidade or max(1, int(taxa_por_segundo))
+        self._tokens = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa_por_segundo)
+        self._ultimo = agora
+
+    def tentar_adquirir(self) -> bool:
+        """Consome um token se houver um disponível, sem bloquear"""
+        with self._lock:
+            self._reabastecer()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def aguardar(self):
+        """Bloqueia até que um token esteja disponível e o consome"""
+        while True:
+            with self._lock:
+                self._reabastecer()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa_por_segundo
+            time.sleep(espera)
+
+    def devolver(self):
+        """Devolve um token adquirido e não utilizado"""
+        with self._lock:
+            self._tokens = min(self.capacidade, self._tokens + 1)
+
+
+class _MetricasClasse:
+    """Contadores e latências de uma classe de prioridade"""
+
+    def __init__(self, amostras: int):
+        self.submetidas = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.em_fila = 0
+        self.em_execucao = 0
+        self.esperas = deque(maxlen=amostras)
+        self.latencias = deque(maxlen=amostras)
+
+    @staticmethod
+    def _percentil(valores, p: float) -> Optional[float]:
+        if not valores:
+            return None
+        ordenados = sorted(valores)
+        return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            'submetidas': self.submetidas,
+            'concluidas': self.concluidas,
+            'falhas': self.falhas,
+            'em_fila': self.em_fila,
+            'em_execucao': self.em_execucao,
+            'espera_p50': self._percentil(self.esperas, 0.50),
+            'espera_p95': self._percentil(self.esperas, 0.95),
+            'latencia_p50': self._percentil(self.latencias, 0.50),
+            'latencia_p95': self._percentil(self.latencias, 0.95),
+        }
+
+
+def _executar_no_prazo(funcao: Callable, *args, **kwargs) -> Any:
+    """Executa a tarefa se o prazo de quem a submeteu ainda não terminou"""
+    verificar('iniciar a tarefa agendada')
+    return funcao(*args, **kwargs)
+
+
+class AgendadorEmissoes:
+    """
+    Agendador em processo com filas por prioridade e um pool de threads.
+    Cada thread só retira uma tarefa da fila depois de obter um token do
+    limitador, então a próxima vaga de taxa vai sempre para a tarefa de maior
+    prioridade pendente naquele momento.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        limitador: Optional[LimitadorTaxa] = None,
+        limite_fila_lote: Optional[int] = None,
+        amostras_metricas: int = 1000
+    ):
+        """
+        Inicializa o agendador e inicia as threads de trabalho.
+
+        Args:
+            max_workers (int): Quantidade de chamadas simultâneas à API
+            limitador (LimitadorTaxa): Limite de taxa compartilhado (opcional)
+            limite_fila_lote (int): Máximo de tarefas em lote na fila; acima disso
+                submeter() bloqueia o produtor (opcional)
+            amostras_metricas (int): Quantidade de latências guardadas por classe
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers deve ser maior que zero: {max_workers}")
+        self.max_workers = max_workers
+        self.limitador = limitador
+        self.limite_fila_lote = limite_fila_lote
+        self._fila = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._encerrado = False
+        self._metricas = {classe: _MetricasClasse(amostras_metricas) for classe in PRIORIDADES}
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"agendador-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.encerrar()
+
+    def submeter(self, funcao: Callable, *args, classe: str = 'lote', **kwargs) -> Future:
+        """
+        Agenda a execução de uma função.
+
+        Args:
+            funcao: Função a ser executada (ex: GeradorBoletos.gerar_boleto)
+            classe (str): Classe de prioridade ('interativa' ou 'lote')
+            *args, **kwargs: Argumentos da função
+
+        Returns:
+            Future: Resultado da execução. A tarefa roda no contexto de quem a
+                submeteu (incluindo o prazo) e é abandonada com PrazoEsgotado se
+                o prazo terminar antes de ela sair da fila
+        """
+        if classe not in PRIORIDADES:
+            raise ValueError(f"Classe de prioridade inválida: {classe}. Válidas: {list(PRIORIDADES)}")
+
+        futuro = Future()
+        with self._condicao:
+            if self._encerrado:
+                raise RuntimeError("Agendador encerrado")
+            metricas = self._metricas[classe]
+            while (
+                classe == 'lote'
+                and self.limite_fila_lote
+                and metricas.em_fila >= self.limite_fila_lote
+                and not self._encerrado
+            ):
+                self._condicao.wait()
+            heapq.heappush(
+                self._fila,
+                (PRIORIDADES[classe], next(self._sequencia), classe, time.monotonic(), futuro,
+                 contextvars.copy_context(), funcao, args, kwargs)
+            )
+            metricas.submetidas += 1
+            metricas.em_fila += 1
+            self._condicao.notify_all()
+        return futuro
+
+    def _trabalhar(self):
+        """Laço das threads de trabalho"""
+        while True:
+            with self._condicao:
+                while not self._fila and not self._encerrado:
+                    self._condicao.wait()
+                if not self._fila and self._encerrado:
+                    return
+
+            # O token é obtido antes de escolher a tarefa, fora do lock
+            if self.limitador:
+                self.limitador.aguardar()
+
+            with self._condicao:
+                if not self._fila:
+                    if self.limitador:
+                        self.limitador.devolver()
+                    continue
+                _, _, classe, enfileirada_em, futuro, contexto, funcao, args, kwargs = heapq.heappop(self._fila)
+                metricas = self._metricas[classe]
+                metricas.em_fila -= 1
+                metricas.em_execucao += 1
+                self._condicao.notify_all()
+
+            inicio = time.monotonic()
+            sucesso = False
+            if futuro.set_running_or_notify_cancel():
+                try:
+                    futuro.set_result(contexto.run(_executar_no_prazo, funcao, *args, **kwargs))
+                    sucesso = True
+                except BaseException as e:
+                    futuro.set_exception(e)
+            fim = time.monotonic()
+
+            with self._condicao:
+                metricas.em_execucao -= 1
+                metricas.esperas.append(inicio - enfileirada_em)
+                metricas.latencias.append(fim - enfileirada_em)
+                if sucesso:
+                    metricas.concluidas += 1
+                else:
+                    metricas.falhas += 1
+
+    def profundidade_fila(self) -> Dict[str, int]:
+        """Quantidade de tarefas aguardando por classe"""
+        with self._condicao:
+            return {classe: m.em_fila for classe, m in self._metricas.items()}
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Métricas por classe de prioridade.
+
+        Returns:
+            dict: Por classe, contadores (submetidas, concluidas, falhas, em_fila,
+                em_execucao) e percentis em segundos de espera na fila e de latência
+                total (fila + execução) das últimas execuções
+        """
+        with self._condicao:
+            return {classe: m.para_dict() for classe, m in self._metricas.items()}
+
+    def encerrar(self, aguardar: bool = True):
+        """
+        Encerra o agendador após executar as tarefas já submetidas.
+
+        Args:
+            aguardar (bool): Se True, bloqueia até as threads terminarem
+        """
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+        if aguardar:
+            for thread in self._threads:
+                thread.join()
+        logging.debug(f"Agendador encerrado. Métricas: {self.metricas()}")
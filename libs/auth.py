@@ -1,9 +1,12 @@
 import os
 import requests
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
 
+from .prazo import PrazoEsgotado, TemposLimite, restante
+
 class CoraAuth:
     """
     Classe responsável por gerenciar a autenticação com a API da Cora.
@@ -16,7 +19,8 @@ class CoraAuth:
         client_id: str,
         cert_path: str,
         key_path: str,
-        debug: bool = False
+        debug: bool = False,
+        tempos_limite: Optional[TemposLimite] = None
     ):
         """
         Inicializa o gerenciador de autenticação.
@@ -27,14 +31,18 @@ class CoraAuth:
             cert_path (str): Caminho do certificado
             key_path (str): Caminho da chave privada
             debug (bool): Habilita/desabilita logs de debug
+            tempos_limite (TemposLimite): Tempos de conexão e leitura da
+                solicitação de token (padrão: 5s e 15s)
         """
         self.auth_url = auth_url
         self.client_id = client_id
         self.cert_path = os.path.expanduser(cert_path)
         self.key_path = os.path.expanduser(key_path)
         self.debug = debug
+        self.tempos_limite = tempos_limite or TemposLimite(conexao=5.0, leitura=15.0)
         self._access_token = None
         self._token_expiry = None
+        self._token_lock = threading.Lock()
         
         # Validação dos arquivos de certificado
         self._validar_certificados()
@@ -87,7 +95,8 @@ class CoraAuth:
                 self.auth_url,
                 data=payload,
                 cert=(self.cert_path, self.key_path),
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
+                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                timeout=self.tempos_limite.para_requisicao('solicitar o token')
             )
             
             if self.debug:
@@ -117,27 +126,49 @@ class CoraAuth:
         
         Returns:
             str: Token de acesso
+            
+        Raises:
+            PrazoEsgotado: Se o prazo atual terminar enquanto outra thread renova o token
         """
         # Verifica se o token atual é válido
-        if self._access_token and self._token_expiry and datetime.now() < self._token_expiry:
+        if self._token_valido():
             if self.debug:
                 logging.debug("Usando token existente")
                 logging.debug(f"Token expira em: {self._token_expiry}")
             return self._access_token
 
-        # Solicita novo token
-        if self.debug:
-            logging.debug("Token expirado ou não existe, solicitando novo token")
+        # Apenas uma thread renova o token; as demais aguardam (até o prazo) e reutilizam
+        tempo = restante()
+        if not self._token_lock.acquire(timeout=-1 if tempo is None else max(0.0, tempo)):
+            raise PrazoEsgotado("Prazo esgotado aguardando a renovação do token")
+        try:
+            if self._token_valido():
+                return self._access_token
 
-        self._access_token = self._request_new_token()
-        # Define expiração para 50 minutos (token geralmente válido por 1 hora)
-        self._token_expiry = datetime.now() + timedelta(minutes=50)
-        
-        if self.debug:
-            logging.debug(f"Novo token obtido: {self._access_token[:20]}...")
-            logging.debug(f"Token expira em: {self._token_expiry}")
+            # Solicita novo token
+            if self.debug:
+                logging.debug("Token expirado ou não existe, solicitando novo token")
 
-        return self._access_token
+            self._access_token = self._request_new_token()
+            # Define expiração para 50 minutos (token geralmente válido por 1 hora)
+            self._token_expiry = datetime.now() + timedelta(minutes=50)
+            
+            if self.debug:
+                logging.debug(f"Novo token obtido: {self._access_token[:20]}...")
+                logging.debug(f"Token expira em: {self._token_expiry}")
+
+            return self._access_token
+        finally:
+            self._token_lock.release()
+
+    def _token_valido(self) -> bool:
+        """
+        Verifica se existe um token em cache ainda não expirado.
+        
+        Returns:
+            bool: True se o token atual pode ser usado
+        """
+        return bool(self._access_token and self._token_expiry and datetime.now() < self._token_expiry)
     
     def get_auth_headers(self) -> dict:
         """
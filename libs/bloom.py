@@ -0,0 +1,63 @@
+"""
+Módulo responsável pelo filtro de Bloom usado para descartar, sem consultas,
+documentos que certamente não estão no espelho local.
+"""
+
+import hashlib
+import math
+from typing import Iterable
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom: responde "certamente ausente" ou "possivelmente presente".
+    Não há falsos negativos; a taxa de falsos positivos é definida na criação.
+    """
+
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.01):
+        """
+        Inicializa um filtro vazio.
+
+        Args:
+            capacidade (int): Quantidade de itens esperada
+            taxa_falsos_positivos (float): Taxa de falsos positivos com a capacidade cheia
+        """
+        if capacidade < 1:
+            raise ValueError(f"capacidade deve ser maior que zero: {capacidade}")
+        if not 0 < taxa_falsos_positivos < 1:
+            raise ValueError(f"taxa_falsos_positivos deve estar entre 0 e 1: {taxa_falsos_positivos}")
+        self.capacidade = capacidade
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self.tamanho_bits = max(8, int(-capacidade * math.log(taxa_falsos_positivos) / (math.log(2) ** 2)))
+        self.quantidade_hashes = max(1, round(self.tamanho_bits / capacidade * math.log(2)))
+        self._bits = bytearray((self.tamanho_bits + 7) // 8)
+        self.itens = 0
+
+    @classmethod
+    def de_itens(cls, itens: Iterable[str], capacidade: int, taxa_falsos_positivos: float = 0.01) -> 'FiltroBloom':
+        """Cria um filtro com os itens informados"""
+        filtro = cls(capacidade, taxa_falsos_positivos)
+        for item in itens:
+            filtro.adicionar(item)
+        return filtro
+
+    def _posicoes(self, item: str):
+        # Hashing duplo (Kirsch-Mitzenmacher): k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.quantidade_hashes):
+            yield (h1 + i * h2) % self.tamanho_bits
+
+    def adicionar(self, item: str):
+        """Adiciona um item ao filtro"""
+        for posicao in self._posicoes(item):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.itens += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(item))
+
+    def tamanho_bytes(self) -> int:
+        """Memória ocupada pelos bits do filtro"""
+        return len(self._bits)
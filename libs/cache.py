@@ -0,0 +1,558 @@
+"""
+Módulo responsável pelo cache em memória das consultas de boletos.
+O tempo de vida de cada entrada depende do status do boleto: boletos pagos ou
+cancelados não mudam mais e podem ficar em cache indefinidamente, enquanto
+boletos em aberto expiram após uma janela curta e configurável.
+Entradas expiradas continuam disponíveis por mais um tempo (max_obsoleto) para
+serem servidas enquanto a consulta é revalidada ou quando a API está fora.
+CacheBoletosPersistente acrescenta uma segunda camada em disco (SQLite),
+compartilhada pelos processos do servidor e preservada entre reinícios.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .resumo import ResumoBoleto
+
+
+# Status que não mudam mais depois de atingidos
+STATUS_DEFINITIVOS = ('PAID', 'SETTLED', 'CONFIRMED', 'CANCELLED')
+
+
+def _para_json(valor: Any) -> Any:
+    # Resumos são gravados na forma compacta e recriados em _de_json
+    if isinstance(valor, ResumoBoleto):
+        return {'__resumo__': valor.para_lista()}
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _de_json(objeto: Dict[str, Any]) -> Any:
+    if '__resumo__' in objeto and len(objeto) == 1:
+        return ResumoBoleto.de_lista(objeto['__resumo__'])
+    return objeto
+
+
+def _serializar(valor: Any) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'), default=_para_json)
+
+
+def _memoria(objeto: Any) -> int:
+    """Memória aproximada (sys.getsizeof) de um valor JSON decodificado"""
+    tamanho = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamanho += sum(_memoria(chave) + _memoria(valor) for chave, valor in objeto.items())
+    elif isinstance(objeto, list):
+        tamanho += sum(_memoria(valor) for valor in objeto)
+    return tamanho
+
+
+def _tamanho(valor: Any) -> int:
+    if isinstance(valor, BoletoBruto):
+        # Os bytes recebidos e a cópia decodificada ficam ambos em memória
+        return len(valor.conteudo) + (_memoria(valor._dados) if valor._dados is not None else 0)
+    # Bytes em UTF-8, não caracteres: nomes acentuados ocupam mais de um byte
+    return len(_serializar(valor).encode('utf-8'))
+
+
+class BoletoBruto:
+    """
+    Boleto guardado como os bytes JSON recebidos da API, com um índice pequeno
+    (id, status, vencimento e updated_at) e o boleto decodificado uma única vez,
+    na criação. A API da aplicação reenvia os bytes sem reserializá-los; os
+    demais usos recebem uma cópia do boleto decodificado, sem novo json.loads.
+    No limite de bytes do cache contam os bytes e a memória da cópia decodificada.
+    """
+
+    __slots__ = ('conteudo', 'indice', '_dados')
+
+    def __init__(self, conteudo: bytes, indice: Dict[str, Any], dados: Optional[Dict[str, Any]] = None):
+        self.conteudo = conteudo
+        self.indice = indice
+        self._dados = dados
+
+    @staticmethod
+    def _indexar(dados: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': dados.get('id'),
+            'status': dados.get('status'),
+            'due_date': dados.get('due_date') or (dados.get('payment_terms') or {}).get('due_date'),
+            'updated_at': dados.get('updated_at'),
+            # Presente apenas em boletos servidos desatualizados do cache
+            'ultima_atualizacao': dados.get('ultima_atualizacao'),
+        }
+
+    @classmethod
+    def de_conteudo(cls, conteudo: bytes) -> 'BoletoBruto':
+        """
+        Cria a partir do corpo de uma resposta da API.
+
+        Raises:
+            ValueError: Se o conteúdo não for um objeto JSON
+        """
+        dados = json.loads(conteudo)
+        if not isinstance(dados, dict):
+            raise ValueError("Resposta do boleto não é um objeto JSON")
+        return cls(conteudo, cls._indexar(dados), dados)
+
+    @classmethod
+    def de_dados(cls, dados: Dict[str, Any]) -> 'BoletoBruto':
+        """Cria a partir de um boleto já decodificado (ex: webhook)"""
+        return cls(_serializar(dados).encode('utf-8'), cls._indexar(dados), dict(dados))
+
+    def dados(self) -> Dict[str, Any]:
+        """
+        Boleto decodificado, em um novo dicionário a cada chamada (cópia rasa:
+        os objetos aninhados são compartilhados e não devem ser alterados)
+        """
+        if self._dados is None:
+            # Criado sem a cópia decodificada: decodifica sob demanda, sem guardá-la
+            return json.loads(self.conteudo)
+        return dict(self._dados)
+
+    def com_campos(self, **campos: Any) -> bytes:
+        """
+        Corpo JSON do boleto com campos calculados acrescentados ao final do
+        objeto, sem decodificar o restante.
+
+        Returns:
+            bytes: JSON do boleto com os campos informados
+        """
+        corpo = self.conteudo.rstrip()
+        if not campos:
+            return corpo
+        corpo = corpo[:-1].rstrip()
+        extras = _serializar(campos)[1:-1].encode('utf-8')
+        return corpo + (b'' if corpo.endswith(b'{') else b',') + extras + b'}'
+
+
+class _EntradaCache:
+    """Valor armazenado e seus instantes de gravação e expiração"""
+
+    __slots__ = ('valor', 'status', 'armazenado_em', 'expira_em', 'gravado_em', 'tamanho')
+
+    def __init__(
+        self,
+        valor: Any,
+        status: Optional[str],
+        armazenado_em: float,
+        expira_em: float,
+        gravado_em: Optional[float] = None,
+        tamanho: int = 0
+    ):
+        self.valor = valor
+        self.status = status
+        self.armazenado_em = armazenado_em
+        self.expira_em = expira_em
+        # Horário de gravação (relógio de parede), exibido junto de dados desatualizados
+        self.gravado_em = time.time() if gravado_em is None else gravado_em
+        # Bytes do valor serializado (0 se o cache não é limitado por bytes)
+        self.tamanho = tamanho
+
+    def expirada(self, agora: float) -> bool:
+        return self.expira_em <= agora
+
+
+class CacheBoletos:
+    """
+    Cache LRU limitado por quantidade de entradas (e, opcionalmente, pelo
+    tamanho dos valores em bytes), com TTL por status.
+    Seguro para uso por várias threads.
+    """
+
+    def __init__(
+        self,
+        tamanho_maximo: int = 1024,
+        ttl_pendente: float = 30.0,
+        ttl_definitivo: Optional[float] = None,
+        max_obsoleto: float = 86400.0,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            tamanho_maximo (int): Quantidade máxima de entradas (LRU)
+            ttl_pendente (float): Segundos de validade para boletos em aberto
+                (PENDING, LATE, etc.) e para entradas sem status
+            ttl_definitivo (float): Segundos de validade para boletos pagos ou
+                cancelados (padrão: sem expiração)
+            max_obsoleto (float): Segundos em que uma entrada expirada ainda pode
+                ser servida como desatualizada (0 = descartar ao expirar)
+            max_bytes (int): Soma máxima do tamanho dos valores serializados em
+                JSON (padrão: sem limite)
+        """
+        if tamanho_maximo < 1:
+            raise ValueError(f"tamanho_maximo deve ser maior que zero: {tamanho_maximo}")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"max_bytes deve ser maior que zero: {max_bytes}")
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_pendente = ttl_pendente
+        self.ttl_definitivo = ttl_definitivo
+        self.max_obsoleto = max_obsoleto
+        self.max_bytes = max_bytes
+        self._entradas: 'OrderedDict[str, _EntradaCache]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.removidos = 0
+        self.obsoletos = 0
+
+    def ttl_para_status(self, status: Optional[str]) -> Optional[float]:
+        """
+        Tempo de vida de uma entrada conforme o status do boleto.
+
+        Returns:
+            float: Segundos de validade (None = sem expiração)
+        """
+        if status in STATUS_DEFINITIVOS:
+            return self.ttl_definitivo
+        return self.ttl_pendente
+
+    def obter(self, chave: str) -> Optional[Any]:
+        """
+        Obtém um valor válido do cache.
+
+        Args:
+            chave (str): Chave da entrada (ex: ID do boleto)
+
+        Returns:
+            Valor armazenado ou None se ausente/expirado
+        """
+        entrada = self.obter_entrada(chave, aceitar_obsoleta=False)
+        return entrada.valor if entrada is not None else None
+
+    def obter_entrada(self, chave: str, aceitar_obsoleta: bool = True) -> Optional[_EntradaCache]:
+        """
+        Obtém a entrada do cache, inclusive expirada dentro de max_obsoleto.
+
+        Args:
+            chave (str): Chave da entrada
+            aceitar_obsoleta (bool): Se False, entradas expiradas não são retornadas
+
+        Returns:
+            _EntradaCache: Entrada (verifique expirada()) ou None se ausente
+        """
+        agora = time.monotonic()
+        entrada = self._buscar(chave, agora)
+        with self._lock:
+            if entrada is None:
+                self.falhas += 1
+                return None
+            if entrada.expirada(agora):
+                self.expirados += 1
+                self.falhas += 1
+                if not aceitar_obsoleta:
+                    return None
+                self.obsoletos += 1
+                return entrada
+            self.acertos += 1
+            return entrada
+
+    def _buscar(self, chave: str, agora: float) -> Optional[_EntradaCache]:
+        """Entrada em memória, descartando as expiradas além de max_obsoleto"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            if entrada.expirada(agora):
+                if entrada.expira_em + self.max_obsoleto <= agora:
+                    self._remover(chave)
+                    self.expirados += 1
+                    return None
+            else:
+                self._entradas.move_to_end(chave)
+            return entrada
+
+    def armazenar(self, chave: str, valor: Any, status: Optional[str] = None):
+        """
+        Armazena um valor no cache.
+
+        Args:
+            chave (str): Chave da entrada
+            valor: Valor a armazenar
+            status (str): Status do boleto, usado para definir o TTL
+        """
+        ttl = self.ttl_para_status(status)
+        if ttl is not None and ttl <= 0:
+            return
+
+        agora = time.monotonic()
+        expira_em = float('inf') if ttl is None else agora + ttl
+        tamanho = _tamanho(valor) if self.max_bytes is not None else 0
+        self._inserir(chave, _EntradaCache(valor, status, agora, expira_em, tamanho=tamanho))
+
+    def _inserir(self, chave: str, entrada: _EntradaCache):
+        with self._lock:
+            self._remover(chave)
+            self._entradas[chave] = entrada
+            self._bytes += entrada.tamanho
+            while len(self._entradas) > 1 and (
+                len(self._entradas) > self.tamanho_maximo
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remover(next(iter(self._entradas)))
+                self.removidos += 1
+
+    def _remover(self, chave: str):
+        # Chamado com o lock adquirido
+        entrada = self._entradas.pop(chave, None)
+        if entrada is not None:
+            self._bytes -= entrada.tamanho
+
+    def invalidar(self, chave: str):
+        """Remove uma entrada do cache, se existir"""
+        with self._lock:
+            self._remover(chave)
+
+    def invalidar_prefixo(self, prefixo: str):
+        """Remove as entradas cujas chaves começam com prefixo (ex: 'listagem:123:')"""
+        with self._lock:
+            for chave in [chave for chave in self._entradas if chave.startswith(prefixo)]:
+                self._remover(chave)
+
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def __contains__(self, chave: str) -> bool:
+        # Entrada válida, sem contar como acerto ou falha
+        agora = time.monotonic()
+        entrada = self._buscar(chave, agora)
+        return entrada is not None and not entrada.expirada(agora)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do cache.
+
+        Returns:
+            dict: acertos, falhas, taxa_acerto, expirados, obsoletos (servidos
+                desatualizados), removidos (LRU), tamanho e bytes
+        """
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'expirados': self.expirados,
+                'obsoletos': self.obsoletos,
+                'removidos': self.removidos,
+                'tamanho': len(self._entradas),
+                'bytes': self._bytes,
+            }
+
+
+SCHEMA_PERSISTENTE = """
+CREATE TABLE IF NOT EXISTS cache (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL,
+    bruto INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    gravado_em REAL NOT NULL,
+    expira_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_gravado_em ON cache (gravado_em);
+"""
+
+
+class CacheBoletosPersistente(CacheBoletos):
+    """
+    Cache em duas camadas: a memória do processo (L1, limitada por entradas e
+    bytes) na frente de um arquivo SQLite (L2) compartilhado por todos os
+    processos do servidor. Uma falha na L1 é respondida pela L2 antes de
+    chamar a API, então reinícios e novos workers começam com o cache cheio.
+
+    Invalidações (webhook, monitor) removem a entrada das duas camadas do
+    processo que as recebe; nos demais, a cópia em memória vale até o TTL.
+    """
+
+    # Gravações entre limpezas das entradas vencidas do arquivo
+    INTERVALO_LIMPEZA = 500
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_maximo: int = 1024,
+        ttl_pendente: float = 30.0,
+        ttl_definitivo: Optional[float] = None,
+        max_obsoleto: float = 86400.0,
+        max_bytes: Optional[int] = 32 * 1024 * 1024,
+        max_entradas_disco: int = 200000
+    ):
+        """
+        Inicializa o cache, criando o arquivo e a tabela se necessário.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite da L2
+            tamanho_maximo (int): Quantidade máxima de entradas em memória (LRU)
+            ttl_pendente (float): Segundos de validade para boletos em aberto
+            ttl_definitivo (float): Segundos de validade para boletos pagos ou
+                cancelados (padrão: sem expiração)
+            max_obsoleto (float): Segundos em que uma entrada expirada ainda pode
+                ser servida como desatualizada
+            max_bytes (int): Bytes máximos dos valores em memória (padrão: 32 MB)
+            max_entradas_disco (int): Quantidade máxima de entradas no arquivo
+        """
+        super().__init__(tamanho_maximo, ttl_pendente, ttl_definitivo, max_obsoleto, max_bytes)
+        self.caminho = os.path.expanduser(caminho)
+        self.max_entradas_disco = max_entradas_disco
+        self._local = threading.local()
+        self._gravacoes = 0
+        self.acertos_disco = 0
+        self.falhas_disco = 0
+
+        conexao = self._conexao()
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(SCHEMA_PERSISTENTE)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (conexões SQLite não são compartilhadas entre threads)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.execute("PRAGMA busy_timeout=5000")
+            self._local.conexao = conexao
+        return conexao
+
+    def _buscar(self, chave: str, agora: float) -> Optional[_EntradaCache]:
+        entrada = super()._buscar(chave, agora)
+        if entrada is not None and not entrada.expirada(agora):
+            return entrada
+
+        try:
+            do_disco = self._ler_disco(chave, agora)
+        except sqlite3.Error as e:
+            logging.warning(f"Erro ao ler o cache em disco: {str(e)}")
+            return entrada
+
+        # Outro processo pode ter gravado uma versão mais recente
+        if do_disco is not None and (entrada is None or do_disco.gravado_em > entrada.gravado_em):
+            self._inserir(chave, do_disco)
+            return do_disco
+        return entrada
+
+    def _ler_disco(self, chave: str, agora: float) -> Optional[_EntradaCache]:
+        linha = self._conexao().execute(
+            "SELECT valor, bruto, status, gravado_em, expira_em FROM cache WHERE chave = ?", (chave,)
+        ).fetchone()
+        with self._lock:
+            if linha is None:
+                self.falhas_disco += 1
+                return None
+            self.acertos_disco += 1
+
+        serializado, bruto, status, gravado_em, expira_em = linha
+        # O arquivo guarda o relógio de parede; a memória usa o monotônico
+        restante = float('inf') if expira_em is None else expira_em - time.time()
+        if restante + self.max_obsoleto <= 0:
+            return None
+        if bruto:
+            valor = BoletoBruto.de_conteudo(serializado.encode('utf-8'))
+            tamanho = _tamanho(valor)
+        else:
+            valor = json.loads(serializado, object_hook=_de_json)
+            tamanho = len(serializado.encode('utf-8'))
+        return _EntradaCache(
+            valor, status, agora, agora + restante,
+            gravado_em=gravado_em,
+            tamanho=tamanho if self.max_bytes is not None else 0
+        )
+
+    def armazenar(self, chave: str, valor: Any, status: Optional[str] = None):
+        """
+        Armazena um valor na memória e no arquivo.
+
+        Args:
+            chave (str): Chave da entrada
+            valor: Valor a armazenar (serializável em JSON)
+            status (str): Status do boleto, usado para definir o TTL
+        """
+        ttl = self.ttl_para_status(status)
+        if ttl is not None and ttl <= 0:
+            return
+
+        bruto = isinstance(valor, BoletoBruto)
+        serializado = valor.conteudo.decode('utf-8') if bruto else _serializar(valor)
+        agora = time.monotonic()
+        entrada = _EntradaCache(
+            valor, status, agora, float('inf') if ttl is None else agora + ttl,
+            tamanho=(_tamanho(valor) if bruto else len(serializado.encode('utf-8'))) if self.max_bytes is not None else 0
+        )
+        self._inserir(chave, entrada)
+
+        try:
+            conexao = self._conexao()
+            conexao.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, bruto, status, gravado_em, expira_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (chave, serializado, int(bruto), status, entrada.gravado_em, None if ttl is None else entrada.gravado_em + ttl)
+            )
+            with self._lock:
+                self._gravacoes += 1
+                limpar = self._gravacoes % self.INTERVALO_LIMPEZA == 0
+            if limpar:
+                self._limpar_disco(conexao)
+        except sqlite3.Error as e:
+            logging.warning(f"Erro ao gravar o cache em disco: {str(e)}")
+
+    def _limpar_disco(self, conexao: sqlite3.Connection):
+        """Remove as entradas vencidas além de max_obsoleto e as mais antigas além do limite"""
+        conexao.execute(
+            "DELETE FROM cache WHERE expira_em IS NOT NULL AND expira_em + ? < ?",
+            (self.max_obsoleto, time.time())
+        )
+        conexao.execute(
+            "DELETE FROM cache WHERE chave IN ("
+            "SELECT chave FROM cache ORDER BY gravado_em DESC LIMIT -1 OFFSET ?)",
+            (self.max_entradas_disco,)
+        )
+
+    def invalidar(self, chave: str):
+        """Remove uma entrada da memória e do arquivo, se existir"""
+        super().invalidar(chave)
+        try:
+            self._conexao().execute("DELETE FROM cache WHERE chave = ?", (chave,))
+        except sqlite3.Error as e:
+            logging.warning(f"Erro ao remover do cache em disco: {str(e)}")
+
+    def invalidar_prefixo(self, prefixo: str):
+        """Remove da memória e do arquivo as entradas cujas chaves começam com prefixo"""
+        super().invalidar_prefixo(prefixo)
+        try:
+            self._conexao().execute("DELETE FROM cache WHERE substr(chave, 1, ?) = ?", (len(prefixo), prefixo))
+        except sqlite3.Error as e:
+            logging.warning(f"Erro ao remover do cache em disco: {str(e)}")
+
+    def limpar(self):
+        """Remove todas as entradas da memória e do arquivo"""
+        super().limpar()
+        self._conexao().execute("DELETE FROM cache")
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do cache.
+
+        Returns:
+            dict: Contadores da memória (ver CacheBoletos.estatisticas), mais
+                acertos_disco e falhas_disco das consultas ao arquivo
+        """
+        estatisticas = super().estatisticas()
+        with self._lock:
+            estatisticas['acertos_disco'] = self.acertos_disco
+            estatisticas['falhas_disco'] = self.falhas_disco
+        return estatisticas
@@ -5,10 +5,17 @@ Interface de linha de comando para o sistema de boletos Cora.
 
 import argparse
 import sys
+import time
 import yaml
 from pathlib import Path
 from .auth import CoraAuth
 from .gerador import GeradorBoletos
+from .agendador import AgendadorEmissoes
+from .fila import FilaEmissao, TrabalhadorFila
+from .consulta import ConsultaBoletos
+from .espelho import EspelhoBoletos
+from .monitor import MonitorPagamentos
+from .prazo import TemposLimite
 
 
 def main():
@@ -19,8 +26,15 @@ def main():
         epilog="""
 Exemplos de uso:
   cora-boletos --config config.yaml --excel clientes.xlsx
+  cora-boletos --config config.yaml --excel clientes.xlsx --validar
+  cora-boletos --config config.yaml --excel clientes.xlsx --falhas falhas.jsonl --workers 4
+  cora-boletos --config config.yaml --reprocessar falhas.jsonl --workers 4
   cora-boletos --config config.yaml --individual '{"nome": "João", "valor": 100}'
   cora-boletos --config config.yaml --test
+  cora-boletos --config config.yaml --excel clientes.xlsx --fila emissoes.db
+  cora-boletos --config config.yaml --fila emissoes.db --trabalhador --workers 4
+  cora-boletos --config config.yaml --espelho boletos.db --sincronizar completo
+  cora-boletos --config config.yaml --espelho boletos.db --monitorar
         """
     )
     
@@ -40,6 +54,57 @@ Exemplos de uso:
         help="Dados JSON para um boleto individual"
     )
     
+    parser.add_argument(
+        "--validar",
+        action="store_true",
+        help="Apenas validar o arquivo Excel, sem gerar boletos (dry-run)"
+    )
+    
+    parser.add_argument(
+        "--falhas",
+        help="Arquivo .jsonl onde gravar as linhas do Excel que falharem"
+    )
+    
+    parser.add_argument(
+        "--reprocessar", "-r",
+        help="Reenviar as linhas de um arquivo de falhas (.jsonl)"
+    )
+    
+    parser.add_argument(
+        "--fila", "-f",
+        help="Fila de emissão (SQLite): com --excel/--individual apenas enfileira os boletos"
+    )
+    
+    parser.add_argument(
+        "--trabalhador",
+        action="store_true",
+        help="Drenar a fila informada em --fila, emitindo os boletos"
+    )
+    
+    parser.add_argument(
+        "--espelho",
+        help="Espelho local dos boletos (SQLite) (padrão: espelho.caminho do config)"
+    )
+    
+    parser.add_argument(
+        "--sincronizar",
+        choices=["completo", "incremental"],
+        help="Sincronizar o espelho local com a listagem da API"
+    )
+    
+    parser.add_argument(
+        "--monitorar",
+        action="store_true",
+        help="Monitorar o pagamento dos boletos em aberto do espelho (instalações sem webhook)"
+    )
+    
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Emissões simultâneas (padrão: 1)"
+    )
+    
     parser.add_argument(
         "--test", "-t",
         action="store_true",
@@ -68,16 +133,23 @@ Exemplos de uso:
             auth_url=config['api']['auth_url'],
             client_id=config['credentials']['client_id'],
             cert_path=config['certificates']['cert_path'],
-            key_path=config['certificates']['key_path']
+            key_path=config['certificates']['key_path'],
+            tempos_limite=TemposLimite.de_config(config.get('tempos_limite'))
         )
         
         # Criar gerador
+        agendador = AgendadorEmissoes(max_workers=args.workers) if args.workers > 1 else None
         gerador = GeradorBoletos(
             api_url=config['api']['base_url'],
             auth=auth,
-            debug=args.verbose
+            debug=args.verbose,
+            agendador=agendador,
+            tempos_limite=TemposLimite.de_config(config.get('tempos_limite')),
+            http2=(config.get('transporte') or {}).get('http2', False)
         )
         
+        fila = FilaEmissao(args.fila) if args.fila else None
+        
         # Executar ação solicitada
         if args.test:
             print("🧪 Testando conectividade...")
@@ -85,9 +157,87 @@ Exemplos de uso:
             print(f"✅ Token obtido: {token[:20]}...")
             print("✅ Conectividade OK!")
             
+        elif args.sincronizar or args.monitorar:
+            caminho_espelho = args.espelho or (config.get('espelho') or {}).get('caminho')
+            if not caminho_espelho:
+                print("❌ Informe o espelho com --espelho ou espelho.caminho no config")
+                sys.exit(1)
+            espelho = EspelhoBoletos(caminho_espelho, resumido=(config.get('espelho') or {}).get('resumido', False))
+            consulta = ConsultaBoletos(
+                config['api']['base_url'], auth, debug=args.verbose, espelho=espelho,
+                tempos_limite=TemposLimite.de_config(config.get('tempos_limite')),
+                http2=(config.get('transporte') or {}).get('http2', False)
+            )
+            
+            if args.sincronizar:
+                print(f"🔄 Sincronizando espelho ({args.sincronizar}): {caminho_espelho}")
+                if args.sincronizar == 'completo':
+                    gravados = espelho.sincronizar_completo(consulta)
+                else:
+                    gravados = espelho.sincronizar_incremental(consulta)
+                print(f"✅ Boletos gravados: {gravados} (total no espelho: {espelho.total()})")
+            
+            if args.monitorar:
+                monitor = MonitorPagamentos(consulta, max_workers=max(1, args.workers))
+                print(f"👀 Monitorando {monitor.carregar_boletos(espelho.listar_em_aberto())} boletos em aberto")
+                monitor.iniciar()
+                try:
+                    while True:
+                        # Boletos novos no espelho passam a ser monitorados
+                        time.sleep(900)
+                        monitor.carregar_boletos(espelho.listar_em_aberto())
+                except KeyboardInterrupt:
+                    monitor.parar()
+                print(f"📊 Monitor: {monitor.estatisticas()}")
+            
+        elif args.trabalhador:
+            if not fila:
+                print("❌ Informe a fila com --fila")
+                sys.exit(1)
+            print(f"⚙️  Drenando fila: {args.fila}")
+            trabalhador = TrabalhadorFila(fila, gerador)
+            try:
+                trabalhador.executar()
+            except KeyboardInterrupt:
+                trabalhador.parar()
+            print(f"📊 Fila: {fila.contagem()}")
+            
+        elif args.excel and fila:
+            print(f"📥 Enfileirando arquivo Excel: {args.excel}")
+            resultado = gerador.enfileirar_arquivo(args.excel, fila)
+            print(f"✅ Boletos enfileirados: {resultado['enfileirados']}")
+            print(f"❌ Erros: {resultado['erros']}")
+            
+        elif args.individual and fila:
+            import json
+            dados = json.loads(args.individual)
+            chave = gerador.enfileirar_individual(dados, fila)
+            print(f"📥 Boleto enfileirado: {chave}")
+            
+        elif args.excel and args.validar:
+            print(f"🔎 Validando arquivo Excel: {args.excel}")
+            relatorio = gerador.validar_arquivo(args.excel)
+            print(relatorio.resumo())
+            if relatorio.valido:
+                print("✅ Nenhum erro encontrado")
+            else:
+                print(f"❌ Linhas com erro: {len(relatorio.linhas_invalidas)}")
+                sys.exit(1)
+            
         elif args.excel:
             print(f"📊 Processando arquivo Excel: {args.excel}")
-            resultados = gerador.gerar_boletos_em_lote(args.excel)
+            resultados = gerador.processar_arquivo(
+                args.excel, arquivo_falhas=args.falhas,
+                prazo=(config.get('tempos_limite') or {}).get('lote')
+            )
+            print(f"✅ Boletos gerados: {len(resultados['sucessos'])}")
+            print(f"❌ Erros: {len(resultados['erros'])}")
+            if args.falhas and resultados['erros']:
+                print(f"📝 Linhas com erro gravadas em: {args.falhas}")
+            
+        elif args.reprocessar:
+            print(f"🔁 Reprocessando falhas: {args.reprocessar}")
+            resultados = gerador.reprocessar_falhas(args.reprocessar)
             print(f"✅ Boletos gerados: {len(resultados['sucessos'])}")
             print(f"❌ Erros: {len(resultados['erros'])}")
             
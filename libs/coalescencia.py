@@ -0,0 +1,102 @@
+"""
+Módulo responsável pela coalescência de consultas idênticas simultâneas.
+Quando várias threads pedem a mesma chave ao mesmo tempo (ex: um link de boleto
+compartilhado ou um e-mail de cobrança disparado), apenas a primeira faz a
+chamada à API; as demais aguardam e recebem o mesmo resultado ou a mesma exceção.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from .prazo import PrazoEsgotado, restante
+
+
+class _ChamadaEmAndamento:
+    """Chamada em execução e o resultado compartilhado com quem aguarda"""
+
+    __slots__ = ('concluida', 'resultado', 'erro')
+
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class ChamadasUnicas:
+    """
+    Garante no máximo uma chamada em andamento por chave (single-flight).
+    Seguro para uso por várias threads. Nada é guardado após a conclusão:
+    o reaproveitamento entre chamadas sequenciais fica a cargo do CacheBoletos.
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, _ChamadaEmAndamento] = {}
+        self._lock = threading.Lock()
+        self.chamadas = 0
+        self.executadas = 0
+        self.coalescidas = 0
+
+    def executar(self, chave: Hashable, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa funcao(*args, **kwargs), ou aguarda a execução já em andamento
+        para a mesma chave.
+
+        Args:
+            chave: Identificação da consulta (ex: ('boleto', invoice_id))
+            funcao: Função que faz a chamada à API
+
+        Returns:
+            Resultado da função, compartilhado entre as threads coalescidas
+
+        Raises:
+            Exception: A mesma exceção levantada pela chamada em andamento
+            PrazoEsgotado: Se o prazo atual terminar enquanto aguarda a chamada
+                de outra thread
+        """
+        with self._lock:
+            self.chamadas += 1
+            chamada = self._em_andamento.get(chave)
+            if chamada is None:
+                chamada = _ChamadaEmAndamento()
+                self._em_andamento[chave] = chamada
+                lider = True
+                self.executadas += 1
+            else:
+                lider = False
+                self.coalescidas += 1
+
+        if not lider:
+            tempo = restante()
+            if not chamada.concluida.wait(None if tempo is None else max(0.0, tempo)):
+                raise PrazoEsgotado(f"Prazo esgotado aguardando a consulta em andamento: {chave}")
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao(*args, **kwargs)
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            chamada.concluida.set()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores da coalescência.
+
+        Returns:
+            dict: chamadas recebidas, executadas na API, coalescidas,
+                taxa_coalescencia e em_andamento
+        """
+        with self._lock:
+            return {
+                'chamadas': self.chamadas,
+                'executadas': self.executadas,
+                'coalescidas': self.coalescidas,
+                'taxa_coalescencia': self.coalescidas / self.chamadas if self.chamadas else 0.0,
+                'em_andamento': len(self._em_andamento),
+            }
@@ -3,10 +3,35 @@ Módulo responsável por consultar boletos na API do Cora.
 Implementa funcionalidades para buscar e visualizar boletos existentes.
 """
 
+import itertools
 import logging
+import math
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple
+from .agendador import LimitadorTaxa
 from .auth import CoraAuth
+from .cache import BoletoBruto, CacheBoletos
+from .coalescencia import ChamadasUnicas
+from .espelho import EspelhoBoletos
+from .leitor_json import LeitorListagem
+from .prazo import TemposLimite
+from .redundancia import RequisicoesRedundantes
+from .resumo import ResumoBoleto
+from .transporte import criar_sessao
+
+
+# Status pagos podem ser: 'PAID', 'SETTLED', etc.
+STATUS_PAGOS = ('PAID', 'SETTLED', 'CONFIRMED')
+
+# Campos de metadados da listagem que informam o total de páginas ou de itens
+CAMPOS_TOTAL_PAGINAS = ('totalPages', 'total_pages', 'pages')
+CAMPOS_TOTAL_ITENS = ('totalItems', 'total_items', 'totalElements', 'total', 'count')
 
 
 class ConsultaBoletos:
@@ -19,7 +44,18 @@ class ConsultaBoletos:
         self,
         api_base_url: str,
         auth: CoraAuth,
-        debug: bool = False
+        debug: bool = False,
+        cache: Optional[CacheBoletos] = None,
+        limitador: Optional[LimitadorTaxa] = None,
+        pool_maxsize: int = 10,
+        espelho: Optional[EspelhoBoletos] = None,
+        revalidar_em_segundo_plano: bool = True,
+        ttl_negativo: float = 60.0,
+        antecipar_detalhes: int = 0,
+        resumir_listagem: bool = False,
+        redundancia: Optional[RequisicoesRedundantes] = None,
+        tempos_limite: Optional[TemposLimite] = None,
+        http2: bool = False
     ):
         """
         Inicializa o consultor de boletos.
@@ -28,6 +64,26 @@ class ConsultaBoletos:
             api_base_url (str): URL base da API (ex: https://matls-clients.api.cora.com.br/v2/invoices)
             auth (CoraAuth): Instância de autenticação
             debug (bool): Habilita/desabilita logs de debug
+            cache (CacheBoletos): Cache das consultas por ID (opcional)
+            limitador (LimitadorTaxa): Limite de requisições por segundo,
+                compartilhado com outros usuários da credencial (opcional)
+            pool_maxsize (int): Conexões mantidas abertas com a API
+            espelho (EspelhoBoletos): Espelho local consultado antes da API nas
+                buscas por CPF/CNPJ (opcional)
+            revalidar_em_segundo_plano (bool): Responder entradas expiradas do
+                cache na hora e atualizá-las em segundo plano
+            ttl_negativo (float): Segundos em que um CPF/CNPJ sem boletos é
+                respondido sem nova consulta à API (0 = desabilitado)
+            antecipar_detalhes (int): Boletos de uma listagem cujos detalhes são
+                buscados em segundo plano por antecipar_detalhes() (0 = desabilitado)
+            resumir_listagem (bool): Guardar os boletos das listagens como
+                ResumoBoleto (apenas os campos exibidos, sem dicionários aninhados)
+            redundancia (RequisicoesRedundantes): Dispara uma segunda consulta
+                por ID quando a primeira demora além do percentil observado (opcional)
+            tempos_limite (TemposLimite): Tempos de conexão e leitura das
+                consultas (padrão: 5s e 30s), reduzidos ao prazo da requisição
+            http2 (bool): Multiplexar as consultas em conexões HTTP/2, se o
+                pacote httpx[http2] estiver instalado
         """
         # Normalizar a URL base - remover /invoices do final se presente
         self.api_base_url = api_base_url.rstrip('/')
@@ -43,6 +99,26 @@ class ConsultaBoletos:
         
         self.auth = auth
         self.debug = debug
+        self.cache = cache
+        self.limitador = limitador
+        self.espelho = espelho
+        self.revalidar_em_segundo_plano = revalidar_em_segundo_plano
+        self._revalidando = set()
+        self._lock_revalidacao = threading.Lock()
+        self._executor_revalidacao: Optional[ThreadPoolExecutor] = None
+        self.limite_antecipacao = antecipar_detalhes
+        self.resumir_listagem = resumir_listagem
+        self.redundancia = redundancia
+        self.tempos_limite = tempos_limite or TemposLimite()
+        self._antecipando = set()
+        self._executor_antecipacao: Optional[ThreadPoolExecutor] = None
+        self._cache_negativo = (
+            CacheBoletos(tamanho_maximo=10000, ttl_pendente=ttl_negativo, max_obsoleto=0)
+            if ttl_negativo > 0 else None
+        )
+        self.session = criar_sessao(pool_maxsize=pool_maxsize, http2=http2)
+        self._escopo = threading.local()
+        self._chamadas = ChamadasUnicas()
         
         if debug:
             logging.debug(f"ConsultaBoletos inicializado")
@@ -65,8 +141,204 @@ class ConsultaBoletos:
         if not invoice_id or not invoice_id.strip():
             raise ValueError("ID do boleto não pode ser vazio")
         
-        invoice_id = invoice_id.strip()
+        boleto = self._consultar_boleto(invoice_id.strip())
+        # Cópia: quem consulta pode acrescentar campos ao dicionário
+        return boleto.dados() if isinstance(boleto, BoletoBruto) else dict(boleto)
+    
+    def _consultar_boleto(self, invoice_id: str) -> Any:
+        """
+        Consulta um boleto no cache ou na API. Dentro de um escopo de requisição
+        (ver iniciar_escopo_requisicao), o valor obtido é memoizado e as demais
+        consultas do mesmo boleto, por ID ou brutas, não chamam a API.
+        
+        Args:
+            invoice_id (str): ID do boleto, já sem espaços
+            
+        Returns:
+            BoletoBruto | dict: Valor do cache (dicionário com 'ultima_atualizacao'
+                quando servido desatualizado); não deve ser alterado
+        """
+        memo = getattr(self._escopo, 'boletos', None)
+        if memo is not None and invoice_id in memo:
+            return memo[invoice_id]
+        
+        boleto = self._obter(invoice_id, lambda: self._requisitar_boleto_redundante(invoice_id))
+        if memo is not None:
+            memo[invoice_id] = boleto
+        return boleto
+    
+    def consultar_boleto_bruto(self, invoice_id: str) -> BoletoBruto:
+        """
+        Consulta um boleto pelo ID mantendo o JSON recebido da API, para
+        reenviá-lo sem decodificar e reserializar (ver BoletoBruto.com_campos).
+        
+        Args:
+            invoice_id (str): ID do boleto (invoice) a ser consultado
+            
+        Returns:
+            BoletoBruto: Bytes do boleto e índice com id, status e vencimento
+            
+        Raises:
+            requests.exceptions.RequestException: Em caso de erro na requisição
+            ValueError: Se o invoice_id for inválido ou o boleto não existir
+        """
+        if not invoice_id or not invoice_id.strip():
+            raise ValueError("ID do boleto não pode ser vazio")
+        
+        boleto = self._consultar_boleto(invoice_id.strip())
+        # Dados desatualizados (com 'ultima_atualizacao') já vêm decodificados
+        return boleto if isinstance(boleto, BoletoBruto) else BoletoBruto.de_dados(boleto)
+    
+    @staticmethod
+    def _status_do_valor(valor) -> Optional[str]:
+        """Status de um valor do cache (BoletoBruto ou dicionário)"""
+        if isinstance(valor, BoletoBruto):
+            return valor.indice.get('status')
+        return valor.get('status')
+    
+    def _obter(
+        self,
+        chave: str,
+        buscar: Callable[[], Dict[str, Any]],
+        status_de: Optional[Callable[[Any], Optional[str]]] = None
+    ) -> Any:
+        """
+        Obtém um valor do cache ou da API (stale-while-revalidate).
+        
+        Entradas válidas são respondidas do cache. Entradas expiradas são
+        respondidas na hora, marcadas com 'ultima_atualizacao', enquanto uma
+        única atualização roda em segundo plano. Sem cache, a busca na API é
+        coalescida; se ela falhar e houver uma entrada expirada, esta é servida.
         
+        Args:
+            chave (str): Chave do cache e da coalescência
+            buscar: Função que busca o valor na API
+            status_de: Função que extrai o status do valor (define o TTL)
+            
+        Returns:
+            Valor compartilhado (não deve ser alterado): BoletoBruto ou dict
+        """
+        status_de = status_de or self._status_do_valor
+        entrada = self.cache.obter_entrada(chave) if self.cache is not None else None
+        if entrada is not None and not entrada.expirada(time.monotonic()):
+            if self.debug:
+                logging.debug(f"{chave} obtido do cache")
+            return entrada.valor
+        
+        if entrada is not None and self.revalidar_em_segundo_plano:
+            self._revalidar(chave, buscar, status_de)
+            return self._desatualizado(entrada)
+        
+        try:
+            # Consultas simultâneas à mesma chave compartilham uma única requisição
+            return self._chamadas.executar(chave, self._buscar_e_armazenar, chave, buscar, status_de)
+        except requests.exceptions.RequestException as e:
+            if entrada is None:
+                raise
+            logging.warning(f"API indisponível, servindo {chave} desatualizado: {str(e)}")
+            return self._desatualizado(entrada)
+    
+    def _buscar_e_armazenar(self, chave: str, buscar, status_de) -> Any:
+        valor = buscar()
+        if self.cache is not None:
+            self.cache.armazenar(chave, valor, status=status_de(valor))
+        return valor
+    
+    def _revalidar(self, chave: str, buscar, status_de):
+        """Atualiza uma entrada expirada em segundo plano (uma atualização por chave)"""
+        with self._lock_revalidacao:
+            if chave in self._revalidando:
+                return
+            self._revalidando.add(chave)
+            if self._executor_revalidacao is None:
+                self._executor_revalidacao = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cora-revalidacao')
+        
+        def revalidar():
+            try:
+                self._chamadas.executar(chave, self._buscar_e_armazenar, chave, buscar, status_de)
+            except Exception as e:
+                logging.warning(f"Erro ao revalidar {chave} em segundo plano: {str(e)}")
+            finally:
+                with self._lock_revalidacao:
+                    self._revalidando.discard(chave)
+        
+        self._executor_revalidacao.submit(revalidar)
+    
+    def antecipar_detalhes(self, invoice_ids: Iterable[str]) -> int:
+        """
+        Busca em segundo plano os detalhes dos primeiros boletos de uma
+        listagem (até antecipar_detalhes), para que a consulta por ID feita
+        em seguida seja respondida pelo cache. Boletos já em cache ou já em
+        antecipação são ignorados; requer cache.
+        
+        Args:
+            invoice_ids: IDs dos boletos, na ordem em que foram exibidos
+            
+        Returns:
+            int: Quantidade de boletos agendados
+        """
+        if self.cache is None or self.limite_antecipacao <= 0:
+            return 0
+        
+        agendados = 0
+        for invoice_id in itertools.islice(invoice_ids, self.limite_antecipacao):
+            invoice_id = (invoice_id or '').strip()
+            if not invoice_id or invoice_id in self.cache:
+                continue
+            with self._lock_revalidacao:
+                # Fila limitada: com a API lenta, novas antecipações são descartadas
+                if invoice_id in self._antecipando or len(self._antecipando) >= self.limite_antecipacao * 4:
+                    continue
+                self._antecipando.add(invoice_id)
+                if self._executor_antecipacao is None:
+                    self._executor_antecipacao = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cora-antecipacao')
+            self._executor_antecipacao.submit(self._antecipar, invoice_id)
+            agendados += 1
+        return agendados
+    
+    def _antecipar(self, invoice_id: str):
+        try:
+            # Coalescida: um clique durante a antecipação aguarda a mesma requisição
+            self._chamadas.executar(
+                invoice_id, self._buscar_e_armazenar,
+                invoice_id, lambda: self._requisitar_boleto(invoice_id), self._status_do_valor
+            )
+        except Exception as e:
+            logging.debug(f"Erro ao antecipar detalhes do boleto {invoice_id}: {str(e)}")
+        finally:
+            with self._lock_revalidacao:
+                self._antecipando.discard(invoice_id)
+    
+    @staticmethod
+    def _desatualizado(entrada) -> Dict[str, Any]:
+        """
+        Cópia do valor em cache com o horário da última atualização
+        (nas listagens, também em cada boleto da página).
+        """
+        ultima_atualizacao = datetime.fromtimestamp(entrada.gravado_em).isoformat(timespec='seconds')
+        valor = entrada.valor.dados() if isinstance(entrada.valor, BoletoBruto) else entrada.valor
+        valor = {**valor, 'ultima_atualizacao': ultima_atualizacao}
+        if isinstance(valor.get('data'), list):
+            valor['data'] = [{**boleto, 'ultima_atualizacao': ultima_atualizacao} for boleto in valor['data']]
+        return valor
+    
+    def _requisitar_boleto_redundante(self, invoice_id: str) -> BoletoBruto:
+        """Busca um boleto na API com requisição redundante, se configurada"""
+        if self.redundancia is None:
+            return self._requisitar_boleto(invoice_id)
+        return self.redundancia.executar(self._requisitar_boleto, invoice_id)
+    
+    def _requisitar_boleto(self, invoice_id: str) -> BoletoBruto:
+        """
+        Busca um boleto na API.
+        
+        Args:
+            invoice_id (str): ID do boleto, já sem espaços
+            
+        Returns:
+            BoletoBruto: Corpo da resposta da API e seu índice (compartilhado
+                entre as consultas coalescidas)
+        """
         # URL do endpoint de consulta
         url = f"{self.api_base_url}/v2/invoices/{invoice_id}"
         
@@ -100,12 +372,14 @@ class ConsultaBoletos:
                         logging.debug(f"  {key}: {value}")
             
             # Faz a requisição GET
-            response = requests.get(
+            if self.limitador is not None:
+                self.limitador.aguardar()
+            response = self.session.get(
                 url,
                 headers=headers,
                 cert=(cert_path, key_path),
                 verify=True,
-                timeout=30
+                timeout=self.tempos_limite.para_requisicao('consultar o boleto')
             )
             
             # Log da resposta
@@ -115,11 +389,11 @@ class ConsultaBoletos:
             
             # Verifica o status da resposta
             if response.status_code == 200:
-                boleto_data = response.json()
+                boleto = BoletoBruto.de_conteudo(response.content)
                 if self.debug:
                     logging.debug("Boleto encontrado com sucesso")
-                    logging.debug(f"Dados do boleto: {boleto_data}")
-                return boleto_data
+                    logging.debug(f"Dados do boleto: {response.content.decode('utf-8', 'replace')}")
+                return boleto
             elif response.status_code == 404:
                 error_msg = f"Boleto não encontrado: {invoice_id}"
                 logging.warning(error_msg)
@@ -138,7 +412,7 @@ class ConsultaBoletos:
                 if response.text:
                     logging.error(f"Resposta do servidor: {response.text}")
                 response.raise_for_status()
-                return {}
+                return BoletoBruto.de_dados({})
                 
         except requests.exceptions.Timeout:
             error_msg = "Timeout ao consultar boleto"
@@ -153,6 +427,127 @@ class ConsultaBoletos:
             logging.error(error_msg)
             raise
     
+    def iniciar_escopo_requisicao(self):
+        """
+        Inicia a memoização das consultas por ID na thread atual: até
+        encerrar_escopo_requisicao(), o mesmo boleto é buscado uma única vez.
+        """
+        self._escopo.boletos = {}
+    
+    def encerrar_escopo_requisicao(self):
+        """Descarta os boletos memoizados na thread atual"""
+        self._escopo.boletos = None
+    
+    @contextmanager
+    def escopo_requisicao(self):
+        """Memoiza as consultas por ID durante o bloco `with`"""
+        self.iniciar_escopo_requisicao()
+        try:
+            yield self
+        finally:
+            self.encerrar_escopo_requisicao()
+    
+    @staticmethod
+    def esta_pago(boleto: Dict[str, Any]) -> bool:
+        """
+        Verifica se um boleto já consultado está pago, sem nova requisição.
+        
+        Args:
+            boleto (dict): Dados do boleto retornados pela API
+            
+        Returns:
+            bool: True se o status do boleto indicar pagamento
+        """
+        return boleto.get('status') in STATUS_PAGOS
+    
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """
+        Contadores do cache de consultas.
+        
+        Returns:
+            dict: Estatísticas do cache (vazio se o cache estiver desabilitado),
+                com as do cache de CPFs/CNPJs sem boletos em 'sem_boletos'
+        """
+        estatisticas = self.cache.estatisticas() if self.cache is not None else {}
+        if self._cache_negativo is not None:
+            estatisticas['sem_boletos'] = self._cache_negativo.estatisticas()
+        return estatisticas
+    
+    def estatisticas_coalescencia(self) -> Dict[str, Any]:
+        """
+        Contadores da coalescência de consultas simultâneas.
+        
+        Returns:
+            dict: Chamadas recebidas, executadas na API e coalescidas
+        """
+        return self._chamadas.estatisticas()
+    
+    def obter_status_em_lote(
+        self,
+        invoice_ids: Iterable[str],
+        max_workers: int = 8,
+        usar_cache: bool = True
+    ) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+        """
+        Obtém o status de vários boletos em paralelo, para conciliações.
+        
+        Boletos em cache são respondidos sem requisição; os demais são
+        consultados por max_workers threads, respeitando o limitador de taxa.
+        Com usar_cache=False, todos são consultados na API; o cache é
+        atualizado apenas com as respostas obtidas, e uma consulta que falha
+        mantém a entrada existente.
+        Os IDs são consumidos sob demanda, então iteráveis grandes não são
+        carregados de uma vez.
+        
+        Args:
+            invoice_ids: IDs dos boletos
+            max_workers (int): Consultas simultâneas (não deve passar de pool_maxsize)
+            usar_cache (bool): Responder com as entradas válidas do cache
+            
+        Yields:
+            tuple: (invoice_id, status, erro) na ordem de conclusão; status é None
+                e erro traz a exceção quando a consulta falha
+        """
+        def consultar(invoice_id):
+            # Conciliações precisam do status atual: entradas expiradas não são servidas
+            try:
+                if not invoice_id or not invoice_id.strip():
+                    raise ValueError("ID do boleto não pode ser vazio")
+                invoice_id = invoice_id.strip()
+                boleto = self._chamadas.executar(
+                    invoice_id, self._buscar_e_armazenar,
+                    invoice_id, lambda: self._requisitar_boleto(invoice_id), self._status_do_valor
+                )
+                return invoice_id, self._status_do_valor(boleto), None
+            except Exception as e:
+                return invoice_id, None, e
+        
+        ids = iter(invoice_ids)
+        fim = object()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cora-status')
+        pendentes = set()
+        try:
+            while True:
+                # Mantém no máximo duas consultas por thread em andamento
+                while len(pendentes) < max_workers * 2:
+                    invoice_id = next(ids, fim)
+                    if invoice_id is fim:
+                        break
+                    boleto_cache = self.cache.obter(invoice_id) if usar_cache and self.cache is not None else None
+                    if boleto_cache is not None:
+                        yield invoice_id, self._status_do_valor(boleto_cache), None
+                        continue
+                    pendentes.add(executor.submit(consultar, invoice_id))
+                if not pendentes:
+                    break
+                concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    yield futuro.result()
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+            executor.shutdown(wait=False)
+    
     def obter_status_pagamento(self, invoice_id: str) -> Optional[str]:
         """
         Obtém o status de pagamento de um boleto.
@@ -181,21 +576,35 @@ class ConsultaBoletos:
             bool: True se o boleto estiver pago, False caso contrário
         """
         status = self.obter_status_pagamento(invoice_id)
-        # Status pagos podem ser: 'PAID', 'SETTLED', etc.
-        status_pagos = ['PAID', 'SETTLED', 'CONFIRMED']
-        return status in status_pagos if status else False
+        return status in STATUS_PAGOS if status else False
     
-    def _extrair_boletos_da_resposta(self, resposta: Dict[str, Any]) -> tuple:
+    def _extrair_boletos_da_resposta(self, resposta: Dict[str, Any], resumir: bool = False) -> tuple:
         """
         Extrai lista de boletos da resposta da API.
         A API pode retornar em diferentes formatos.
         
         Args:
             resposta: Resposta JSON da API
+            resumir (bool): Converter os boletos em ResumoBoleto (com resumir_listagem)
             
         Returns:
-            tuple: (lista_de_boletos, metadados)
+            tuple: (lista_de_boletos, metadados), com os boletos convertidos
+                por _converter_boleto
         """
+        boletos, metadados = self._separar_boletos(resposta)
+        if isinstance(boletos, list):
+            boletos = [self._converter_boleto(boleto, resumir) for boleto in boletos]
+        return boletos, metadados
+    
+    def _converter_boleto(self, boleto: Any, resumir: bool = False) -> Any:
+        """Boleto da listagem como será guardado (ResumoBoleto ou o próprio boleto)"""
+        if resumir and self.resumir_listagem and isinstance(boleto, dict) and boleto.get('id'):
+            return ResumoBoleto.de_boleto(boleto)
+        return boleto
+    
+    @staticmethod
+    def _separar_boletos(resposta: Dict[str, Any]) -> tuple:
+        """Lista de boletos e metadados, conforme o formato da resposta"""
         # Se for uma lista direta
         if isinstance(resposta, list):
             return resposta, {}
@@ -219,14 +628,70 @@ class ConsultaBoletos:
         
         return [], {}
     
-    def listar_boletos_por_cpf(self, cpf: str, page: int = 1, per_page: int = 50) -> Dict[str, Any]:
+    @staticmethod
+    def _normalizar_documento(cpf: str) -> str:
+        """
+        Remove a formatação de um CPF/CNPJ e valida o tamanho.
+        
+        Raises:
+            ValueError: Se o CPF/CNPJ for inválido
+        """
+        if not cpf or not cpf.strip():
+            raise ValueError("CPF/CNPJ não pode ser vazio")
+        
+        # Remove formatação do CPF/CNPJ
+        cpf_limpo = cpf.strip().replace('.', '').replace('-', '').replace('/', '').replace(' ', '')
+        
+        # Validação básica
+        if len(cpf_limpo) not in [11, 14]:
+            raise ValueError(f"CPF/CNPJ inválido: deve ter 11 dígitos (CPF) ou 14 dígitos (CNPJ)")
+        
+        if not cpf_limpo.isdigit():
+            raise ValueError("CPF/CNPJ deve conter apenas números")
+        
+        return cpf_limpo
+    
+    def _sem_boletos(self, cpf_limpo: str) -> bool:
+        """
+        Indica, sem chamar a API, que o documento não tem boletos: ausência
+        recente (cache negativo) ou documento fora do espelho completo.
+        """
+        if self._cache_negativo is not None and self._cache_negativo.obter(cpf_limpo) is not None:
+            return True
+        if self.espelho is None:
+            return False
+        try:
+            return not self.espelho.pode_possuir_documento(cpf_limpo)
+        except Exception as e:
+            logging.warning(f"Erro ao consultar espelho local, usando a API: {str(e)}")
+            return False
+    
+    def _espelho_possui(self, cpf_limpo: str) -> bool:
+        """
+        Indica se a busca pelo documento pode ser respondida pelo espelho local
+        (sincronizado há no máximo espelho.idade_maxima segundos)
+        """
+        if self.espelho is None:
+            return False
+        try:
+            return self.espelho.atualizado() and self.espelho.possui_documento(cpf_limpo)
+        except Exception as e:
+            logging.warning(f"Erro ao consultar espelho local, usando a API: {str(e)}")
+            return False
+    
+    def listar_boletos_por_cpf(self, cpf: str, page: int = 1, per_page: int = 50, resumir: bool = True) -> Dict[str, Any]:
         """
         Lista boletos associados a um CPF/CNPJ.
+        Com espelho local configurado e sincronizado recentemente, documentos
+        presentes nele são respondidos sem chamar a API.
         
         Args:
             cpf (str): CPF ou CNPJ do cliente (com ou sem formatação)
             page (int): Número da página (padrão: 1)
             per_page (int): Itens por página (padrão: 50)
+            resumir (bool): Com resumir_listagem, devolver os boletos como
+                ResumoBoleto; False devolve os boletos completos da API (ex:
+                /api/boletos), em cache separado e sem usar um espelho resumido
             
         Returns:
             dict: Resposta da API com lista de boletos
@@ -235,31 +700,99 @@ class ConsultaBoletos:
             requests.exceptions.RequestException: Em caso de erro na requisição
             ValueError: Se o CPF for inválido
         """
-        if not cpf or not cpf.strip():
-            raise ValueError("CPF/CNPJ não pode ser vazio")
+        cpf_limpo = self._normalizar_documento(cpf)
         
-        # Remove formatação do CPF/CNPJ
-        cpf_limpo = cpf.strip().replace('.', '').replace('-', '').replace('/', '').replace(' ', '')
+        if self._sem_boletos(cpf_limpo):
+            if self.debug:
+                logging.debug(f"CPF/CNPJ {cpf_limpo} sem boletos (cache negativo ou espelho)")
+            raise ValueError(f"Nenhum boleto encontrado para o CPF/CNPJ: {cpf_limpo}")
         
-        # Validação básica
-        if len(cpf_limpo) not in [11, 14]:
-            raise ValueError(f"CPF/CNPJ inválido: deve ter 11 dígitos (CPF) ou 14 dígitos (CNPJ)")
+        if self._espelho_possui(cpf_limpo) and (resumir or not self.espelho.resumido):
+            if self.debug:
+                logging.debug(f"Boletos do CPF/CNPJ {cpf_limpo} obtidos do espelho local")
+            return {
+                'data': self.espelho.listar_por_documento(cpf_limpo, limite=per_page, deslocamento=(page - 1) * per_page),
+                'totalItems': self.espelho.contar_por_documento(cpf_limpo)
+            }
         
-        if not cpf_limpo.isdigit():
-            raise ValueError("CPF/CNPJ deve conter apenas números")
+        try:
+            return self._listar({'search': cpf_limpo, 'page': page, 'perPage': per_page}, usar_cache=True, resumir=resumir)
+        except ValueError:
+            # 404 na primeira página: o documento não tem boletos
+            if page == 1 and self._cache_negativo is not None:
+                self._cache_negativo.armazenar(cpf_limpo, True)
+            raise
+    
+    def listar_boletos(self, page: int = 1, per_page: int = 50, **filtros) -> Dict[str, Any]:
+        """
+        Lista todos os boletos da conta, sempre na API (usado na sincronização do espelho).
+        
+        Args:
+            page (int): Número da página (padrão: 1)
+            per_page (int): Itens por página (padrão: 50)
+            **filtros: Parâmetros adicionais da listagem (ex: state, start, end)
+            
+        Returns:
+            dict: Resposta da API com lista de boletos
+        """
+        return self._listar({**filtros, 'page': page, 'perPage': per_page})
+    
+    def _listar(self, params: Dict[str, Any], usar_cache: bool = False, resumir: bool = False) -> Dict[str, Any]:
+        """
+        Listagem na API; listagens simultâneas idênticas compartilham uma única requisição.
+        Com usar_cache, a página é guardada no cache (TTL de boletos em aberto).
+        Páginas resumidas e completas ficam em chaves diferentes.
+        """
+        resumir = resumir and self.resumir_listagem
+        # Documento no início da chave, para invalidar_listagens
+        chave = self._prefixo_listagem(resumir, params.get('search', '')) + '&'.join(
+            f"{k}={v}" for k, v in sorted(params.items()) if k != 'search'
+        )
+        if usar_cache:
+            resposta = self._obter(chave, lambda: self._requisitar_listagem(params, resumir), status_de=lambda valor: None)
+        else:
+            resposta = self._chamadas.executar(chave, self._requisitar_listagem, params, resumir)
+        return dict(resposta)
+    
+    @staticmethod
+    def _prefixo_listagem(resumir: bool, documento: str = '') -> str:
+        return ('listagem:' if resumir else 'listagem-completa:') + (f"{documento}:" if documento else '')
+    
+    def invalidar_listagens(self, documento: Optional[str] = None):
+        """
+        Remove do cache as listagens de um CPF/CNPJ (resumidas e completas),
+        para que a próxima busca mostre o status atual dos boletos.
+        
+        Args:
+            documento (str): CPF ou CNPJ, só dígitos (None = todas as listagens)
+        """
+        if self._cache_negativo is not None:
+            if documento:
+                self._cache_negativo.invalidar(documento)
+            else:
+                self._cache_negativo.limpar()
+        if self.cache is None:
+            return
+        for resumir in (True, False):
+            self.cache.invalidar_prefixo(self._prefixo_listagem(resumir, documento or ''))
+    
+    def _requisitar_listagem(self, params: Dict[str, Any], resumir: bool = False) -> Dict[str, Any]:
+        """
+        Busca uma página da listagem de boletos na API.
         
+        Args:
+            params (dict): Parâmetros da listagem (search, page, perPage, filtros)
+            resumir (bool): Guardar os boletos como ResumoBoleto
+            
+        Returns:
+            dict: Resposta normalizada (compartilhada entre as consultas
+                coalescidas; não deve ser alterada)
+        """
         # URL do endpoint de listagem
         url = f"{self.api_base_url}/v2/invoices"
         
-        # Parâmetros da requisição
-        params = {
-            'search': cpf_limpo,
-            'page': page,
-            'perPage': per_page
-        }
-        
         if self.debug:
-            logging.debug(f"Listando boletos para CPF/CNPJ: {cpf_limpo}")
+            logging.debug(f"Listando boletos: {params}")
             logging.debug(f"URL: {url}")
             logging.debug(f"Params: {params}")
         
@@ -289,13 +822,16 @@ class ConsultaBoletos:
                         logging.debug(f"  {key}: {value}")
             
             # Faz a requisição GET
-            response = requests.get(
+            if self.limitador is not None:
+                self.limitador.aguardar()
+            response = self.session.get(
                 url,
                 headers=headers,
                 params=params,
                 cert=(cert_path, key_path),
                 verify=True,
-                timeout=30
+                timeout=self.tempos_limite.para_requisicao('listar os boletos'),
+                stream=True
             )
             
             # Log da resposta
@@ -303,49 +839,47 @@ class ConsultaBoletos:
                 logging.debug(f"Status code: {response.status_code}")
                 logging.debug(f"Headers da resposta: {dict(response.headers)}")
             
-            # Verifica o status da resposta
-            if response.status_code == 200:
-                boletos_data = response.json()
-                
-                if self.debug:
-                    import json
-                    logging.debug("Boletos encontrados com sucesso")
-                    logging.debug(f"Estrutura da resposta: {type(boletos_data)}")
-                    logging.debug(f"Resposta completa (JSON): {json.dumps(boletos_data, indent=2, ensure_ascii=False)[:1000]}")
-                
-                # Extrair lista de boletos usando método auxiliar
-                boletos_lista, metadados = self._extrair_boletos_da_resposta(boletos_data)
-                
-                if self.debug:
-                    logging.debug(f"Boletos extraídos: {len(boletos_lista)} itens")
-                    logging.debug(f"Metadados: {metadados}")
-                
-                # Normalizar resposta para formato padrão
-                resposta_normalizada = {
-                    'data': boletos_lista,
-                    **metadados
-                }
-                
-                return resposta_normalizada
-            elif response.status_code == 404:
-                error_msg = f"Nenhum boleto encontrado para o CPF/CNPJ: {cpf_limpo}"
-                logging.warning(error_msg)
-                raise ValueError(error_msg)
-            elif response.status_code == 401:
-                error_msg = "Token de autenticação inválido ou expirado"
-                logging.error(error_msg)
-                raise requests.exceptions.HTTPError(error_msg, response=response)
-            elif response.status_code == 403:
-                error_msg = "Sem permissão para consultar boletos"
-                logging.error(error_msg)
-                raise requests.exceptions.HTTPError(error_msg, response=response)
-            else:
-                error_msg = f"Erro ao listar boletos: {response.status_code} {response.reason}"
-                logging.error(error_msg)
-                if response.text:
-                    logging.error(f"Resposta do servidor: {response.text}")
-                response.raise_for_status()
-                return {}
+            # Corpo lido em blocos (stream=True): a conexão volta ao pool ao fechar
+            try:
+                # Verifica o status da resposta
+                if response.status_code == 200:
+                    boletos_lista, metadados = self._ler_listagem(response, resumir)
+                    
+                    if self.debug:
+                        logging.debug(f"Boletos extraídos: {len(boletos_lista)} itens")
+                        logging.debug(f"Metadados: {metadados}")
+                    
+                    # Normalizar resposta para formato padrão
+                    resposta_normalizada = {
+                        'data': boletos_lista,
+                        **metadados
+                    }
+                    
+                    return resposta_normalizada
+                elif response.status_code == 404:
+                    if params.get('search'):
+                        error_msg = f"Nenhum boleto encontrado para o CPF/CNPJ: {params['search']}"
+                    else:
+                        error_msg = "Nenhum boleto encontrado"
+                    logging.warning(error_msg)
+                    raise ValueError(error_msg)
+                elif response.status_code == 401:
+                    error_msg = "Token de autenticação inválido ou expirado"
+                    logging.error(error_msg)
+                    raise requests.exceptions.HTTPError(error_msg, response=response)
+                elif response.status_code == 403:
+                    error_msg = "Sem permissão para consultar boletos"
+                    logging.error(error_msg)
+                    raise requests.exceptions.HTTPError(error_msg, response=response)
+                else:
+                    error_msg = f"Erro ao listar boletos: {response.status_code} {response.reason}"
+                    logging.error(error_msg)
+                    if response.text:
+                        logging.error(f"Resposta do servidor: {response.text}")
+                    response.raise_for_status()
+                    return {}
+            finally:
+                response.close()
                 
         except requests.exceptions.Timeout:
             error_msg = "Timeout ao listar boletos"
@@ -359,3 +893,178 @@ class ConsultaBoletos:
             error_msg = f"Erro ao listar boletos: {str(e)}"
             logging.error(error_msg)
             raise
+    
+    def _ler_listagem(self, response, resumir: bool = False) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Lê o corpo de uma listagem incrementalmente: cada boleto é decodificado
+        (e resumido, se for o caso) assim que chega, sem montar a resposta
+        completa em memória.
+        
+        Returns:
+            tuple: (lista_de_boletos, metadados)
+            
+        Raises:
+            requests.exceptions.InvalidJSONError: Se o corpo não for um JSON válido
+        """
+        leitor = LeitorListagem(response.iter_content(chunk_size=64 * 1024))
+        try:
+            boletos = [self._converter_boleto(boleto, resumir) for boleto in leitor.itens()]
+        except ValueError as e:
+            # Não é um "nenhum boleto encontrado" (ValueError): é uma falha da API
+            raise requests.exceptions.InvalidJSONError(f"Listagem com JSON inválido: {str(e)}", response=response)
+        
+        if self.debug:
+            logging.debug("Boletos encontrados com sucesso")
+            logging.debug(f"Início da resposta (JSON): {leitor.inicio}")
+        
+        if leitor.chave_lista is None:
+            # Formato sem lista reconhecida: interpreta o objeto inteiro
+            return self._extrair_boletos_da_resposta(leitor.metadados, resumir)
+        if leitor.chave_lista == 'data':
+            return boletos, leitor.metadados.get('meta', {})
+        return boletos, leitor.metadados
+    
+    def iterar_boletos_por_cpf(
+        self,
+        cpf: str,
+        per_page: int = 50,
+        paginas_antecipadas: int = 2
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre todos os boletos de um CPF/CNPJ, página a página.
+        
+        A primeira página é buscada sozinha. Se os metadados informarem o total,
+        as páginas seguintes são buscadas em paralelo, até paginas_antecipadas
+        à frente da página consumida; caso contrário, a busca segue em sequência
+        até uma página incompleta. Interromper a iteração cancela as páginas
+        ainda não iniciadas. Documentos presentes no espelho local são lidos dele.
+        
+        Args:
+            cpf (str): CPF ou CNPJ do cliente (com ou sem formatação)
+            per_page (int): Itens por página (padrão: 50)
+            paginas_antecipadas (int): Páginas buscadas antecipadamente (padrão: 2)
+            
+        Yields:
+            dict: Cada boleto, na ordem das páginas
+            
+        Raises:
+            requests.exceptions.RequestException: Em caso de erro na requisição
+            ValueError: Se o CPF for inválido ou não houver boletos
+        """
+        cpf_limpo = self._normalizar_documento(cpf)
+        if self._espelho_possui(cpf_limpo):
+            yield from self.espelho.listar_por_documento(cpf_limpo)
+            return
+        
+        yield from self._iterar_paginas(
+            lambda page: self.listar_boletos_por_cpf(cpf_limpo, page=page, per_page=per_page),
+            per_page,
+            paginas_antecipadas
+        )
+    
+    def iterar_boletos(self, per_page: int = 100, paginas_antecipadas: int = 2, **filtros) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre todos os boletos da conta na API, página a página
+        (mesma estratégia de iterar_boletos_por_cpf).
+        
+        Args:
+            per_page (int): Itens por página (padrão: 100)
+            paginas_antecipadas (int): Páginas buscadas antecipadamente (padrão: 2)
+            **filtros: Parâmetros adicionais da listagem
+            
+        Yields:
+            dict: Cada boleto, na ordem das páginas
+        """
+        yield from self._iterar_paginas(
+            lambda page: self.listar_boletos(page=page, per_page=per_page, **filtros),
+            per_page,
+            paginas_antecipadas
+        )
+    
+    def _iterar_paginas(
+        self,
+        listar: Callable[[int], Dict[str, Any]],
+        per_page: int,
+        paginas_antecipadas: int
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre as páginas retornadas por listar(page), buscando as seguintes
+        em paralelo quando o total de páginas é conhecido.
+        """
+        primeira = listar(1)
+        boletos = primeira.get('data', [])
+        total_paginas = self._total_paginas(primeira, per_page)
+        
+        if total_paginas is None:
+            yield from boletos
+            pagina = 1
+            while len(boletos) >= per_page:
+                pagina += 1
+                boletos = self._listar_pagina(listar, pagina)
+                yield from boletos
+            return
+        
+        if self.debug:
+            logging.debug(f"Listagem com {total_paginas} página(s) de até {per_page} boletos")
+        
+        if total_paginas <= 1:
+            yield from boletos
+            return
+        
+        janela = max(1, paginas_antecipadas)
+        executor = ThreadPoolExecutor(max_workers=janela, thread_name_prefix='cora-paginas')
+        pendentes = deque()
+        proxima = 2
+        try:
+            while True:
+                while proxima <= total_paginas and len(pendentes) < janela:
+                    pendentes.append(executor.submit(self._listar_pagina, listar, proxima))
+                    proxima += 1
+                yield from boletos
+                if not pendentes:
+                    break
+                boletos = pendentes.popleft().result()
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _listar_pagina(listar: Callable[[int], Dict[str, Any]], page: int) -> List[Dict[str, Any]]:
+        """
+        Boletos de uma página seguinte à primeira (lista vazia se a página não existir).
+        """
+        try:
+            return listar(page).get('data', [])
+        except ValueError:
+            # 404 em uma página além da última
+            return []
+    
+    @staticmethod
+    def _total_paginas(resposta: Dict[str, Any], per_page: int) -> Optional[int]:
+        """
+        Total de páginas informado nos metadados da listagem.
+        
+        Args:
+            resposta (dict): Resposta normalizada de listar_boletos_por_cpf
+            per_page (int): Itens por página usados na consulta
+            
+        Returns:
+            int: Total de páginas ou None se os metadados não o informarem
+        """
+        metadados = dict(resposta)
+        for aninhado in ('meta', 'pagination'):
+            if isinstance(resposta.get(aninhado), dict):
+                metadados.update(resposta[aninhado])
+        
+        for campo in CAMPOS_TOTAL_PAGINAS:
+            try:
+                return int(metadados[campo])
+            except (KeyError, TypeError, ValueError):
+                continue
+        for campo in CAMPOS_TOTAL_ITENS:
+            try:
+                return math.ceil(int(metadados[campo]) / per_page)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
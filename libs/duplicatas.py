@@ -0,0 +1,181 @@
+"""
+Módulo responsável por detectar boletos duplicados antes da emissão.
+Constrói um índice hash sobre chaves normalizadas de cada linha da planilha,
+evitando chamadas à API (e cancelamentos manuais) para registros repetidos.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+
+# Chave de conteúdo: (documento, valor em centavos, data de vencimento)
+ChaveConteudo = Tuple[str, int, str]
+
+
+@dataclass
+class Duplicata:
+    """Representa uma linha identificada como duplicada"""
+    linha: int
+    motivo: str
+    chave: Any
+    linha_original: Optional[int] = None
+
+    @property
+    def ja_emitido(self) -> bool:
+        """Indica se a duplicata é de um boleto já emitido anteriormente"""
+        return self.linha_original is None
+
+
+def normalizar_codigo(codigo: Any) -> Optional[str]:
+    """Normaliza o código do boleto (None se vazio)"""
+    if codigo is None or (not isinstance(codigo, str) and pd.isna(codigo)):
+        return None
+    codigo = str(codigo).strip()
+    return codigo or None
+
+
+def normalizar_documento(documento: Any) -> str:
+    """Mantém apenas os dígitos do CPF/CNPJ"""
+    return ''.join(c for c in str(documento) if c.isdigit())
+
+
+def normalizar_vencimento(vencimento: Any) -> Optional[str]:
+    """
+    Data de vencimento no formato da API (YYYY-MM-DD), usada também no payload
+    da emissão. Células de data do Excel chegam como Timestamp, ou como texto
+    com horário zerado ('2025-01-10 00:00:00').
+
+    Returns:
+        str: Data normalizada, ou None se vazia ou inválida
+    """
+    if vencimento is None or (not isinstance(vencimento, str) and pd.isna(vencimento)):
+        return None
+    if isinstance(vencimento, (datetime, date)):
+        return vencimento.strftime('%Y-%m-%d')
+    texto = str(vencimento).strip()
+    for formato in ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(texto, formato).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+class IndiceDuplicatas:
+    """
+    Índice hash de boletos por código e por (documento, valor, vencimento).
+    Cada verificação é O(1), então a varredura completa de um arquivo é linear.
+    """
+
+    def __init__(self, emitidos: Iterable[Dict[str, Any]] = ()):
+        """
+        Inicializa o índice.
+
+        Args:
+            emitidos: Payloads (formato da API) de boletos já emitidos,
+                usados para detectar linhas que repetem uma emissão anterior
+        """
+        self._codigos: Dict[str, Optional[int]] = {}
+        self._conteudos: Dict[ChaveConteudo, Optional[int]] = {}
+        for payload in emitidos:
+            self.registrar_emitido(payload)
+
+    def registrar_emitido(self, payload: Dict[str, Any]):
+        """
+        Registra um boleto já emitido a partir do payload enviado à API.
+
+        Args:
+            payload (dict): Payload no formato de BoletoData.to_dict()
+        """
+        codigo = normalizar_codigo(payload.get('code'))
+        if codigo:
+            self._codigos.setdefault(codigo, None)
+
+        documento = normalizar_documento(
+            payload.get('customer', {}).get('document', {}).get('identity', '')
+        )
+        centavos = sum(int(s.get('amount', 0)) for s in payload.get('services', []))
+        vencimento = normalizar_vencimento(payload.get('payment_terms', {}).get('due_date'))
+        if documento and vencimento:
+            self._conteudos.setdefault((documento, centavos, vencimento), None)
+
+    def verificar(
+        self,
+        linha: int,
+        codigo: Optional[str],
+        conteudo: Optional[ChaveConteudo]
+    ) -> Optional[Duplicata]:
+        """
+        Verifica uma linha e a registra no índice se não for duplicada.
+
+        Args:
+            linha (int): Índice da linha no arquivo
+            codigo: Código normalizado (ou None)
+            conteudo: Chave (documento, centavos, vencimento) normalizada (ou None)
+
+        Returns:
+            Duplicata: Duplicata encontrada ou None se a linha é única
+        """
+        if codigo is not None and codigo in self._codigos:
+            return Duplicata(linha, 'codigo', codigo, self._codigos[codigo])
+        if conteudo is not None and conteudo in self._conteudos:
+            return Duplicata(linha, 'conteudo', conteudo, self._conteudos[conteudo])
+
+        if codigo is not None:
+            self._codigos[codigo] = linha
+        if conteudo is not None:
+            self._conteudos[conteudo] = linha
+        return None
+
+
+def detectar_duplicatas(
+    df: pd.DataFrame,
+    formatar_valor: Callable[[Any], float],
+    emitidos: Iterable[Dict[str, Any]] = ()
+) -> List[Duplicata]:
+    """
+    Detecta linhas duplicadas em um DataFrame de boletos em tempo linear.
+
+    A primeira ocorrência de cada chave é mantida; as seguintes são reportadas.
+    Linhas cujo documento ou valor não podem ser normalizados só são comparadas
+    pelo código (a validação da linha reportará o erro depois).
+
+    Args:
+        df (pd.DataFrame): Dados lidos do arquivo Excel/CSV
+        formatar_valor: Função de conversão do valor monetário para float
+        emitidos: Payloads de boletos já emitidos para verificação cruzada
+
+    Returns:
+        list: Duplicatas encontradas, na ordem das linhas
+    """
+    indice = IndiceDuplicatas(emitidos)
+    duplicatas = []
+
+    n = len(df)
+    codigos = df['codigo'] if 'codigo' in df else [None] * n
+    documentos = df['documento'] if 'documento' in df else [''] * n
+    valores = df['valor'] if 'valor' in df else [None] * n
+    vencimentos = df['data_vencimento'] if 'data_vencimento' in df else [''] * n
+
+    for linha, codigo, documento, valor, vencimento in zip(
+        df.index, codigos, documentos, valores, vencimentos
+    ):
+        conteudo = None
+        documento = normalizar_documento(documento)
+        vencimento = normalizar_vencimento(vencimento)
+        if documento and vencimento:
+            try:
+                # Mesmo arredondamento de BoletoData.to_dict()
+                centavos = int(formatar_valor(valor) * 100)
+                conteudo = (documento, centavos, vencimento)
+            except (TypeError, ValueError):
+                pass
+
+        duplicata = indice.verificar(linha, normalizar_codigo(codigo), conteudo)
+        if duplicata:
+            duplicatas.append(duplicata)
+
+    return duplicatas
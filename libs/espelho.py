@@ -0,0 +1,434 @@
+"""
+Módulo responsável pelo espelho local dos boletos (SQLite).
+O espelho é preenchido por uma sincronização completa da listagem da API e
+mantido atualizado por sincronizações incrementais, permitindo responder às
+buscas por CPF/CNPJ, código e status sem chamar a API.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .bloom import FiltroBloom
+from .cache import STATUS_DEFINITIVOS
+from .resumo import ResumoBoleto
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boletos (
+    id TEXT PRIMARY KEY,
+    documento TEXT,
+    status TEXT,
+    due_date TEXT,
+    code TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_boletos_documento ON boletos (documento, created_at);
+CREATE INDEX IF NOT EXISTS idx_boletos_status ON boletos (status, due_date);
+CREATE INDEX IF NOT EXISTS idx_boletos_due_date ON boletos (due_date);
+CREATE INDEX IF NOT EXISTS idx_boletos_code ON boletos (code);
+CREATE INDEX IF NOT EXISTS idx_boletos_updated_at ON boletos (updated_at);
+CREATE TABLE IF NOT EXISTS sincronizacao (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Uma versão mais antiga de um boleto nunca sobrescreve uma mais recente,
+# independente da ordem em que sincronizações e eventos chegam
+UPSERT = """
+INSERT INTO boletos (id, documento, status, due_date, code, created_at, updated_at, dados)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    documento = COALESCE(excluded.documento, boletos.documento),
+    status = excluded.status,
+    due_date = COALESCE(excluded.due_date, boletos.due_date),
+    code = COALESCE(excluded.code, boletos.code),
+    created_at = COALESCE(excluded.created_at, boletos.created_at),
+    updated_at = excluded.updated_at,
+    dados = excluded.dados
+WHERE boletos.updated_at IS NULL OR excluded.updated_at IS NULL
+    OR excluded.updated_at >= boletos.updated_at
+"""
+
+
+def documento_do_boleto(boleto: Dict[str, Any]) -> Optional[str]:
+    """
+    CPF/CNPJ do cliente de um boleto, apenas dígitos.
+
+    Args:
+        boleto (dict): Boleto no formato da API
+
+    Returns:
+        str: Documento ou None se o boleto não o informar
+    """
+    customer = boleto.get('customer') or {}
+    documento = customer.get('document') if isinstance(customer, dict) else None
+    if isinstance(documento, dict):
+        documento = documento.get('identity')
+    if not documento:
+        return None
+    digitos = ''.join(c for c in str(documento) if c.isdigit())
+    return digitos or None
+
+
+def vencimento_do_boleto(boleto: Dict[str, Any]) -> Optional[str]:
+    """Data de vencimento, diretamente no boleto ou em payment_terms"""
+    due_date = boleto.get('due_date')
+    if not due_date:
+        payment_terms = boleto.get('payment_terms') or {}
+        if isinstance(payment_terms, dict):
+            due_date = payment_terms.get('due_date')
+    return due_date
+
+
+class EspelhoBoletos:
+    """
+    Espelho local dos boletos em SQLite (modo WAL), indexado por documento,
+    status, vencimento, código e data de atualização.
+    Seguro para uso por várias threads (uma conexão por thread).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        intervalo_filtro: float = 60.0,
+        resumido: bool = False,
+        idade_maxima: Optional[float] = 3600.0
+    ):
+        """
+        Inicializa o espelho, criando o arquivo e as tabelas se necessário.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite
+            intervalo_filtro (float): Segundos entre verificações de novos boletos
+                gravados por outros processos no filtro de documentos
+            resumido (bool): Gravar apenas o ResumoBoleto de cada boleto, em vez
+                do boleto completo; as buscas que pedem os boletos completos
+                deixam de usar o espelho (linhas dos dois formatos podem coexistir)
+            idade_maxima (float): Segundos desde a última sincronização após os
+                quais as buscas deixam de ser respondidas pelo espelho e voltam
+                para a API (None = sem limite)
+        """
+        self.caminho = os.path.expanduser(caminho)
+        self.intervalo_filtro = intervalo_filtro
+        self.resumido = resumido
+        self.idade_maxima = idade_maxima
+        self._local = threading.local()
+        self._filtro: Optional[FiltroBloom] = None
+        self._versao_filtro = None
+        self._filtro_verificado_em = 0.0
+        self._sincronizado = False
+        self._lock_filtro = threading.Lock()
+
+        conexao = self._conexao()
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(SCHEMA)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (conexões SQLite não são compartilhadas entre threads)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.execute("PRAGMA busy_timeout=30000")
+            self._local.conexao = conexao
+        return conexao
+
+    def gravar(self, boletos: Iterable[Dict[str, Any]]) -> int:
+        """
+        Grava ou atualiza boletos em uma única transação.
+
+        Args:
+            boletos: Boletos no formato da API (listagem, consulta ou webhook)
+
+        Returns:
+            int: Quantidade de boletos recebidos com ID
+        """
+        linhas = [
+            (
+                boleto['id'],
+                documento_do_boleto(boleto),
+                boleto.get('status'),
+                vencimento_do_boleto(boleto),
+                boleto.get('code'),
+                boleto.get('created_at'),
+                boleto.get('updated_at'),
+                self._serializar(boleto)
+            )
+            for boleto in boletos
+            if boleto.get('id')
+        ]
+        if not linhas:
+            return 0
+
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.executemany(UPSERT, linhas)
+
+        with self._lock_filtro:
+            if self._filtro is not None:
+                for linha in linhas:
+                    if linha[1]:
+                        self._filtro.adicionar(linha[1])
+        return len(linhas)
+
+    def _serializar(self, boleto) -> str:
+        if self.resumido or isinstance(boleto, ResumoBoleto):
+            # Resumo gravado como lista JSON; o boleto completo, como objeto
+            return json.dumps(ResumoBoleto.de_boleto(boleto).para_lista(), ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(boleto, ensure_ascii=False)
+
+    @staticmethod
+    def _decodificar(dados: str):
+        valor = json.loads(dados)
+        return ResumoBoleto.de_lista(valor) if isinstance(valor, list) else valor
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> List[Dict[str, Any]]:
+        return [self._decodificar(dados) for (dados,) in self._conexao().execute(sql, parametros)]
+
+    def obter(self, invoice_id: str) -> Optional[Dict[str, Any]]:
+        """Boleto pelo ID, ou None se não estiver no espelho"""
+        boletos = self._consultar("SELECT dados FROM boletos WHERE id = ?", (invoice_id,))
+        return boletos[0] if boletos else None
+
+    def buscar_por_codigo(self, code: str) -> Optional[Dict[str, Any]]:
+        """Boleto pelo código, ou None se não estiver no espelho"""
+        boletos = self._consultar("SELECT dados FROM boletos WHERE code = ? LIMIT 1", (code,))
+        return boletos[0] if boletos else None
+
+    def possui_documento(self, documento: str) -> bool:
+        """Indica se há boletos do CPF/CNPJ (apenas dígitos) no espelho"""
+        linha = self._conexao().execute(
+            "SELECT 1 FROM boletos WHERE documento = ? LIMIT 1", (documento,)
+        ).fetchone()
+        return linha is not None
+
+    def documentos(self) -> Iterator[str]:
+        """CPFs/CNPJs distintos presentes no espelho"""
+        cursor = self._conexao().execute("SELECT DISTINCT documento FROM boletos WHERE documento IS NOT NULL")
+        for (documento,) in cursor:
+            yield documento
+
+    def pode_possuir_documento(self, documento: str) -> bool:
+        """
+        Indica, sem consultar o SQLite, se o documento pode ter boletos.
+
+        Retorna False apenas quando o espelho já passou por uma sincronização
+        completa e o documento certamente não está nele (filtro de Bloom dos
+        documentos, recarregado quando outro processo grava novos boletos).
+
+        Args:
+            documento (str): CPF/CNPJ, apenas dígitos
+
+        Returns:
+            bool: False se o documento certamente não tem boletos no espelho
+        """
+        if not self.atualizado():
+            return True
+        filtro = self._filtro_atualizado()
+        return filtro is None or documento in filtro
+
+    def _filtro_atualizado(self) -> Optional[FiltroBloom]:
+        agora = time.monotonic()
+        with self._lock_filtro:
+            if self._filtro_verificado_em and agora - self._filtro_verificado_em < self.intervalo_filtro:
+                return self._filtro if self._sincronizado else None
+            self._filtro_verificado_em = agora
+
+            conexao = self._conexao()
+            self._sincronizado = self.marca('sincronizacao_completa') is not None
+            if not self._sincronizado:
+                return None
+
+            # Novos documentos só chegam em novas linhas, então o maior rowid identifica a versão
+            versao = conexao.execute("SELECT MAX(rowid) FROM boletos").fetchone()[0]
+            if self._filtro is None or versao != self._versao_filtro:
+                quantidade = conexao.execute(
+                    "SELECT COUNT(DISTINCT documento) FROM boletos"
+                ).fetchone()[0]
+                self._filtro = FiltroBloom.de_itens(self.documentos(), capacidade=max(1024, quantidade * 2))
+                self._versao_filtro = versao
+                logging.info(
+                    f"Filtro de documentos do espelho carregado: {quantidade} documentos, "
+                    f"{self._filtro.tamanho_bytes()} bytes"
+                )
+            return self._filtro
+
+    def contar_por_documento(self, documento: str) -> int:
+        """Quantidade de boletos do CPF/CNPJ (apenas dígitos)"""
+        return self._conexao().execute(
+            "SELECT COUNT(*) FROM boletos WHERE documento = ?", (documento,)
+        ).fetchone()[0]
+
+    def listar_por_documento(
+        self,
+        documento: str,
+        limite: Optional[int] = None,
+        deslocamento: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Boletos de um CPF/CNPJ, do mais recente para o mais antigo.
+
+        Args:
+            documento (str): CPF/CNPJ, apenas dígitos
+            limite (int): Quantidade máxima de boletos (padrão: todos)
+            deslocamento (int): Boletos ignorados no início (paginação)
+
+        Returns:
+            list: Boletos no formato da API
+        """
+        return self._consultar(
+            "SELECT dados FROM boletos WHERE documento = ? "
+            "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (documento, -1 if limite is None else limite, deslocamento)
+        )
+
+    def listar_por_status(self, status: str, vencimento_ate: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Boletos com um status, por data de vencimento.
+
+        Args:
+            status (str): Status do boleto (ex: 'OPEN', 'LATE')
+            vencimento_ate (str): Data limite de vencimento (AAAA-MM-DD), opcional
+
+        Returns:
+            list: Boletos no formato da API
+        """
+        if vencimento_ate is None:
+            return self._consultar(
+                "SELECT dados FROM boletos WHERE status = ? ORDER BY due_date", (status,)
+            )
+        return self._consultar(
+            "SELECT dados FROM boletos WHERE status = ? AND due_date <= ? ORDER BY due_date",
+            (status, vencimento_ate)
+        )
+
+    def listar_em_aberto(self) -> List[Dict[str, Any]]:
+        """Boletos que ainda podem mudar de status (não pagos nem cancelados), por vencimento"""
+        marcadores = ', '.join('?' * len(STATUS_DEFINITIVOS))
+        return self._consultar(
+            f"SELECT dados FROM boletos WHERE status IS NULL OR status NOT IN ({marcadores}) ORDER BY due_date",
+            STATUS_DEFINITIVOS
+        )
+
+    def total(self) -> int:
+        """Quantidade de boletos no espelho"""
+        return self._conexao().execute("SELECT COUNT(*) FROM boletos").fetchone()[0]
+
+    def atualizado(self) -> bool:
+        """
+        Indica se o espelho foi sincronizado (completa ou incremental) há no
+        máximo idade_maxima segundos; caso contrário, as buscas usam a API.
+        """
+        if self.idade_maxima is None:
+            return True
+        sincronizado_em = []
+        for chave in ('sincronizacao_completa', 'sincronizacao_incremental'):
+            try:
+                sincronizado_em.append(float(self.marca(chave)))
+            except (TypeError, ValueError):
+                continue
+        return bool(sincronizado_em) and time.time() - max(sincronizado_em) <= self.idade_maxima
+
+    def ultima_atualizacao(self) -> Optional[str]:
+        """
+        Maior updated_at recebido da API nas sincronizações (marca da
+        incremental). Webhooks e o monitor também gravam no espelho, por isso a
+        marca é guardada à parte em vez de calculada a partir das linhas.
+        """
+        return self.marca('marca_atualizacao')
+
+    def _avancar_marca(self, maior: Optional[str]):
+        """Registra o maior updated_at recebido da API, sem nunca recuar a marca"""
+        atual = self.ultima_atualizacao()
+        if maior and (atual is None or maior > atual):
+            self._marcar('marca_atualizacao', maior)
+
+    def _marcar(self, chave: str, valor: Any):
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO sincronizacao (chave, valor) VALUES (?, ?)", (chave, str(valor))
+            )
+
+    def marca(self, chave: str) -> Optional[str]:
+        """Valor registrado pela última sincronização (ex: 'sincronizacao_completa')"""
+        linha = self._conexao().execute(
+            "SELECT valor FROM sincronizacao WHERE chave = ?", (chave,)
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def sincronizar_completo(self, consulta, per_page: int = 100, tamanho_bloco: int = 500) -> int:
+        """
+        Percorre toda a listagem da API e grava os boletos no espelho.
+
+        Args:
+            consulta (ConsultaBoletos): Consulta usada para listar os boletos
+            per_page (int): Itens por página da listagem
+            tamanho_bloco (int): Boletos gravados por transação
+
+        Returns:
+            int: Quantidade de boletos gravados
+        """
+        inicio = time.time()
+        gravados = 0
+        bloco = []
+        maior = None
+        for boleto in consulta.iterar_boletos(per_page=per_page):
+            atualizado_em = boleto.get('updated_at')
+            if atualizado_em and (maior is None or atualizado_em > maior):
+                maior = atualizado_em
+            bloco.append(boleto)
+            if len(bloco) >= tamanho_bloco:
+                gravados += self.gravar(bloco)
+                bloco = []
+        gravados += self.gravar(bloco)
+
+        self._avancar_marca(maior)
+        self._marcar('sincronizacao_completa', inicio)
+        logging.info(f"Espelho sincronizado: {gravados} boletos em {time.time() - inicio:.1f}s")
+        return gravados
+
+    def sincronizar_incremental(self, consulta, per_page: int = 100) -> int:
+        """
+        Grava os boletos alterados desde a última sincronização.
+
+        A data da marca (ver ultima_atualizacao) vai como filtro start da
+        listagem, para a API devolver só os boletos a partir daquele dia; como o
+        filtro é por dia, apenas os boletos com updated_at posterior à marca são
+        gravados. Sem marca, faz a completa.
+
+        Args:
+            consulta (ConsultaBoletos): Consulta usada para listar os boletos
+            per_page (int): Itens por página da listagem
+
+        Returns:
+            int: Quantidade de boletos gravados
+        """
+        marca_atualizacao = self.ultima_atualizacao()
+        if marca_atualizacao is None:
+            return self.sincronizar_completo(consulta, per_page=per_page)
+
+        alterados = []
+        maior = marca_atualizacao
+        for boleto in consulta.iterar_boletos(per_page=per_page, start=marca_atualizacao[:10]):
+            atualizado_em = boleto.get('updated_at')
+            if atualizado_em and atualizado_em <= marca_atualizacao:
+                continue
+            alterados.append(boleto)
+            if atualizado_em and atualizado_em > maior:
+                maior = atualizado_em
+
+        gravados = self.gravar(alterados)
+        self._avancar_marca(maior)
+        self._marcar('sincronizacao_incremental', time.time())
+        logging.info(f"Espelho atualizado: {gravados} boletos alterados desde {marca_atualizacao}")
+        return gravados
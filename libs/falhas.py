@@ -0,0 +1,102 @@
+"""
+Módulo responsável pelo arquivo de falhas (dead-letter) da emissão em lote.
+Cada linha que não gerou boleto é gravada em JSON Lines com o payload
+preparado, a classe do erro, o status HTTP e a chave de idempotência usada,
+permitindo reenviar apenas essas linhas depois.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class RegistroFalha:
+    """Representa uma linha que falhou na emissão"""
+    linha: Optional[int]
+    idempotency_key: str
+    erro_classe: str
+    erro: str
+    status_http: Optional[int] = None
+    payload: Optional[Dict[str, Any]] = None
+    dados: Optional[Dict[str, Any]] = None
+    data: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+    @classmethod
+    def de_excecao(
+        cls,
+        erro: Exception,
+        idempotency_key: str,
+        linha: Optional[int] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        dados: Optional[Dict[str, Any]] = None
+    ) -> 'RegistroFalha':
+        """
+        Cria o registro a partir da exceção da emissão.
+
+        Args:
+            erro (Exception): Erro ocorrido (ErroEmissao traz o status HTTP)
+            idempotency_key (str): Chave de idempotência da linha
+            linha (int): Número da linha no arquivo (base 1)
+            payload (dict): Payload preparado, se a falha ocorreu no envio
+            dados (dict): Dados originais da linha, se a falha ocorreu na validação
+
+        Returns:
+            RegistroFalha: Registro pronto para gravação
+        """
+        status_http = getattr(erro, 'status_code', None)
+        if status_http is None and getattr(erro, 'response', None) is not None:
+            status_http = erro.response.status_code
+        return cls(
+            linha=linha,
+            idempotency_key=idempotency_key,
+            erro_classe=type(erro).__name__,
+            erro=str(erro),
+            status_http=status_http,
+            payload=payload,
+            dados=dados
+        )
+
+
+class ArquivoFalhas:
+    """
+    Arquivo de falhas em JSON Lines, seguro para gravação por várias threads.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa o arquivo de falhas.
+
+        Args:
+            caminho (str): Caminho do arquivo .jsonl (criado na primeira falha)
+        """
+        self.caminho = os.path.expanduser(caminho)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, registro: RegistroFalha):
+        """Acrescenta um registro ao arquivo"""
+        linha = json.dumps(asdict(registro), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+            self.total += 1
+
+
+def carregar_falhas(caminho: str) -> Iterator[RegistroFalha]:
+    """
+    Lê os registros de um arquivo de falhas.
+
+    Args:
+        caminho (str): Caminho do arquivo .jsonl
+
+    Returns:
+        Iterator[RegistroFalha]: Registros na ordem em que foram gravados
+    """
+    with open(os.path.expanduser(caminho), 'r', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                yield RegistroFalha(**json.loads(linha))
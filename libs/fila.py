@@ -0,0 +1,317 @@
+"""
+Módulo responsável pela fila durável de emissão de boletos (outbox).
+Os produtores (CLI, scripts, exemplos) apenas gravam os payloads preparados em
+um arquivo SQLite em modo WAL; trabalhadores de longa duração drenam a fila
+usando conexões reutilizadas e um token já obtido.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .agendador import PRIORIDADES
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emissoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    prioridade INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    reservado_por TEXT,
+    reservado_ate REAL,
+    criado_em REAL NOT NULL,
+    atualizado_em REAL NOT NULL,
+    resposta TEXT,
+    erro TEXT,
+    status_http INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_emissoes_status ON emissoes (status, prioridade, id);
+"""
+
+# Status de itens que já resultaram (ou vão resultar) em um boleto
+STATUS_REGISTRADOS = ('pendente', 'processando', 'concluido')
+
+
+@dataclass
+class ItemFila:
+    """Representa uma emissão reservada por um trabalhador"""
+    id: int
+    idempotency_key: str
+    payload: Dict[str, Any]
+    prioridade: int
+    tentativas: int
+
+
+class FilaEmissao:
+    """
+    Fila durável de emissões em SQLite (modo WAL).
+
+    Vários processos no mesmo host podem produzir e consumir a mesma fila: a
+    reserva de itens é feita em uma transação IMMEDIATE e expira após
+    tempo_reserva segundos, devolvendo à fila itens de trabalhadores que caíram.
+    O SQLite não garante travas em sistemas de arquivos de rede, então
+    trabalhadores em outros hosts não devem apontar para o mesmo arquivo via NFS/SMB.
+    """
+
+    def __init__(self, caminho: str, tempo_reserva: float = 300.0):
+        """
+        Inicializa a fila, criando o arquivo e as tabelas se necessário.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite
+            tempo_reserva (float): Segundos até um item reservado voltar à fila
+        """
+        self.caminho = os.path.expanduser(caminho)
+        self.tempo_reserva = tempo_reserva
+        self._local = threading.local()
+
+        conexao = self._conexao()
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(SCHEMA)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (conexões SQLite não são compartilhadas entre threads)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.execute("PRAGMA busy_timeout=30000")
+            self._local.conexao = conexao
+        return conexao
+
+    def enfileirar(
+        self,
+        payload: Dict[str, Any],
+        classe: str = 'lote',
+        idempotency_key: Optional[str] = None
+    ) -> str:
+        """
+        Grava um payload preparado na fila.
+
+        Args:
+            payload (dict): Payload no formato da API (BoletoData.to_dict())
+            classe (str): Classe de prioridade ('interativa' ou 'lote')
+            idempotency_key (str): Chave de idempotência (gerada se não informada)
+
+        Returns:
+            str: Chave de idempotência usada na emissão
+        """
+        return self.enfileirar_varios([payload], classe=classe, idempotency_keys=[idempotency_key])[0]
+
+    def enfileirar_varios(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        classe: str = 'lote',
+        idempotency_keys: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Grava vários payloads na fila em uma única transação.
+
+        Args:
+            payloads: Payloads no formato da API
+            classe (str): Classe de prioridade ('interativa' ou 'lote')
+            idempotency_keys: Chaves de idempotência, na ordem dos payloads (opcional)
+
+        Returns:
+            list: Chaves de idempotência, na ordem dos payloads
+        """
+        if classe not in PRIORIDADES:
+            raise ValueError(f"Classe de prioridade inválida: {classe}. Válidas: {list(PRIORIDADES)}")
+
+        agora = time.time()
+        chaves = []
+        linhas = []
+        for i, payload in enumerate(payloads):
+            chave = (idempotency_keys[i] if idempotency_keys else None) or str(uuid.uuid4())
+            chaves.append(chave)
+            linhas.append((chave, json.dumps(payload, ensure_ascii=False), PRIORIDADES[classe], agora, agora))
+
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.executemany(
+                "INSERT OR IGNORE INTO emissoes "
+                "(idempotency_key, payload, prioridade, criado_em, atualizado_em) "
+                "VALUES (?, ?, ?, ?, ?)",
+                linhas
+            )
+        return chaves
+
+    def reservar(self, trabalhador: str, limite: int = 10) -> List[ItemFila]:
+        """
+        Reserva os próximos itens da fila para um trabalhador.
+
+        Args:
+            trabalhador (str): Identificação do trabalhador
+            limite (int): Quantidade máxima de itens reservados
+
+        Returns:
+            list: Itens reservados, por prioridade e ordem de chegada
+        """
+        agora = time.time()
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            linhas = conexao.execute(
+                "SELECT id, idempotency_key, payload, prioridade, tentativas FROM emissoes "
+                "WHERE status = 'pendente' OR (status = 'processando' AND reservado_ate < ?) "
+                "ORDER BY prioridade, id LIMIT ?",
+                (agora, limite)
+            ).fetchall()
+            conexao.executemany(
+                "UPDATE emissoes SET status = 'processando', reservado_por = ?, reservado_ate = ?, "
+                "tentativas = tentativas + 1, atualizado_em = ? WHERE id = ?",
+                [(trabalhador, agora + self.tempo_reserva, agora, linha[0]) for linha in linhas]
+            )
+        return [
+            ItemFila(id=id_, idempotency_key=chave, payload=json.loads(payload), prioridade=prioridade, tentativas=tentativas + 1)
+            for id_, chave, payload, prioridade, tentativas in linhas
+        ]
+
+    def concluir(self, item_id: int, resposta: Optional[Dict[str, Any]]):
+        """Marca um item como emitido com sucesso"""
+        self._finalizar(item_id, 'concluido', resposta=json.dumps(resposta, ensure_ascii=False))
+
+    def falhar(
+        self,
+        item_id: int,
+        erro: str,
+        status_http: Optional[int] = None,
+        tentar_novamente: bool = False
+    ):
+        """
+        Registra a falha de um item.
+
+        Args:
+            item_id (int): ID do item na fila
+            erro (str): Mensagem de erro
+            status_http (int): Status HTTP retornado pela API, se houver
+            tentar_novamente (bool): Se True, o item volta para a fila
+        """
+        status = 'pendente' if tentar_novamente else 'falha'
+        self._finalizar(item_id, status, erro=erro, status_http=status_http)
+
+    def _finalizar(self, item_id: int, status: str, **campos):
+        campos.update(status=status, reservado_por=None, reservado_ate=None, atualizado_em=time.time())
+        atribuicoes = ', '.join(f"{campo} = ?" for campo in campos)
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute(f"UPDATE emissoes SET {atribuicoes} WHERE id = ?", (*campos.values(), item_id))
+
+    def contagem(self) -> Dict[str, int]:
+        """Quantidade de itens por status"""
+        linhas = self._conexao().execute("SELECT status, COUNT(*) FROM emissoes GROUP BY status").fetchall()
+        return dict(linhas)
+
+    def payloads_registrados(self) -> Iterator[Dict[str, Any]]:
+        """
+        Payloads já emitidos ou aguardando emissão, para a verificação de
+        duplicatas antes de enfileirar um novo arquivo.
+        """
+        marcadores = ', '.join('?' * len(STATUS_REGISTRADOS))
+        cursor = self._conexao().execute(
+            f"SELECT payload FROM emissoes WHERE status IN ({marcadores})", STATUS_REGISTRADOS
+        )
+        for (payload,) in cursor:
+            yield json.loads(payload)
+
+
+class TrabalhadorFila:
+    """
+    Trabalhador de longa duração que drena a FilaEmissao usando um GeradorBoletos.
+    Com um agendador configurado no gerador, os itens de cada reserva são
+    emitidos em paralelo.
+    """
+
+    def __init__(
+        self,
+        fila: FilaEmissao,
+        gerador,
+        tamanho_lote: int = 10,
+        intervalo_ociosidade: float = 1.0,
+        max_tentativas: int = 5,
+        nome: Optional[str] = None
+    ):
+        """
+        Inicializa o trabalhador.
+
+        Args:
+            fila (FilaEmissao): Fila a ser drenada
+            gerador (GeradorBoletos): Gerador usado para emitir os boletos
+            tamanho_lote (int): Itens reservados por vez
+            intervalo_ociosidade (float): Segundos de espera quando a fila está vazia
+            max_tentativas (int): Tentativas antes de marcar falhas temporárias como definitivas
+            nome (str): Identificação do trabalhador (padrão: host:pid)
+        """
+        self.fila = fila
+        self.gerador = gerador
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_ociosidade = intervalo_ociosidade
+        self.max_tentativas = max_tentativas
+        self.nome = nome or f"{socket.gethostname()}:{os.getpid()}"
+        self._parar = threading.Event()
+
+    def parar(self):
+        """Solicita a parada após a reserva atual"""
+        self._parar.set()
+
+    def processar_lote(self) -> int:
+        """
+        Reserva e emite um lote de itens.
+
+        Returns:
+            int: Quantidade de itens processados
+        """
+        itens = self.fila.reservar(self.nome, self.tamanho_lote)
+        envios = [
+            (item, self.gerador._enviar(item.payload, classe=_classe(item.prioridade), idempotency_key=item.idempotency_key))
+            for item in itens
+        ]
+        for item, envio in envios:
+            try:
+                self.fila.concluir(item.id, envio.result())
+            except Exception as e:
+                status_http = getattr(e, 'status_code', None)
+                # Erros 4xx (exceto 429) não se resolvem com nova tentativa
+                temporario = status_http is None or status_http == 429 or status_http >= 500
+                tentar_novamente = temporario and item.tentativas < self.max_tentativas
+                logging.error(f"Erro ao emitir item {item.id} da fila ({item.idempotency_key}): {str(e)}")
+                self.fila.falhar(item.id, str(e), status_http=status_http, tentar_novamente=tentar_novamente)
+        return len(itens)
+
+    def executar(self, ate_esvaziar: bool = False):
+        """
+        Drena a fila até parar() ser chamado.
+
+        Args:
+            ate_esvaziar (bool): Se True, retorna quando a fila estiver vazia
+        """
+        # Mantém o token aquecido antes da primeira emissão
+        self.gerador.auth.get_access_token()
+        logging.info(f"Trabalhador {self.nome} iniciado na fila {self.fila.caminho}")
+
+        while not self._parar.is_set():
+            if self.processar_lote() == 0:
+                if ate_esvaziar:
+                    break
+                self._parar.wait(self.intervalo_ociosidade)
+
+        logging.info(f"Trabalhador {self.nome} finalizado. Fila: {self.fila.contagem()}")
+
+
+def _classe(prioridade: int) -> str:
+    """Nome da classe de prioridade a partir do valor gravado na fila"""
+    for classe, valor in PRIORIDADES.items():
+        if valor == prioridade:
+            return classe
+    return 'lote'
@@ -1,10 +1,18 @@
 import pandas as pd
-import requests
 import logging
 import os
 from datetime import datetime
 from .auth import CoraAuth
+from .agendador import AgendadorEmissoes
+from .transporte import criar_sessao
+from .fila import FilaEmissao
+from .prazo import TemposLimite, definir_prazo, encerrar_prazo
+from .falhas import ArquivoFalhas, RegistroFalha, carregar_falhas
+from .duplicatas import detectar_duplicatas, normalizar_vencimento
+from .validacao import RelatorioValidacao, validar_dataframe
 import json
+import uuid
+from concurrent.futures import Future
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Union
 
@@ -326,8 +334,24 @@ class BoletoData:
             "payment_forms": self.payment_forms
         }
 
+class ErroEmissao(Exception):
+    """Erro retornado pela API da Cora ao emitir um boleto"""
+
+    def __init__(self, mensagem: str, status_code: Optional[int] = None, resposta: Optional[str] = None):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        self.resposta = resposta
+
 class GeradorBoletos:
-    def __init__(self, api_url: str, auth: CoraAuth, debug: bool = False):
+    def __init__(
+        self,
+        api_url: str,
+        auth: CoraAuth,
+        debug: bool = False,
+        agendador: Optional[AgendadorEmissoes] = None,
+        tempos_limite: Optional[TemposLimite] = None,
+        http2: bool = False
+    ):
         """
         Inicializa o gerador de boletos.
         
@@ -335,10 +359,20 @@ class GeradorBoletos:
             api_url (str): URL base da API
             auth (CoraAuth): Objeto de autenticação
             debug (bool): Habilita/desabilita logs de debug
+            agendador (AgendadorEmissoes): Agendador compartilhado das chamadas à API.
+                Quando informado, os lotes são emitidos em paralelo e as emissões
+                individuais têm prioridade sobre eles.
+            tempos_limite (TemposLimite): Tempos de conexão e leitura da emissão
+                (padrão: 5s e 30s)
+            http2 (bool): Multiplexar as emissões em conexões HTTP/2, se o
+                pacote httpx[http2] estiver instalado
         """
         self.api_url = api_url
         self.auth = auth
         self.debug = debug
+        self.agendador = agendador
+        self.tempos_limite = tempos_limite or TemposLimite()
+        self.session = criar_sessao(max(10, agendador.max_workers) if agendador else 10, http2=http2)
         self.fine = 500
         self.interest = 1.0
        
@@ -433,18 +467,15 @@ class GeradorBoletos:
             address=address
         )
 
-        # Formata a data de vencimento
-        data_vencimento = str(row['data_vencimento']).strip()
-        try:
-            data_vencimento_obj = datetime.strptime(data_vencimento, '%Y-%m-%d')
-            data_atual = datetime.now().date()
-            
-            if data_vencimento_obj.date() < data_atual:
-                logging.warning(f"Data de vencimento no passado: {data_vencimento}. Usando data atual + 1 dia.")
-                data_vencimento = (data_atual + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-        except ValueError:
-            logging.warning(f"Formato de data inválido: {data_vencimento}. Usando data atual + 1 dia.")
-            data_vencimento = (datetime.now().date() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        # Formata a data de vencimento (células de data do Excel chegam como Timestamp)
+        data_vencimento = normalizar_vencimento(row['data_vencimento'])
+        data_atual = datetime.now().date()
+        if data_vencimento is None:
+            logging.warning(f"Formato de data inválido: {row['data_vencimento']}. Usando data atual + 1 dia.")
+            data_vencimento = (data_atual + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        elif datetime.strptime(data_vencimento, '%Y-%m-%d').date() < data_atual:
+            logging.warning(f"Data de vencimento no passado: {data_vencimento}. Usando data atual + 1 dia.")
+            data_vencimento = (data_atual + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
 
         # Formata o valor monetário
         valor_float = self._formatar_valor_monetario(row['valor'])
@@ -519,122 +550,234 @@ class GeradorBoletos:
 
         return boleto_data.to_dict()
 
-    def gerar_boleto(self, dados_boleto: Union[dict, BoletoData]) -> dict:
+    def gerar_boleto(self, dados_boleto: Union[dict, BoletoData], idempotency_key: Optional[str] = None) -> dict:
         """
         Gera um boleto através da API.
         
         Args:
             dados_boleto: Pode ser um dicionário com os dados do boleto ou um objeto BoletoData
+            idempotency_key (str): Chave de idempotência a reutilizar (gerada se não informada)
             
         Returns:
             dict: Resposta da API
         """
         try:
-            # Converte para payload se necessário
-            payload = dados_boleto.to_dict() if isinstance(dados_boleto, BoletoData) else dados_boleto
+            return self._enviar_boleto(dados_boleto, idempotency_key)
+        except Exception as e:
+            logging.error(f"Erro ao gerar boleto: {str(e)}")
 
-            if self.debug:
-                logging.debug(f"Payload para geração do boleto: {json.dumps(payload, indent=2, ensure_ascii=False)}")
+    def _enviar_boleto(self, dados_boleto: Union[dict, BoletoData], idempotency_key: Optional[str] = None) -> dict:
+        """
+        Envia o boleto para a API, propagando os erros.
+        
+        Args:
+            dados_boleto: Pode ser um dicionário com os dados do boleto ou um objeto BoletoData
+            idempotency_key (str): Chave de idempotência a reutilizar (gerada se não informada)
+            
+        Returns:
+            dict: Resposta da API
+            
+        Raises:
+            ErroEmissao: Se a API responder com erro
+            requests.exceptions.RequestException: Em caso de erro na requisição
+            PrazoEsgotado: Se o prazo do lote terminou antes do envio
+        """
+        # Converte para payload se necessário
+        payload = dados_boleto.to_dict() if isinstance(dados_boleto, BoletoData) else dados_boleto
 
-            # Obtém o token de autenticação
-            token = self.auth.get_access_token()
-            if self.debug:
-                logging.debug(f"Token obtido: {token[:20]}...")
+        if self.debug:
+            logging.debug(f"Payload para geração do boleto: {json.dumps(payload, indent=2, ensure_ascii=False)}")
+
+        # Obtém o token de autenticação
+        token = self.auth.get_access_token()
+        if self.debug:
+            logging.debug(f"Token obtido: {token[:20]}...")
+
+        # Obtém os certificados
+        cert_path = self.auth.cert_path
+        key_path = self.auth.key_path
+        if self.debug:
+            logging.debug(f"Usando certificado: {cert_path}")
+            logging.debug(f"Usando chave: {key_path}")
 
-            # Obtém os certificados
-            cert_path = self.auth.cert_path
-            key_path = self.auth.key_path
+        # Prepara os headers
+        headers = self.auth.get_auth_headers()
+        headers['Content-Type'] = 'application/json'
+        headers['accept'] = 'application/json'
+        
+        # Gera chave de idempotência (ou reutiliza a informada, em reenvios)
+        idempotency_key = idempotency_key or str(uuid.uuid4())
+        headers['Idempotency-Key'] = idempotency_key
+        if self.debug:
+            logging.debug(f"Idempotency-Key: {idempotency_key}")
+
+        # Log detalhado da requisição
+        logging.info("=== DETALHES DA REQUISIÇÃO ===")
+        logging.info(f"URL: {self.api_url}")
+        logging.info("Headers:")
+        for key, value in headers.items():
+            if key == 'Authorization':
+                logging.info(f"  {key}: Bearer {value[:20]}...")
+            else:
+                logging.info(f"  {key}: {value}")
+        logging.info("Payload:")
+        logging.info(json.dumps(payload, indent=2, ensure_ascii=False))
+
+        # Faz a requisição
+        response = self.session.post(
+            self.api_url,
+            json=payload,
+            headers=headers,
+            cert=(cert_path, key_path),
+            verify=True,
+            timeout=self.tempos_limite.para_requisicao('emitir o boleto')
+        )
+
+        # Log da resposta
+        logging.info(f"Status code: {response.status_code}")
+        logging.info("Headers da resposta:")
+        for key, value in response.headers.items():
+            logging.info(f"  {key}: {value}")
+
+        if response.status_code == 200:
+            logging.info(f"Boleto gerado com sucesso para: {payload['customer']['name']}")
             if self.debug:
-                logging.debug(f"Usando certificado: {cert_path}")
-                logging.debug(f"Usando chave: {key_path}")
+                logging.debug("Resposta da API:")
+                logging.debug(json.dumps(response.json(), indent=2, ensure_ascii=False))
+            return response.json()
+        else:
+            error_msg = f"Erro ao gerar boleto para {payload['customer']['name']}: {response.status_code} {response.reason} for url: {self.api_url}"
+            logging.error(error_msg)
+            if response.text:
+                logging.error(f"Resposta da API: {response.text}")
+            raise ErroEmissao(error_msg, status_code=response.status_code, resposta=response.text)
 
-            # Prepara os headers
-            headers = self.auth.get_auth_headers()
-            headers['Content-Type'] = 'application/json'
-            headers['accept'] = 'application/json'
+    def _ler_arquivo(self, excel_file: str) -> pd.DataFrame:
+        """
+        Lê o arquivo Excel/CSV com os dados dos boletos.
+        
+        Args:
+            excel_file (str): Caminho do arquivo Excel/CSV
             
-            # Gera chave de idempotência
-            import uuid
-            idempotency_key = str(uuid.uuid4())
-            headers['Idempotency-Key'] = idempotency_key
+        Returns:
+            pd.DataFrame: Dados lidos do arquivo
+        """
+        if self.debug:
+            logging.debug(f"Processando arquivo: {excel_file}")
+
+        try:
+            # Tenta ler como Excel
+            df = pd.read_excel(excel_file, engine='openpyxl')
+        except Exception as excel_error:
             if self.debug:
-                logging.debug(f"Idempotency-Key: {idempotency_key}")
-
-            # Log detalhado da requisição
-            logging.info("=== DETALHES DA REQUISIÇÃO ===")
-            logging.info(f"URL: {self.api_url}")
-            logging.info("Headers:")
-            for key, value in headers.items():
-                if key == 'Authorization':
-                    logging.info(f"  {key}: Bearer {value[:20]}...")
-                else:
-                    logging.info(f"  {key}: {value}")
-            logging.info("Payload:")
-            logging.info(json.dumps(payload, indent=2, ensure_ascii=False))
-
-            # Faz a requisição
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                headers=headers,
-                cert=(cert_path, key_path),
-                verify=True
-            )
+                logging.debug(f"Erro ao ler como Excel: {str(excel_error)}")
+                logging.debug("Tentando ler como CSV...")
+            
+            # Se falhar, tenta ler como CSV
+            df = pd.read_csv(excel_file)
 
-            # Log da resposta
-            logging.info(f"Status code: {response.status_code}")
-            logging.info("Headers da resposta:")
-            for key, value in response.headers.items():
-                logging.info(f"  {key}: {value}")
+        if self.debug:
+            logging.debug(f"Arquivo lido com sucesso")
+            logging.debug(f"Total de registros: {len(df)}")
+            logging.debug(f"Colunas: {df.columns.tolist()}")
+            logging.debug(f"Primeiros registros:\n{df.head()}")
+
+        return df
 
-            if response.status_code == 200:
-                logging.info(f"Boleto gerado com sucesso para: {payload['customer']['name']}")
-                if self.debug:
-                    logging.debug("Resposta da API:")
-                    logging.debug(json.dumps(response.json(), indent=2, ensure_ascii=False))
-                return response.json()
+    def _tratar_duplicatas(self, df: pd.DataFrame, duplicatas: str, emitidos) -> pd.DataFrame:
+        """
+        Detecta linhas duplicadas antes da emissão e as sinaliza ou remove.
+        
+        Args:
+            df (pd.DataFrame): Dados lidos do arquivo
+            duplicatas (str): 'sinalizar', 'remover' ou 'ignorar'
+            emitidos: Payloads de boletos já emitidos para verificação cruzada
+            
+        Returns:
+            pd.DataFrame: Dados a serem processados
+        """
+        if duplicatas not in ('sinalizar', 'remover', 'ignorar'):
+            raise ValueError(f"Tratamento de duplicatas inválido: {duplicatas}. Válidos: sinalizar, remover, ignorar")
+        if duplicatas == 'ignorar':
+            return df
+
+        encontradas = detectar_duplicatas(df, self._formatar_valor_monetario, emitidos or ())
+        for duplicata in encontradas:
+            if duplicata.ja_emitido:
+                origem = "boleto já emitido"
             else:
-                error_msg = f"Erro ao gerar boleto para {payload['customer']['name']}: {response.status_code} {response.reason} for url: {self.api_url}"
-                logging.error(error_msg)
-                if response.text:
-                    logging.error(f"Resposta da API: {response.text}")
-                raise Exception(error_msg)
+                origem = f"linha {duplicata.linha_original + 1}"
+            logging.warning(
+                f"Linha {duplicata.linha + 1} duplicada ({duplicata.motivo}: {duplicata.chave}) de {origem}"
+            )
 
-        except Exception as e:
-            logging.error(f"Erro ao gerar boleto: {str(e)}")
-          
-         
+        if encontradas:
+            logging.info(f"Duplicatas encontradas: {len(encontradas)}")
+            if duplicatas == 'remover':
+                df = df.drop(index=[d.linha for d in encontradas])
+                logging.info(f"Duplicatas removidas, restam {len(df)} registros")
+
+        return df
 
-    def processar_arquivo(self, excel_file: str):
+    def validar_arquivo(self, excel_file: str, emitidos=None) -> RelatorioValidacao:
+        """
+        Valida o arquivo Excel/CSV sem gerar boletos nem acessar a API (dry-run).
+        
+        Args:
+            excel_file (str): Caminho do arquivo Excel/CSV
+            emitidos: Payloads de boletos já emitidos para a verificação de duplicatas
+            
+        Returns:
+            RelatorioValidacao: Contagem de erros por tipo e linhas afetadas
+        """
+        df = self._ler_arquivo(excel_file)
+        relatorio = validar_dataframe(df, juros_padrao=self.interest, multa_padrao=self.fine / 100)
+
+        for duplicata in detectar_duplicatas(df, self._formatar_valor_monetario, emitidos or ()):
+            relatorio.avisos.setdefault(f"duplicata_{duplicata.motivo}", []).append(duplicata.linha)
+
+        logging.info(f"Validação de {excel_file} concluída")
+        logging.info(relatorio.resumo())
+        return relatorio
+
+    def processar_arquivo(
+        self,
+        excel_file: str,
+        duplicatas: str = 'sinalizar',
+        emitidos=None,
+        arquivo_falhas: Optional[str] = None,
+        prazo: Optional[float] = None
+    ) -> Dict[str, List[int]]:
         """
         Processa o arquivo Excel/CSV e gera os boletos.
         
         Args:
             excel_file (str): Caminho do arquivo Excel/CSV
+            duplicatas (str): Tratamento de linhas duplicadas (mesmo código ou mesmo
+                documento/valor/vencimento): 'sinalizar' (padrão, apenas registra no log),
+                'remover' (não emite as repetições) ou 'ignorar' (não verifica)
+            emitidos: Payloads de boletos já emitidos, verificados contra as linhas do arquivo
+            arquivo_falhas (str): Arquivo .jsonl onde as linhas com erro são gravadas
+                para reenvio com reprocessar_falhas (opcional)
+            prazo (float): Segundos para emitir o lote; linhas não emitidas a tempo
+                são abandonadas e registradas como erro (opcional)
+            
+        Returns:
+            Dict[str, List[int]]: Números das linhas (base 1) em 'sucessos' e 'erros'
         """
+        resultados = {'sucessos': [], 'erros': []}
+        falhas = ArquivoFalhas(arquivo_falhas) if arquivo_falhas else None
+        prazo_lote = definir_prazo(prazo)
         try:
-            if self.debug:
-                logging.debug(f"Processando arquivo: {excel_file}")
-
-            try:
-                # Tenta ler como Excel
-                df = pd.read_excel(excel_file, engine='openpyxl')
-            except Exception as excel_error:
-                if self.debug:
-                    logging.debug(f"Erro ao ler como Excel: {str(excel_error)}")
-                    logging.debug("Tentando ler como CSV...")
-                
-                # Se falhar, tenta ler como CSV
-                df = pd.read_csv(excel_file)
-
-            if self.debug:
-                logging.debug(f"Arquivo lido com sucesso")
-                logging.debug(f"Total de registros: {len(df)}")
-                logging.debug(f"Colunas: {df.columns.tolist()}")
-                logging.debug(f"Primeiros registros:\n{df.head()}")
+            df = self._ler_arquivo(excel_file)
+            df = self._tratar_duplicatas(df, duplicatas, emitidos)
 
             # Processa cada linha
+            pendentes = []
             for index, row in df.iterrows():
+                # A chave é definida antes do envio para que um reenvio não duplique o boleto
+                idempotency_key = str(uuid.uuid4())
+                payload = None
                 try:
                     if self.debug:
                         logging.debug(f"\nProcessando linha {index + 1}")
@@ -643,22 +786,147 @@ class GeradorBoletos:
                     # Gera o payload
                     payload = self._gerar_payload(row)
                     
-                    # Gera o boleto
-                    response = self.gerar_boleto(payload)
-                    
-                    logging.info(f"Boleto gerado com sucesso para {row['nome']}")
-                    if self.debug:
-                        logging.debug(f"Resposta completa: {response}")
+                    # Gera o boleto (agendado em lote quando há agendador)
+                    envio = self._enviar(payload, classe='lote', idempotency_key=idempotency_key)
 
                 except Exception as e:
                     logging.error(f"Erro ao processar linha {index + 1}: {str(e)}")
-                    
+                    resultados['erros'].append(index + 1)
+                    if falhas:
+                        falhas.registrar(RegistroFalha.de_excecao(
+                            e, idempotency_key, linha=index + 1, payload=payload,
+                            dados=None if payload else row.to_dict()
+                        ))
+                    continue
+
+                if self.agendador:
+                    pendentes.append((index, row, payload, idempotency_key, envio))
+                else:
+                    self._concluir_linha(index, row, payload, idempotency_key, envio, resultados, falhas)
+
+            for pendente in pendentes:
+                self._concluir_linha(*pendente, resultados, falhas)
+
+            if self.agendador and self.debug:
+                logging.debug(f"Métricas do agendador: {self.agendador.metricas()}")
 
         except Exception as e:
             logging.error(f"Erro ao processar arquivo {excel_file}: {str(e)}")
             
         finally:
+            if falhas and falhas.total:
+                logging.info(f"{falhas.total} linhas com erro gravadas em {falhas.caminho}")
             logging.info("Processamento concluído!") 
+            encerrar_prazo(prazo_lote)
+
+        return resultados
+
+    def reprocessar_falhas(self, arquivo_falhas: str, novo_arquivo_falhas: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Reenvia as linhas de um arquivo de falhas, reutilizando as chaves de idempotência
+        originais. Com agendador configurado, os reenvios são feitos em paralelo.
+        
+        Args:
+            arquivo_falhas (str): Arquivo .jsonl gerado por processar_arquivo
+            novo_arquivo_falhas (str): Onde gravar as linhas que falharem de novo
+                (padrão: sobrescreve arquivo_falhas)
+            
+        Returns:
+            Dict[str, List[str]]: Chaves de idempotência em 'sucessos' e 'erros'
+        """
+        registros = list(carregar_falhas(arquivo_falhas))
+        logging.info(f"Reprocessando {len(registros)} linhas de {arquivo_falhas}")
+
+        destino = novo_arquivo_falhas or arquivo_falhas
+        if os.path.exists(destino):
+            os.replace(destino, destino + '.anterior')
+        falhas = ArquivoFalhas(destino)
+
+        resultados = {'sucessos': [], 'erros': []}
+        envios = []
+        for registro in registros:
+            payload = registro.payload
+            try:
+                if payload is None:
+                    payload = self._gerar_payload(pd.Series(registro.dados or {}))
+                envios.append((registro, payload, self._enviar(payload, classe='lote', idempotency_key=registro.idempotency_key)))
+            except Exception as e:
+                logging.error(f"Erro ao reprocessar linha {registro.linha}: {str(e)}")
+                resultados['erros'].append(registro.idempotency_key)
+                falhas.registrar(RegistroFalha.de_excecao(
+                    e, registro.idempotency_key, linha=registro.linha, payload=registro.payload, dados=registro.dados
+                ))
+
+        for registro, payload, envio in envios:
+            try:
+                envio.result()
+                logging.info(f"Linha {registro.linha} reprocessada com sucesso ({registro.idempotency_key})")
+                resultados['sucessos'].append(registro.idempotency_key)
+            except Exception as e:
+                logging.error(f"Erro ao reprocessar linha {registro.linha}: {str(e)}")
+                resultados['erros'].append(registro.idempotency_key)
+                falhas.registrar(RegistroFalha.de_excecao(e, registro.idempotency_key, linha=registro.linha, payload=payload))
+
+        logging.info(f"Reprocessamento concluído: {len(resultados['sucessos'])} sucessos, {len(resultados['erros'])} erros")
+        return resultados
+
+    def _enviar(self, payload: dict, classe: str, idempotency_key: Optional[str] = None) -> Future:
+        """
+        Envia o payload para a API, através do agendador quando configurado.
+        
+        Args:
+            payload (dict): Payload formatado para a API
+            classe (str): Classe de prioridade no agendador ('interativa' ou 'lote')
+            idempotency_key (str): Chave de idempotência a reutilizar (opcional)
+            
+        Returns:
+            Future: Resultado de _enviar_boleto (já concluído se não há agendador)
+        """
+        if self.agendador:
+            return self.agendador.submeter(self._enviar_boleto, payload, idempotency_key, classe=classe)
+
+        envio = Future()
+        try:
+            envio.set_result(self._enviar_boleto(payload, idempotency_key))
+        except Exception as e:
+            envio.set_exception(e)
+        return envio
+
+    def _concluir_linha(
+        self,
+        index,
+        row: pd.Series,
+        payload: dict,
+        idempotency_key: str,
+        envio: Future,
+        resultados: Dict[str, List[int]],
+        falhas: Optional[ArquivoFalhas]
+    ):
+        """
+        Aguarda o envio de uma linha do arquivo e registra o resultado.
+        
+        Args:
+            index: Índice da linha no DataFrame
+            row (pd.Series): Linha do DataFrame
+            payload (dict): Payload enviado
+            idempotency_key (str): Chave de idempotência usada no envio
+            envio (Future): Envio retornado por _enviar
+            resultados (dict): Linhas com sucesso e com erro
+            falhas (ArquivoFalhas): Arquivo de falhas (opcional)
+        """
+        try:
+            response = envio.result()
+            
+            logging.info(f"Boleto gerado com sucesso para {row['nome']}")
+            if self.debug:
+                logging.debug(f"Resposta completa: {response}")
+            resultados['sucessos'].append(index + 1)
+
+        except Exception as e:
+            logging.error(f"Erro ao processar linha {index + 1}: {str(e)}")
+            resultados['erros'].append(index + 1)
+            if falhas:
+                falhas.registrar(RegistroFalha.de_excecao(e, idempotency_key, linha=index + 1, payload=payload))
 
     def gerar_boleto_individual(self, dados: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -679,5 +947,48 @@ class GeradorBoletos:
         # Gera o payload
         payload = self._gerar_payload(row)
         
-        # Usa o método gerar_boleto existente
-        return self.gerar_boleto(payload) 
\ No newline at end of file
+        # Envia com prioridade sobre os lotes
+        return self._enviar(payload, classe='interativa').result()
+
+    def enfileirar_individual(self, dados: Dict[str, Any], fila: FilaEmissao) -> str:
+        """
+        Valida os dados e grava o payload na fila de emissão, sem chamar a API.
+        
+        Args:
+            dados (Dict[str, Any]): Dicionário com os dados do boleto
+            fila (FilaEmissao): Fila de emissão
+            
+        Returns:
+            str: Chave de idempotência da emissão
+        """
+        payload = self._gerar_payload(pd.Series(dados))
+        return fila.enfileirar(payload, classe='interativa')
+
+    def enfileirar_arquivo(self, excel_file: str, fila: FilaEmissao, duplicatas: str = 'sinalizar') -> Dict[str, int]:
+        """
+        Valida o arquivo Excel/CSV e grava os payloads na fila de emissão, sem chamar a API.
+        As duplicatas também são verificadas contra os itens já registrados na fila.
+        
+        Args:
+            excel_file (str): Caminho do arquivo Excel/CSV
+            fila (FilaEmissao): Fila de emissão
+            duplicatas (str): Tratamento de linhas duplicadas ('sinalizar', 'remover' ou 'ignorar')
+            
+        Returns:
+            Dict[str, int]: Quantidade de linhas enfileiradas e com erro
+        """
+        df = self._ler_arquivo(excel_file)
+        df = self._tratar_duplicatas(df, duplicatas, fila.payloads_registrados())
+
+        payloads = []
+        erros = 0
+        for index, row in df.iterrows():
+            try:
+                payloads.append(self._gerar_payload(row))
+            except Exception as e:
+                erros += 1
+                logging.error(f"Erro ao processar linha {index + 1}: {str(e)}")
+
+        fila.enfileirar_varios(payloads, classe='lote')
+        logging.info(f"{len(payloads)} boletos enfileirados em {fila.caminho} ({erros} linhas com erro)")
+        return {'enfileirados': len(payloads), 'erros': erros}
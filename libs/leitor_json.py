@@ -0,0 +1,140 @@
+"""
+Módulo responsável pela leitura incremental das listagens de boletos.
+O corpo da resposta é lido em blocos e cada boleto da lista é decodificado e
+entregue assim que chega, sem montar a resposta completa em memória; os
+demais campos do objeto (metadados de paginação) são guardados à parte.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+# Campos que podem conter a lista de boletos (vale o primeiro encontrado)
+CHAVES_LISTA = ('data', 'items', 'invoices')
+
+_decodificador = json.JSONDecoder()
+_ESPACOS = ' \t\n\r'
+
+
+class LeitorListagem:
+    """
+    Lê uma listagem JSON ({"data": [...], ...}, {"items": [...], ...} ou
+    [...]) a partir de blocos de bytes.
+
+    Depois de consumir itens(), chave_lista indica onde estava a lista (''
+    para uma lista na raiz, None se não foi encontrada) e metadados contém os
+    demais campos do objeto.
+    """
+
+    def __init__(self, partes: Iterable[bytes], tamanho_inicio: int = 1000):
+        """
+        Inicializa o leitor.
+
+        Args:
+            partes: Blocos do corpo da resposta (ex: response.iter_content())
+            tamanho_inicio (int): Caracteres guardados em inicio (prévia para debug)
+        """
+        self._partes = iter(partes)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._posicao = 0
+        self._fim = False
+        self._tamanho_inicio = tamanho_inicio
+        self.inicio = ''
+        self.chave_lista: Optional[str] = None
+        self.metadados: Dict[str, Any] = {}
+
+    def _ler(self) -> bool:
+        """Acrescenta o próximo bloco ao buffer (False no fim do corpo)"""
+        if self._fim:
+            return False
+        parte = next(self._partes, None)
+        if parte is None:
+            self._fim = True
+            texto = self._utf8.decode(b'', final=True)
+        else:
+            texto = self._utf8.decode(parte)
+        if len(self.inicio) < self._tamanho_inicio:
+            self.inicio += texto[:self._tamanho_inicio - len(self.inicio)]
+        # Descarta o que já foi lido antes de crescer o buffer
+        self._buffer = self._buffer[self._posicao:] + texto
+        self._posicao = 0
+        return parte is not None or bool(texto)
+
+    def _proximo(self) -> str:
+        """Próximo caractere que não é espaço, sem consumi-lo"""
+        while True:
+            while self._posicao < len(self._buffer) and self._buffer[self._posicao] in _ESPACOS:
+                self._posicao += 1
+            if self._posicao < len(self._buffer):
+                return self._buffer[self._posicao]
+            if not self._ler():
+                raise ValueError("Fim inesperado da listagem JSON")
+
+    def _esperar(self, caractere: str):
+        if self._proximo() != caractere:
+            raise ValueError(f"Listagem JSON inválida: esperado '{caractere}' na posição {self._posicao}")
+        self._posicao += 1
+
+    def _valor(self) -> Any:
+        """Decodifica o próximo valor JSON completo"""
+        self._proximo()
+        while True:
+            try:
+                valor, fim = _decodificador.raw_decode(self._buffer, self._posicao)
+            except json.JSONDecodeError:
+                if not self._ler():
+                    raise
+                continue
+            # Um número no fim do buffer pode continuar no próximo bloco
+            if fim == len(self._buffer) and self._ler():
+                continue
+            self._posicao = fim
+            return valor
+
+    def _lista(self) -> Iterator[Any]:
+        self._esperar('[')
+        if self._proximo() == ']':
+            self._posicao += 1
+            return
+        while True:
+            yield self._valor()
+            if self._proximo() == ']':
+                self._posicao += 1
+                return
+            self._esperar(',')
+
+    def itens(self) -> Iterator[Any]:
+        """
+        Boletos da lista, um por vez, na ordem da resposta.
+
+        Raises:
+            ValueError: Se o corpo não for um JSON válido
+        """
+        inicio = self._proximo()
+        if inicio == '[':
+            self.chave_lista = ''
+            yield from self._lista()
+            return
+        if inicio != '{':
+            raise ValueError("Listagem JSON deve ser um objeto ou uma lista")
+
+        self._posicao += 1
+        if self._proximo() == '}':
+            self._posicao += 1
+            return
+        while True:
+            chave = self._valor()
+            if not isinstance(chave, str):
+                raise ValueError("Listagem JSON inválida: chave não é texto")
+            self._esperar(':')
+            if self.chave_lista is None and chave in CHAVES_LISTA and self._proximo() == '[':
+                self.chave_lista = chave
+                yield from self._lista()
+            else:
+                self.metadados[chave] = self._valor()
+            if self._proximo() == '}':
+                self._posicao += 1
+                return
+            self._esperar(',')
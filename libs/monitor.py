@@ -0,0 +1,320 @@
+"""
+Módulo responsável pelo monitoramento de pagamentos por consulta periódica,
+para instalações sem webhook.
+Cada boleto em aberto fica em um heap ordenado pela próxima verificação, com
+intervalo que depende da distância até o vencimento: boletos perto do
+vencimento são consultados com frequência, e os distantes raramente. As
+verificações que vencem juntas são feitas em lote (obter_status_em_lote).
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .cache import STATUS_DEFINITIVOS
+
+
+# (dias até o vencimento a partir dos quais a faixa vale, intervalo em segundos),
+# da faixa mais distante para a mais próxima; dias negativos = vencido
+FAIXAS_INTERVALO: Tuple[Tuple[int, float], ...] = (
+    (31, 24 * 3600),    # vence em mais de um mês: uma vez por dia
+    (8, 12 * 3600),     # vence em 8 a 30 dias
+    (2, 4 * 3600),      # vence em 2 a 7 dias
+    (-1, 30 * 60),      # véspera, dia do vencimento e dia seguinte
+    (-7, 2 * 3600),     # vencido há até uma semana (pagamentos em atraso)
+    (-30, 12 * 3600),   # vencido há até um mês
+)
+INTERVALO_VENCIDO_HA_MUITO = 24 * 3600
+INTERVALO_SEM_VENCIMENTO = 6 * 3600
+INTERVALO_APOS_ERRO = 15 * 60
+
+
+def _data(valor) -> Optional[date]:
+    """Converte a data de vencimento (AAAA-MM-DD ou ISO) para date"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except ValueError:
+        return None
+
+
+def intervalo_verificacao(
+    vencimento,
+    hoje: Optional[date] = None,
+    faixas: Tuple[Tuple[int, float], ...] = FAIXAS_INTERVALO
+) -> float:
+    """
+    Intervalo até a próxima verificação de um boleto em aberto.
+
+    Args:
+        vencimento: Data de vencimento (date ou texto AAAA-MM-DD)
+        hoje (date): Data de referência (padrão: hoje)
+        faixas: Faixas de dias até o vencimento e seus intervalos
+
+    Returns:
+        float: Segundos até a próxima verificação
+    """
+    vencimento = _data(vencimento)
+    if vencimento is None:
+        return INTERVALO_SEM_VENCIMENTO
+    dias = (vencimento - (hoje or date.today())).days
+    for minimo_dias, intervalo in faixas:
+        if dias >= minimo_dias:
+            return intervalo
+    return INTERVALO_VENCIDO_HA_MUITO
+
+
+class MonitorPagamentos:
+    """
+    Consulta periodicamente o status dos boletos em aberto, priorizando os
+    próximos do vencimento. Pode ser executado em uma thread de fundo
+    (iniciar/parar) ou chamado diretamente com executar_pendentes().
+    """
+
+    def __init__(
+        self,
+        consulta,
+        ao_mudar: Optional[Callable[[str, Optional[str], str], None]] = None,
+        tamanho_lote: int = 100,
+        max_workers: int = 8,
+        faixas: Tuple[Tuple[int, float], ...] = FAIXAS_INTERVALO,
+        relogio: Callable[[], float] = time.time
+    ):
+        """
+        Inicializa o monitor.
+
+        Args:
+            consulta (ConsultaBoletos): Consulta usada nas verificações
+            ao_mudar: Função chamada com (invoice_id, status_anterior, status_novo)
+                quando o status de um boleto muda
+            tamanho_lote (int): Boletos verificados por chamada a obter_status_em_lote
+            max_workers (int): Consultas simultâneas em cada lote
+            faixas: Faixas de dias até o vencimento e seus intervalos
+            relogio: Função que retorna o instante atual (segundos)
+        """
+        self.consulta = consulta
+        self.ao_mudar = ao_mudar
+        self.tamanho_lote = tamanho_lote
+        self.max_workers = max_workers
+        self.faixas = faixas
+        self.relogio = relogio
+        self._heap: List[Tuple[float, int, str]] = []
+        self._boletos: Dict[str, Tuple[Optional[date], Optional[str], int]] = {}
+        self._sequencia = itertools.count()
+        self._lock = threading.Lock()
+        self._novo_boleto = threading.Event()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.verificacoes = 0
+        self.mudancas = 0
+        self.erros = 0
+
+    def adicionar(self, invoice_id: str, vencimento=None, status: Optional[str] = None, proxima: Optional[float] = None):
+        """
+        Passa a monitorar um boleto (ou reagenda um já monitorado).
+
+        Args:
+            invoice_id (str): ID do boleto
+            vencimento: Data de vencimento (date ou texto AAAA-MM-DD)
+            status (str): Status conhecido do boleto
+            proxima (float): Instante da primeira verificação (padrão: conforme o vencimento)
+        """
+        if status in STATUS_DEFINITIVOS:
+            return
+        vencimento = _data(vencimento)
+        if proxima is None:
+            proxima = self.relogio() + intervalo_verificacao(vencimento, faixas=self.faixas)
+        with self._lock:
+            self._agendar(invoice_id, vencimento, status, proxima)
+        self._novo_boleto.set()
+
+    def _agendar(self, invoice_id: str, vencimento: Optional[date], status: Optional[str], proxima: float):
+        # Entradas antigas do mesmo boleto ficam no heap e são descartadas pela sequência
+        sequencia = next(self._sequencia)
+        self._boletos[invoice_id] = (vencimento, status, sequencia)
+        heapq.heappush(self._heap, (proxima, sequencia, invoice_id))
+
+    def remover(self, invoice_id: str):
+        """Deixa de monitorar um boleto"""
+        with self._lock:
+            self._boletos.pop(invoice_id, None)
+
+    def carregar_boletos(self, boletos: Iterable[dict]) -> int:
+        """
+        Monitora os boletos em aberto de uma listagem (API ou espelho) ainda não monitorados.
+
+        Returns:
+            int: Quantidade de boletos adicionados
+        """
+        adicionados = 0
+        for boleto in boletos:
+            invoice_id = boleto.get('id')
+            if not invoice_id or boleto.get('status') in STATUS_DEFINITIVOS or invoice_id in self._boletos:
+                continue
+            due_date = boleto.get('due_date') or (boleto.get('payment_terms') or {}).get('due_date')
+            self.adicionar(invoice_id, due_date, boleto.get('status'))
+            adicionados += 1
+        return adicionados
+
+    def __contains__(self, invoice_id: str) -> bool:
+        return invoice_id in self._boletos
+
+    def total(self) -> int:
+        """Quantidade de boletos monitorados"""
+        return len(self._boletos)
+
+    def proxima_verificacao(self) -> Optional[float]:
+        """Instante da próxima verificação agendada (None se não houver boletos)"""
+        with self._lock:
+            self._descartar_obsoletos()
+            return self._heap[0][0] if self._heap else None
+
+    def _descartar_obsoletos(self):
+        while self._heap:
+            _, sequencia, invoice_id = self._heap[0]
+            registro = self._boletos.get(invoice_id)
+            if registro is not None and registro[2] == sequencia:
+                return
+            heapq.heappop(self._heap)
+
+    def _retirar_vencidos(self, agora: float) -> List[str]:
+        with self._lock:
+            ids = []
+            while len(ids) < self.tamanho_lote:
+                self._descartar_obsoletos()
+                if not self._heap or self._heap[0][0] > agora:
+                    break
+                ids.append(heapq.heappop(self._heap)[2])
+            return ids
+
+    def executar_pendentes(self) -> int:
+        """
+        Verifica, em lotes, todos os boletos cuja verificação já venceu.
+
+        Returns:
+            int: Quantidade de boletos verificados
+        """
+        verificados = 0
+        while True:
+            ids = self._retirar_vencidos(self.relogio())
+            if not ids:
+                return verificados
+            self._verificar_lote(ids)
+            verificados += len(ids)
+
+    def _verificar_lote(self, ids: List[str]):
+        # A verificação existe para buscar o status atualizado: o cache é
+        # ignorado na leitura e só é substituído pelas respostas obtidas, para
+        # que a aplicação web ainda tenha o que servir se a API estiver fora
+        sem_resposta = set(ids)
+        try:
+            for invoice_id, status, erro in self.consulta.obter_status_em_lote(
+                ids, max_workers=self.max_workers, usar_cache=False
+            ):
+                sem_resposta.discard(invoice_id)
+                self.verificacoes += 1
+                if erro is not None:
+                    self.erros += 1
+                    logging.warning(f"Erro ao verificar pagamento do boleto {invoice_id}: {str(erro)}")
+                    self._reagendar_apos_erro(invoice_id)
+                else:
+                    self._aplicar_status(invoice_id, status)
+        finally:
+            # Boletos sem resposta (lote interrompido) voltam para o heap
+            for invoice_id in sem_resposta:
+                self._reagendar_apos_erro(invoice_id)
+
+    def _reagendar_apos_erro(self, invoice_id: str):
+        with self._lock:
+            registro = self._boletos.get(invoice_id)
+            if registro is not None:
+                vencimento, status, _ = registro
+                intervalo = min(INTERVALO_APOS_ERRO, intervalo_verificacao(vencimento, faixas=self.faixas))
+                self._agendar(invoice_id, vencimento, status, self.relogio() + intervalo)
+
+    def _aplicar_status(self, invoice_id: str, status: Optional[str]):
+        with self._lock:
+            registro = self._boletos.get(invoice_id)
+        if registro is None:
+            return
+        vencimento, status_anterior, _ = registro
+
+        if status != status_anterior:
+            self._registrar_mudanca(invoice_id, status_anterior, status)
+
+        with self._lock:
+            if status in STATUS_DEFINITIVOS:
+                self._boletos.pop(invoice_id, None)
+            else:
+                proxima = self.relogio() + intervalo_verificacao(vencimento, faixas=self.faixas)
+                self._agendar(invoice_id, vencimento, status, proxima)
+
+    def _registrar_mudanca(self, invoice_id: str, status_anterior: Optional[str], status: str):
+        self.mudancas += 1
+        logging.info(f"Boleto {invoice_id}: {status_anterior} -> {status}")
+
+        espelho = getattr(self.consulta, 'espelho', None)
+        if espelho is not None:
+            boleto = espelho.obter(invoice_id)
+            if boleto is not None:
+                # Apenas o status: o updated_at continua o da Cora (marca da sincronização)
+                espelho.gravar([{**boleto, 'status': status}])
+
+        if self.ao_mudar is not None:
+            try:
+                self.ao_mudar(invoice_id, status_anterior, status)
+            except Exception as e:
+                logging.error(f"Erro no tratamento da mudança de status do boleto {invoice_id}: {str(e)}")
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Contadores do monitor.
+
+        Returns:
+            dict: monitorados, verificacoes, mudancas e erros
+        """
+        return {
+            'monitorados': self.total(),
+            'verificacoes': self.verificacoes,
+            'mudancas': self.mudancas,
+            'erros': self.erros,
+        }
+
+    def iniciar(self):
+        """Executa o monitor em uma thread de fundo"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name='cora-monitor', daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        """Interrompe a thread de fundo após o lote atual"""
+        self._parar.set()
+        self._novo_boleto.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        logging.info(f"Monitor de pagamentos iniciado com {self.total()} boletos")
+        while not self._parar.is_set():
+            try:
+                self.executar_pendentes()
+            except Exception as e:
+                logging.error(f"Erro no monitor de pagamentos: {str(e)}")
+
+            # Boletos adicionados durante a espera podem antecipar a próxima verificação
+            self._novo_boleto.clear()
+            proxima = self.proxima_verificacao()
+            espera = 60.0 if proxima is None else max(0.0, min(60.0, proxima - self.relogio()))
+            self._novo_boleto.wait(espera)
+        logging.info(f"Monitor de pagamentos finalizado: {self.estatisticas()}")
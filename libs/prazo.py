@@ -0,0 +1,133 @@
+"""
+Módulo responsável pelos tempos limite das chamadas à API da Cora.
+Cada operação tem tempos de conexão e de leitura próprios, e um prazo
+(deadline) definido na entrada — uma requisição da aplicação web ou um lote
+de emissão — vale para tudo o que é feito dentro dela: a renovação do token,
+a espera na fila e a chamada à API. Trabalho que já não pode terminar a tempo
+é abandonado com PrazoEsgotado em vez de ocupar uma thread.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import requests
+
+
+# Instante (time.monotonic) em que o prazo atual termina
+_prazo: ContextVar[Optional[float]] = ContextVar('cora_prazo', default=None)
+
+
+class PrazoEsgotado(requests.exceptions.Timeout):
+    """O prazo da requisição ou do lote terminou antes da chamada à API"""
+
+
+def definir_prazo(segundos: Optional[float]):
+    """
+    Define o prazo do contexto atual até encerrar_prazo(token), para quem não
+    pode usar um bloco `with` (ex: before_request do Flask). Um prazo interno
+    nunca estende o externo: vale o que terminar primeiro.
+
+    Args:
+        segundos (float): Tempo disponível (None = sem prazo próprio)
+
+    Returns:
+        Token a informar em encerrar_prazo
+    """
+    fim = _prazo.get()
+    if segundos is not None:
+        proprio = time.monotonic() + segundos
+        fim = proprio if fim is None else min(fim, proprio)
+    return _prazo.set(fim)
+
+
+def encerrar_prazo(token):
+    """Restaura o prazo anterior a definir_prazo"""
+    _prazo.reset(token)
+
+
+@contextmanager
+def com_prazo(segundos: Optional[float]) -> Iterator[None]:
+    """
+    Define o prazo das chamadas feitas dentro do bloco `with` (ver definir_prazo).
+
+    Args:
+        segundos (float): Tempo disponível (None = sem prazo próprio)
+    """
+    token = definir_prazo(segundos)
+    try:
+        yield
+    finally:
+        encerrar_prazo(token)
+
+
+def restante() -> Optional[float]:
+    """
+    Segundos que ainda restam no prazo atual.
+
+    Returns:
+        float: Tempo restante (pode ser negativo), ou None sem prazo
+    """
+    fim = _prazo.get()
+    return None if fim is None else fim - time.monotonic()
+
+
+def verificar(operacao: str = 'a operação'):
+    """
+    Abandona a operação se o prazo atual já terminou.
+
+    Args:
+        operacao (str): Descrição usada na mensagem de erro
+
+    Raises:
+        PrazoEsgotado: Se não resta tempo
+    """
+    tempo = restante()
+    if tempo is not None and tempo <= 0:
+        raise PrazoEsgotado(f"Prazo esgotado antes de {operacao}")
+
+
+@dataclass(frozen=True)
+class TemposLimite:
+    """Tempos limite, em segundos, de uma operação na API"""
+    conexao: float = 5.0
+    leitura: float = 30.0
+
+    @classmethod
+    def de_config(cls, config: Optional[Dict[str, Any]]) -> Optional['TemposLimite']:
+        """
+        Cria os tempos limite a partir da seção tempos_limite do config.
+
+        Args:
+            config (dict): Seção tempos_limite (conexao e leitura, em segundos)
+
+        Returns:
+            TemposLimite: Tempos configurados, ou None sem a seção (cada
+                componente usa o seu padrão)
+        """
+        if not config or ('conexao' not in config and 'leitura' not in config):
+            return None
+        return cls(conexao=config.get('conexao', cls.conexao), leitura=config.get('leitura', cls.leitura))
+
+    def para_requisicao(self, operacao: str = 'a operação') -> Tuple[float, float]:
+        """
+        Argumento timeout do requests, reduzido ao que resta do prazo atual.
+        O tempo de leitura vale para cada leitura do socket, então uma resposta
+        que chega aos poucos pode ultrapassar o prazo em até um intervalo.
+
+        Args:
+            operacao (str): Descrição usada na mensagem de erro
+
+        Returns:
+            tuple: (conexão, leitura)
+
+        Raises:
+            PrazoEsgotado: Se o prazo atual já terminou
+        """
+        verificar(operacao)
+        tempo = restante()
+        if tempo is None:
+            return (self.conexao, self.leitura)
+        return (min(self.conexao, tempo), min(self.leitura, tempo))
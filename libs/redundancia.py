@@ -0,0 +1,190 @@
+"""
+Módulo responsável pelas requisições redundantes (hedged requests) das
+consultas idempotentes. Se a resposta não chega dentro da latência usual
+(percentil 95 das últimas consultas), uma segunda requisição idêntica é
+disparada e vale a que responder primeiro; a proporção de requisições extras
+é limitada por taxa_maxima.
+"""
+
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from .prazo import PrazoEsgotado, restante
+
+
+class RequisicoesRedundantes:
+    """
+    Executa uma consulta idempotente e, se ela demorar além do percentil
+    observado, dispara uma cópia e devolve o primeiro resultado.
+    Seguro para uso por várias threads.
+    """
+
+    def __init__(
+        self,
+        percentil: float = 0.95,
+        taxa_maxima: float = 0.05,
+        atraso_inicial: float = 1.0,
+        atraso_minimo: float = 0.05,
+        amostras: int = 500,
+        amostras_minimas: int = 20,
+        max_workers: int = 10
+    ):
+        """
+        Inicializa a política de redundância.
+
+        Args:
+            percentil (float): Percentil das latências observadas após o qual a
+                cópia é disparada (ex: 0.95)
+            taxa_maxima (float): Proporção máxima de consultas com cópia (ex: 0.05)
+            atraso_inicial (float): Segundos de espera antes da cópia enquanto
+                não há amostras_minimas latências observadas
+            atraso_minimo (float): Menor espera, em segundos, antes da cópia
+            amostras (int): Latências mais recentes usadas no percentil
+            amostras_minimas (int): Latências necessárias para usar o percentil
+            max_workers (int): Requisições em andamento simultâneas (originais e
+                cópias); acompanhe o pool_maxsize da sessão
+
+        Raises:
+            ValueError: Se percentil ou taxa_maxima estiverem fora do intervalo de 0 a 1
+        """
+        if not 0 < percentil <= 1:
+            raise ValueError(f"percentil deve estar entre 0 e 1: {percentil}")
+        if not 0 <= taxa_maxima <= 1:
+            raise ValueError(f"taxa_maxima deve estar entre 0 e 1: {taxa_maxima}")
+        self.percentil = percentil
+        self.taxa_maxima = taxa_maxima
+        self.atraso_inicial = atraso_inicial
+        self.atraso_minimo = atraso_minimo
+        self.amostras_minimas = amostras_minimas
+        self._latencias = deque(maxlen=amostras)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cora-redundancia')
+        self.consultas = 0
+        self.redundantes = 0
+        self.vencidas_pela_copia = 0
+        self.descartadas_por_taxa = 0
+
+    def atraso(self) -> float:
+        """
+        Segundos de espera pela resposta antes de disparar a cópia.
+
+        Returns:
+            float: Percentil das latências observadas (ou atraso_inicial)
+        """
+        with self._lock:
+            if len(self._latencias) < self.amostras_minimas:
+                return self.atraso_inicial
+            ordenadas = sorted(self._latencias)
+        indice = min(len(ordenadas) - 1, math.ceil(self.percentil * len(ordenadas)) - 1)
+        return max(self.atraso_minimo, ordenadas[indice])
+
+    def _registrar(self, latencia: float):
+        with self._lock:
+            self._latencias.append(latencia)
+
+    def _pode_duplicar(self) -> bool:
+        """Reserva uma cópia se a proporção de cópias permitir"""
+        with self._lock:
+            if self.redundantes + 1 > self.taxa_maxima * self.consultas:
+                self.descartadas_por_taxa += 1
+                return False
+            self.redundantes += 1
+            return True
+
+    def _cronometrar(self, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        inicio = time.monotonic()
+        resultado = funcao(*args, **kwargs)
+        self._registrar(time.monotonic() - inicio)
+        return resultado
+
+    def _submeter(self, funcao: Callable[..., Any], *args, **kwargs):
+        # A requisição roda no contexto de quem consulta (incluindo o prazo)
+        return self._executor.submit(contextvars.copy_context().run, self._cronometrar, funcao, *args, **kwargs)
+
+    @staticmethod
+    def _resultado(futuro) -> Any:
+        """Resultado do futuro, aguardando no máximo até o fim do prazo atual"""
+        tempo = restante()
+        concluidas, _ = wait([futuro], timeout=None if tempo is None else max(0.0, tempo))
+        if not concluidas:
+            raise PrazoEsgotado("Prazo esgotado aguardando a consulta")
+        return futuro.result()
+
+    def executar(self, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa funcao(*args, **kwargs), disparando uma cópia se a resposta
+        demorar. A função deve ser idempotente (ex: um GET).
+
+        Args:
+            funcao: Função que faz a requisição
+
+        Returns:
+            Resultado da primeira execução concluída com sucesso
+
+        Raises:
+            Exception: A exceção da primeira execução, se nenhuma tiver sucesso
+            PrazoEsgotado: Se o prazo atual terminar antes de uma resposta; as
+                requisições em andamento terminam em segundo plano
+        """
+        with self._lock:
+            self.consultas += 1
+        atraso = self.atraso()
+
+        tempo = restante()
+        original = self._submeter(funcao, *args, **kwargs)
+        concluidas, _ = wait([original], timeout=atraso if tempo is None else max(0.0, min(atraso, tempo)))
+        if concluidas:
+            return original.result()
+        if (tempo is not None and tempo <= atraso) or not self._pode_duplicar():
+            return self._resultado(original)
+
+        logging.debug(f"Sem resposta em {atraso:.3f}s, disparando requisição redundante")
+        copia = self._submeter(funcao, *args, **kwargs)
+        pendentes = {original, copia}
+        erro: Optional[BaseException] = None
+        while pendentes:
+            tempo = restante()
+            concluidas, pendentes = wait(
+                pendentes, timeout=None if tempo is None else max(0.0, tempo), return_when=FIRST_COMPLETED
+            )
+            if not concluidas:
+                raise PrazoEsgotado("Prazo esgotado aguardando a consulta")
+            for futuro in (original, copia):
+                if futuro not in concluidas:
+                    continue
+                if futuro.exception() is None:
+                    if futuro is copia:
+                        with self._lock:
+                            self.vencidas_pela_copia += 1
+                    # A requisição mais lenta termina em segundo plano e é descartada
+                    return futuro.result()
+                erro = erro or futuro.exception()
+        raise erro
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores das consultas.
+
+        Returns:
+            dict: consultas, redundantes, vencidas_pela_copia,
+                descartadas_por_taxa e atraso atual (segundos)
+        """
+        atraso = self.atraso()
+        with self._lock:
+            return {
+                'consultas': self.consultas,
+                'redundantes': self.redundantes,
+                'vencidas_pela_copia': self.vencidas_pela_copia,
+                'descartadas_por_taxa': self.descartadas_por_taxa,
+                'atraso': atraso,
+            }
+
+    def encerrar(self):
+        """Encerra as threads das requisições (sem aguardar as pendentes)"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,158 @@
+"""
+Módulo responsável pelo resumo compacto dos boletos das listagens.
+Um ResumoBoleto guarda apenas os campos usados na busca por CPF/CNPJ, no
+espelho local e no monitor, em atributos (__slots__) em vez de dicionários
+aninhados, e pode ser lido como um boleto da API (boleto.get('customer')).
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def _documento(customer: Any) -> Optional[str]:
+    """CPF/CNPJ do cliente, apenas dígitos"""
+    documento = customer.get('document') if isinstance(customer, Mapping) else None
+    if isinstance(documento, Mapping):
+        documento = documento.get('identity')
+    if not documento:
+        return None
+    return ''.join(c for c in str(documento) if c.isdigit()) or None
+
+
+# Chaves da API guardadas diretamente em um atributo de mesmo nome
+_CAMPOS_DIRETOS = frozenset((
+    'id', 'code', 'status', 'amount', 'due_date', 'occurrence_date', 'created_at', 'updated_at',
+))
+
+
+class ResumoBoleto(Mapping):
+    """
+    Resumo de um boleto (id, código, status, valor, vencimento, pagamento,
+    cliente, serviços e datas).
+
+    Como Mapping, expõe as chaves da API (customer, payment_terms, services,
+    etc.), montadas a partir dos campos guardados; dict(resumo) produz o
+    boleto resumido no formato da API.
+    """
+
+    __slots__ = (
+        'id', 'code', 'status', 'amount', 'due_date', 'occurrence_date',
+        'nome_cliente', 'documento', 'descricoes', 'created_at', 'updated_at',
+    )
+
+    def __init__(
+        self,
+        id: str,
+        code: Optional[str] = None,
+        status: Optional[str] = None,
+        amount: Optional[int] = None,
+        due_date: Optional[str] = None,
+        occurrence_date: Optional[str] = None,
+        nome_cliente: Optional[str] = None,
+        documento: Optional[str] = None,
+        descricoes: Tuple[str, ...] = (),
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None
+    ):
+        self.id = id
+        self.code = code
+        self.status = status
+        self.amount = amount
+        self.due_date = due_date
+        self.occurrence_date = occurrence_date
+        self.nome_cliente = nome_cliente
+        self.documento = documento
+        self.descricoes = tuple(descricoes)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def de_boleto(cls, boleto: Mapping) -> 'ResumoBoleto':
+        """
+        Resume um boleto no formato da API.
+
+        Args:
+            boleto: Boleto da listagem, da consulta por ID ou de um webhook
+
+        Returns:
+            ResumoBoleto: Resumo (o próprio boleto, se já for um resumo)
+        """
+        if isinstance(boleto, cls):
+            return boleto
+        customer = boleto.get('customer') or {}
+        due_date = boleto.get('due_date')
+        if not due_date:
+            payment_terms = boleto.get('payment_terms') or {}
+            if isinstance(payment_terms, Mapping):
+                due_date = payment_terms.get('due_date')
+        descricoes = []
+        for servico in boleto.get('services') or []:
+            descricao = servico.get('description', '') or servico.get('name', '')
+            if descricao:
+                descricoes.append(descricao)
+        return cls(
+            id=boleto.get('id'),
+            code=boleto.get('code'),
+            status=boleto.get('status'),
+            amount=boleto.get('amount', boleto.get('total_amount')),
+            due_date=due_date,
+            occurrence_date=boleto.get('occurrence_date'),
+            nome_cliente=customer.get('name') if isinstance(customer, Mapping) else None,
+            documento=_documento(customer),
+            descricoes=tuple(descricoes),
+            created_at=boleto.get('created_at'),
+            updated_at=boleto.get('updated_at'),
+        )
+
+    def para_lista(self) -> List[Any]:
+        """Campos em uma lista (forma compacta para JSON)"""
+        return [getattr(self, campo) for campo in self.__slots__]
+
+    @classmethod
+    def de_lista(cls, valores: Sequence[Any]) -> 'ResumoBoleto':
+        """Recria um resumo a partir de para_lista()"""
+        return cls(*valores)
+
+    def _campos(self) -> Dict[str, Any]:
+        customer = {}
+        if self.nome_cliente is not None:
+            customer['name'] = self.nome_cliente
+        if self.documento is not None:
+            customer['document'] = self.documento
+        campos = {
+            'id': self.id,
+            'code': self.code,
+            'status': self.status,
+            'amount': self.amount,
+            'due_date': self.due_date,
+            'payment_terms': {'due_date': self.due_date} if self.due_date else None,
+            'occurrence_date': self.occurrence_date,
+            'customer': customer or None,
+            'services': [{'description': descricao} for descricao in self.descricoes] or None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+        return {chave: valor for chave, valor in campos.items() if valor is not None}
+
+    def __getitem__(self, chave: str) -> Any:
+        if chave in _CAMPOS_DIRETOS:
+            valor = getattr(self, chave)
+            if valor is None:
+                raise KeyError(chave)
+            return valor
+        return self._campos()[chave]
+
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        if chave in _CAMPOS_DIRETOS:
+            valor = getattr(self, chave)
+            return padrao if valor is None else valor
+        return self._campos().get(chave, padrao)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._campos())
+
+    def __len__(self) -> int:
+        return len(self._campos())
+
+    def __repr__(self) -> str:
+        return f"ResumoBoleto(id={self.id!r}, status={self.status!r}, due_date={self.due_date!r})"
@@ -0,0 +1,225 @@
+"""
+Módulo responsável pelo transporte HTTP das chamadas à API da Cora.
+Mantém conexões mTLS reutilizáveis (keep-alive) entre requisições, evitando
+um novo handshake TLS a cada boleto emitido ou consultado.
+
+Com http2=True (requer httpx[http2]), as requisições simultâneas são
+multiplexadas em poucas conexões HTTP/2; sem o pacote, ou quando o servidor
+não negocia HTTP/2, o transporte continua em HTTP/1.1.
+"""
+
+import json
+import logging
+import ssl
+import threading
+from importlib.util import find_spec
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # Opcional: pip install "httpx[http2]"
+    httpx = None
+
+
+def http2_disponivel() -> bool:
+    """
+    Verifica se o transporte HTTP/2 pode ser usado.
+
+    Returns:
+        bool: True se httpx e h2 estão instalados
+    """
+    return httpx is not None and find_spec('h2') is not None
+
+
+def criar_sessao(pool_maxsize: int = 10, http2: bool = False) -> Union[requests.Session, 'SessaoHttp2']:
+    """
+    Cria uma sessão HTTP com pool de conexões.
+
+    Args:
+        pool_maxsize (int): Conexões mantidas abertas por host; deve acompanhar
+            a quantidade de threads que usam a sessão simultaneamente
+        http2 (bool): Usar HTTP/2 quando disponível (ver http2_disponivel)
+
+    Returns:
+        requests.Session ou SessaoHttp2: Sessão pronta para uso
+    """
+    if http2:
+        if http2_disponivel():
+            return SessaoHttp2(max_conexoes=pool_maxsize)
+        logging.warning('HTTP/2 requer o pacote "httpx[http2]"; usando HTTP/1.1')
+
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    return sessao
+
+
+def _tempo_limite(timeout) -> 'httpx.Timeout':
+    """Converte o timeout do requests (número ou (conexão, leitura)) para o httpx"""
+    if isinstance(timeout, tuple):
+        conexao, leitura = timeout
+        return httpx.Timeout(connect=conexao, read=leitura, write=leitura, pool=conexao)
+    return httpx.Timeout(timeout)
+
+
+def _erro_requests(erro: Exception) -> requests.exceptions.RequestException:
+    """Exceção do requests equivalente a um erro do httpx"""
+    if isinstance(erro, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(str(erro))
+    if isinstance(erro, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(str(erro))
+    if isinstance(erro, (httpx.ConnectError, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return requests.exceptions.ConnectionError(str(erro))
+    return requests.exceptions.RequestException(str(erro))
+
+
+class RespostaHttp2:
+    """
+    Resposta do httpx com a interface do requests.Response usada pelo pacote
+    (status_code, reason, headers, content, text, json, iter_content, close).
+    """
+
+    def __init__(self, resposta: 'httpx.Response'):
+        self._resposta = resposta
+        self.status_code = resposta.status_code
+        self.reason = resposta.reason_phrase
+        self.headers = resposta.headers
+        self.url = str(resposta.url)
+        self.http_version = resposta.http_version
+
+    def _ler(self):
+        try:
+            self._resposta.read()
+        except httpx.HTTPError as e:
+            raise _erro_requests(e) from e
+
+    @property
+    def content(self) -> bytes:
+        self._ler()
+        return self._resposta.content
+
+    @property
+    def text(self) -> str:
+        self._ler()
+        return self._resposta.text
+
+    def json(self, **kwargs) -> Any:
+        """
+        Raises:
+            requests.exceptions.JSONDecodeError: Se o corpo não for JSON
+        """
+        try:
+            return json.loads(self.content, **kwargs)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+    def iter_content(self, chunk_size: Optional[int] = 1) -> Iterator[bytes]:
+        """Blocos do corpo à medida que chegam (respostas com stream=True)"""
+        try:
+            yield from self._resposta.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise _erro_requests(e) from e
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response=self)
+
+    def close(self):
+        self._resposta.close()
+
+
+class SessaoHttp2:
+    """
+    Sessão HTTP/2 sobre httpx com a interface do requests.Session usada pelo
+    pacote (get/post com cert, verify, timeout e stream). Erros do httpx são
+    convertidos nas exceções equivalentes do requests.
+
+    Um cliente é criado por certificado mTLS; cada cliente multiplexa as
+    requisições simultâneas ao mesmo host em uma conexão (HTTP/1.1 quando o
+    servidor não negocia HTTP/2). Seguro para uso por várias threads.
+    """
+
+    def __init__(self, max_conexoes: int = 10):
+        """
+        Inicializa a sessão.
+
+        Args:
+            max_conexoes (int): Conexões abertas por cliente (em HTTP/1.1, uma
+                por requisição simultânea; em HTTP/2, raramente mais de uma)
+        """
+        self.max_conexoes = max_conexoes
+        self._clientes: Dict[Tuple, 'httpx.Client'] = {}
+        self._lock = threading.Lock()
+
+    def _novo_cliente(self, cert: Optional[Tuple[str, str]], verify) -> 'httpx.Client':
+        if verify is False:
+            contexto = ssl.create_default_context()
+            contexto.check_hostname = False
+            contexto.verify_mode = ssl.CERT_NONE
+        else:
+            contexto = ssl.create_default_context(cafile=verify if isinstance(verify, str) else requests.certs.where())
+        if cert:
+            contexto.load_cert_chain(*cert)
+        return httpx.Client(
+            http2=True,
+            verify=contexto,
+            limits=httpx.Limits(max_connections=self.max_conexoes, max_keepalive_connections=self.max_conexoes),
+        )
+
+    def _cliente(self, cert, verify) -> 'httpx.Client':
+        chave = (tuple(cert) if cert else None, verify)
+        with self._lock:
+            cliente = self._clientes.get(chave)
+            if cliente is None:
+                cliente = self._clientes[chave] = self._novo_cliente(cert, verify)
+            return cliente
+
+    def request(
+        self,
+        metodo: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        cert: Optional[Tuple[str, str]] = None,
+        verify: Union[bool, str] = True,
+        timeout=None,
+        stream: bool = False
+    ) -> RespostaHttp2:
+        """
+        Faz uma requisição (mesmos argumentos do requests.Session.request).
+
+        Returns:
+            RespostaHttp2: Resposta com a interface do requests.Response
+
+        Raises:
+            requests.exceptions.RequestException: Em caso de erro na requisição
+        """
+        cliente = self._cliente(cert, verify)
+        try:
+            requisicao = cliente.build_request(
+                metodo, url, params=params, headers=headers, json=json, data=data,
+                timeout=_tempo_limite(timeout)
+            )
+            resposta = cliente.send(requisicao, stream=stream)
+        except httpx.HTTPError as e:
+            raise _erro_requests(e) from e
+        return RespostaHttp2(resposta)
+
+    def get(self, url: str, **kwargs) -> RespostaHttp2:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> RespostaHttp2:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Fecha as conexões de todos os clientes"""
+        with self._lock:
+            clientes, self._clientes = list(self._clientes.values()), {}
+        for cliente in clientes:
+            cliente.close()
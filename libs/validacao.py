@@ -0,0 +1,258 @@
+"""
+Módulo responsável por validar arquivos de boletos sem acessar a API (dry-run).
+Aplica as mesmas regras de CustomerDocument, CustomerAddress, Customer, Service,
+Interest e Fine de forma vetorizada sobre o DataFrame inteiro e retorna um
+relatório agregado por tipo de erro.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .duplicatas import normalizar_vencimento
+
+
+# Mesmo padrão usado em Customer._validar_email
+PADRAO_EMAIL = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+COLUNAS_OBRIGATORIAS = [
+    'codigo', 'nome', 'email', 'documento',
+    'servico_nome', 'servico_descricao', 'valor', 'data_vencimento'
+]
+COLUNAS_ENDERECO = ['rua', 'numero', 'bairro', 'cidade', 'estado', 'cep']
+
+PESOS_CPF_1 = np.arange(10, 1, -1)
+PESOS_CPF_2 = np.arange(11, 1, -1)
+PESOS_CNPJ_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+PESOS_CNPJ_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+
+@dataclass
+class RelatorioValidacao:
+    """Relatório agregado da validação de um arquivo de boletos"""
+    total_linhas: int
+    erros: Dict[str, List[int]] = field(default_factory=dict)
+    avisos: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def valido(self) -> bool:
+        """Indica se nenhuma linha tem erro"""
+        return not self.erros
+
+    @property
+    def linhas_invalidas(self) -> List[int]:
+        """Índices (do DataFrame) das linhas com pelo menos um erro"""
+        linhas = set()
+        for indices in self.erros.values():
+            linhas.update(indices)
+        return sorted(linhas)
+
+    def contagem_erros(self) -> Dict[str, int]:
+        """Quantidade de linhas por tipo de erro"""
+        return {tipo: len(indices) for tipo, indices in self.erros.items()}
+
+    def contagem_avisos(self) -> Dict[str, int]:
+        """Quantidade de linhas por tipo de aviso"""
+        return {tipo: len(indices) for tipo, indices in self.avisos.items()}
+
+    def resumo(self, max_linhas: int = 10) -> str:
+        """
+        Gera um resumo legível do relatório.
+
+        Args:
+            max_linhas (int): Máximo de linhas listadas por tipo de erro
+
+        Returns:
+            str: Resumo com contagens e números das linhas (base 1)
+        """
+        partes = [
+            f"Linhas: {self.total_linhas} | "
+            f"Inválidas: {len(self.linhas_invalidas)}"
+        ]
+        for titulo, grupo in (('Erro', self.erros), ('Aviso', self.avisos)):
+            for tipo, indices in sorted(grupo.items()):
+                linhas = ', '.join(str(i + 1) for i in indices[:max_linhas])
+                if len(indices) > max_linhas:
+                    linhas += ', ...'
+                partes.append(f"{titulo} {tipo}: {len(indices)} (linhas {linhas})")
+        return '\n'.join(partes)
+
+
+def _texto(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Equivalente vetorizado de str(row[coluna]).strip()"""
+    return df[coluna].astype(str).str.strip()
+
+
+def _converter_valores(serie: pd.Series) -> pd.Series:
+    """
+    Equivalente vetorizado de GeradorBoletos._formatar_valor_monetario.
+    Valores que não podem ser convertidos resultam em NaN.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+
+    texto = serie.astype(str).str.replace('R$', '', regex=False).str.replace(' ', '', regex=False)
+    tem_virgula = texto.str.contains(',', regex=False)
+    tem_ponto = texto.str.contains('.', regex=False)
+    ambos = tem_virgula & tem_ponto
+    brasileiro = ambos & (texto.str.find(',') > texto.str.find('.'))
+    americano = ambos & ~brasileiro
+
+    normalizado = texto.str.replace(',', '.', regex=False)
+    normalizado[brasileiro] = (
+        texto[brasileiro].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    )
+    normalizado[americano] = texto[americano].str.replace(',', '', regex=False)
+
+    # Números já presentes em colunas mistas são aproveitados diretamente
+    numeros = serie.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool))
+    valores = pd.to_numeric(normalizado, errors='coerce')
+    valores[numeros] = serie[numeros].astype(float)
+    return valores
+
+
+def _digitos_verificadores_validos(documentos: pd.Series, pesos1, pesos2) -> np.ndarray:
+    """
+    Valida os dígitos verificadores de CPFs ou CNPJs de mesmo tamanho.
+
+    Args:
+        documentos (pd.Series): Documentos só com dígitos, todos do mesmo tamanho
+        pesos1: Pesos do primeiro dígito verificador
+        pesos2: Pesos do segundo dígito verificador
+
+    Returns:
+        np.ndarray: Máscara booleana com os documentos válidos
+    """
+    if documentos.empty:
+        return np.zeros(0, dtype=bool)
+
+    tamanho = len(pesos2) + 1
+    digitos = (
+        np.frombuffer(''.join(documentos).encode('ascii'), dtype=np.uint8)
+        .reshape(-1, tamanho)
+        .astype(np.int64) - 48
+    )
+
+    resto1 = (digitos[:, :tamanho - 2] @ pesos1) % 11
+    digito1 = np.where(resto1 < 2, 0, 11 - resto1)
+    resto2 = (digitos[:, :tamanho - 1] @ pesos2) % 11
+    digito2 = np.where(resto2 < 2, 0, 11 - resto2)
+
+    repetidos = (digitos == digitos[:, :1]).all(axis=1)
+    return (
+        (digitos[:, -2] == digito1)
+        & (digitos[:, -1] == digito2)
+        & ~repetidos
+    )
+
+
+def validar_dataframe(
+    df: pd.DataFrame,
+    juros_padrao: float = 1.0,
+    multa_padrao: float = 5.0
+) -> RelatorioValidacao:
+    """
+    Valida todas as linhas de um DataFrame de boletos sem acessar a rede.
+
+    Diferente de GeradorBoletos._gerar_payload, que para no primeiro erro, aqui
+    todas as regras são avaliadas para cada linha.
+
+    Args:
+        df (pd.DataFrame): Dados lidos do arquivo Excel/CSV
+        juros_padrao (float): Juros mensal usado quando a coluna não existe
+        multa_padrao (float): Multa (em reais) usada quando a coluna não existe
+
+    Returns:
+        RelatorioValidacao: Contagens e índices das linhas por tipo de erro
+    """
+    relatorio = RelatorioValidacao(total_linhas=len(df))
+    indices = df.index
+
+    def registrar(grupo: Dict[str, List[int]], tipo: str, mascara):
+        selecionados = indices[np.asarray(mascara, dtype=bool)]
+        if len(selecionados):
+            grupo[tipo] = selecionados.tolist()
+
+    ausentes = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    for coluna in ausentes:
+        registrar(relatorio.erros, f"coluna_ausente:{coluna}", np.ones(len(df), dtype=bool))
+
+    # Documento (CustomerDocument)
+    if 'documento' in df.columns:
+        documentos = (
+            df['documento'].astype(str)
+            .str.replace('.', '', regex=False)
+            .str.replace('-', '', regex=False)
+            .str.replace('/', '', regex=False)
+        )
+        tamanhos = documentos.str.len()
+        apenas_digitos = documentos.str.isdigit() & documentos.str.isascii()
+
+        registrar(relatorio.erros, 'documento_tamanho', ~tamanhos.isin([11, 14]))
+
+        for tamanho, tipo, pesos1, pesos2 in (
+            (11, 'cpf_invalido', PESOS_CPF_1, PESOS_CPF_2),
+            (14, 'cnpj_invalido', PESOS_CNPJ_1, PESOS_CNPJ_2),
+        ):
+            candidatos = tamanhos == tamanho
+            invalidos = candidatos & ~apenas_digitos
+            verificaveis = candidatos & apenas_digitos
+            validos = _digitos_verificadores_validos(documentos[verificaveis], pesos1, pesos2)
+            invalidos[verificaveis] = ~validos
+            registrar(relatorio.erros, tipo, invalidos)
+
+    # Cliente (Customer)
+    if 'nome' in df.columns:
+        registrar(relatorio.erros, 'nome_obrigatorio', _texto(df, 'nome') == '')
+    if 'email' in df.columns:
+        emails_validos = _texto(df, 'email').str.match(PADRAO_EMAIL)
+        registrar(relatorio.erros, 'email_invalido', ~emails_validos)
+
+    # Endereço (CustomerAddress), apenas quando todas as colunas existem
+    if all(c in df.columns for c in COLUNAS_ENDERECO):
+        for coluna, tipo in (
+            ('rua', 'rua_obrigatoria'),
+            ('numero', 'numero_obrigatorio'),
+            ('cidade', 'cidade_obrigatoria'),
+            ('estado', 'estado_obrigatorio'),
+        ):
+            registrar(relatorio.erros, tipo, _texto(df, coluna) == '')
+
+        ceps = _texto(df, 'cep').str.replace('-', '', regex=False).str.replace('.', '', regex=False)
+        ceps_validos = (ceps.str.len() == 8) & ceps.str.isdigit() & ceps.str.isascii()
+        registrar(relatorio.erros, 'cep_invalido', ~ceps_validos)
+
+    # Serviço (Service)
+    if 'servico_nome' in df.columns:
+        registrar(relatorio.erros, 'servico_nome_obrigatorio', _texto(df, 'servico_nome') == '')
+    if 'servico_descricao' in df.columns:
+        registrar(relatorio.erros, 'servico_descricao_obrigatoria', _texto(df, 'servico_descricao') == '')
+    if 'valor' in df.columns:
+        valores = _converter_valores(df['valor'])
+        registrar(relatorio.erros, 'valor_invalido', ~(valores > 0))
+
+    # Juros (Interest), convertido com float() na emissão
+    if 'juros_mensal' in df.columns:
+        juros = pd.to_numeric(df['juros_mensal'].astype(str).str.strip(), errors='coerce')
+        nao_convertidos = juros.isna() & df['juros_mensal'].notna()
+        registrar(relatorio.erros, 'juros_invalido', (juros < 0) | (juros > 100) | nao_convertidos)
+    elif not 0 <= juros_padrao <= 100:
+        registrar(relatorio.erros, 'juros_invalido', np.ones(len(df), dtype=bool))
+
+    # Multa (Fine)
+    if 'multa' in df.columns:
+        multas = _converter_valores(df['multa'])
+        nao_convertidas = multas.isna() & df['multa'].notna()
+        registrar(relatorio.erros, 'multa_invalida', (multas < 0) | nao_convertidas)
+    elif multa_padrao < 0:
+        registrar(relatorio.erros, 'multa_invalida', np.ones(len(df), dtype=bool))
+
+    # Vencimento inválido ou no passado é ajustado para amanhã na emissão
+    if 'data_vencimento' in df.columns:
+        datas = pd.to_datetime(df['data_vencimento'].map(normalizar_vencimento), format='%Y-%m-%d', errors='coerce')
+        registrar(relatorio.avisos, 'data_vencimento_invalida', datas.isna())
+        registrar(relatorio.avisos, 'data_vencimento_passada', datas < pd.Timestamp.now().normalize())
+
+    return relatorio
@@ -0,0 +1,200 @@
+"""
+Módulo responsável pelos dados de exibição dos boletos (view models).
+Valor formatado, descrição dos serviços, vencimento e dados de pagamento são
+calculados uma vez por versão do boleto (ID, updated_at e status) e guardados
+em um cache LRU; exibições repetidas apenas renderizam o template.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .cache import BoletoBruto
+from .consulta import STATUS_PAGOS
+
+
+def formatar_valor(centavos) -> str:
+    """
+    Formata um valor em centavos no padrão brasileiro.
+
+    Args:
+        centavos: Valor em centavos
+
+    Returns:
+        str: Valor formatado (ex: R$ 1.234,56)
+    """
+    return f"R$ {centavos / 100.0:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def _descricao(boleto: Dict[str, Any]) -> str:
+    """Descrições dos serviços do boleto separadas por ' | '"""
+    descricoes = []
+    for servico in boleto.get('services') or []:
+        descricao = servico.get('description', '') or servico.get('name', '')
+        if descricao:
+            descricoes.append(descricao)
+    return ' | '.join(descricoes)
+
+
+def _vencimento(boleto: Dict[str, Any]) -> Optional[str]:
+    """Data de vencimento, que pode estar em payment_terms ou diretamente no boleto"""
+    due_date = boleto.get('due_date')
+    if not due_date:
+        payment_terms = boleto.get('payment_terms', {})
+        if payment_terms and isinstance(payment_terms, dict):
+            due_date = payment_terms.get('due_date')
+    return due_date
+
+
+def montar_visualizacao(boleto: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dados da página de visualização (/boleto/<id>) a partir do boleto completo.
+
+    Args:
+        boleto (dict): Boleto retornado pela consulta por ID
+
+    Returns:
+        dict: Dados do boleto prontos para o template
+    """
+    esta_pago = boleto.get('status') in STATUS_PAGOS
+
+    if 'amount' in boleto:
+        valor_formatado = formatar_valor(boleto['amount'])
+    elif 'total_amount' in boleto:
+        valor_formatado = formatar_valor(boleto['total_amount'])
+    else:
+        valor_formatado = ''
+
+    # Linha digitável, código de barras e URL do PDF vêm de payment_options.bank_slip
+    bank_slip = (boleto.get('payment_options') or {}).get('bank_slip') or {}
+    # PIX vem diretamente do boleto.pix.emv (não de payment_options)
+    pix = boleto.get('pix') or {}
+
+    return {
+        'id': boleto.get('id'),
+        'code': boleto.get('code'),
+        'status': boleto.get('status', 'UNKNOWN'),
+        'esta_pago': esta_pago,
+        'amount': boleto.get('amount'),
+        'valor_formatado': valor_formatado,
+        'due_date': _vencimento(boleto),
+        # Data de pagamento (se pago) - campo é 'occurrence_date'
+        'data_pagamento': boleto.get('occurrence_date') if esta_pago else None,
+        'descricao': _descricao(boleto),
+        'customer': boleto.get('customer', {}),
+        'payment_forms': boleto.get('payment_forms', []),
+        'linha_digitavel': bank_slip.get('digitable'),
+        'url_boleto_pdf': bank_slip.get('url'),
+        'barcode': bank_slip.get('barcode'),
+        'pix_emv': pix.get('emv'),
+        'created_at': boleto.get('created_at'),
+        'updated_at': boleto.get('updated_at'),
+    }
+
+
+def montar_item_listagem(boleto: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dados de um boleto na busca por CPF/CNPJ, usando apenas os dados da lista.
+
+    Args:
+        boleto (dict): Boleto retornado pela listagem da API (ou pelo espelho)
+
+    Returns:
+        dict: Dados do boleto prontos para o template
+    """
+    esta_pago = boleto.get('status', 'PENDING') in STATUS_PAGOS
+    return {
+        'id': boleto.get('id'),
+        'code': boleto.get('code'),
+        'status': boleto.get('status', 'PENDING'),
+        'esta_pago': esta_pago,
+        'due_date': _vencimento(boleto),
+        'data_pagamento': boleto.get('occurrence_date') if esta_pago else None,
+        'nome_cliente': (boleto.get('customer') or {}).get('name', ''),
+        'descricao': _descricao(boleto),
+        'created_at': boleto.get('created_at', ''),
+    }
+
+
+class CacheVisualizacoes:
+    """
+    Cache LRU dos dados de exibição por versão do boleto.
+    Seguro para uso por várias threads.
+    """
+
+    def __init__(self, tamanho_maximo: int = 4096):
+        """
+        Inicializa o cache.
+
+        Args:
+            tamanho_maximo (int): Quantidade máxima de dados de exibição guardados
+        """
+        if tamanho_maximo < 1:
+            raise ValueError(f"tamanho_maximo deve ser maior que zero: {tamanho_maximo}")
+        self.tamanho_maximo = tamanho_maximo
+        self._modelos: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _obter(self, chave: Optional[Tuple], montar: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        if chave is None:
+            # Sem updated_at não há como saber se o boleto mudou
+            return montar()
+        with self._lock:
+            modelo = self._modelos.get(chave)
+            if modelo is not None:
+                self._modelos.move_to_end(chave)
+                self.acertos += 1
+                return modelo
+            self.falhas += 1
+
+        modelo = montar()
+        with self._lock:
+            self._modelos[chave] = modelo
+            while len(self._modelos) > self.tamanho_maximo:
+                self._modelos.popitem(last=False)
+        return modelo
+
+    @staticmethod
+    def _versao(tipo: str, indice: Dict[str, Any]) -> Optional[Tuple]:
+        if not indice.get('id') or not indice.get('updated_at'):
+            return None
+        return (tipo, indice['id'], indice['updated_at'], indice.get('status'))
+
+    def visualizacao(self, boleto: BoletoBruto) -> Dict[str, Any]:
+        """
+        Dados da página de visualização; o JSON do boleto só é decodificado
+        quando a versão ainda não está no cache.
+
+        Args:
+            boleto (BoletoBruto): Boleto retornado por consultar_boleto_bruto
+
+        Returns:
+            dict: Dados para o template (nova cópia, com 'ultima_atualizacao'
+                quando o boleto foi servido desatualizado)
+        """
+        modelo = self._obter(self._versao('boleto', boleto.indice), lambda: montar_visualizacao(boleto.dados()))
+        return {**modelo, 'ultima_atualizacao': boleto.indice.get('ultima_atualizacao')}
+
+    def item_listagem(self, boleto: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Dados de um boleto na busca por CPF/CNPJ.
+
+        Args:
+            boleto (dict): Boleto da listagem
+
+        Returns:
+            dict: Dados para o template (compartilhados; não devem ser alterados)
+        """
+        return self._obter(self._versao('listagem', boleto), lambda: montar_item_listagem(boleto))
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do cache.
+
+        Returns:
+            dict: acertos, falhas e tamanho
+        """
+        with self._lock:
+            return {'acertos': self.acertos, 'falhas': self.falhas, 'tamanho': len(self._modelos)}
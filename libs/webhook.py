@@ -0,0 +1,217 @@
+"""
+Módulo responsável pelos webhooks de boletos da Cora.
+Interpreta cada evento (headers webhook-event-* e/ou corpo JSON), verifica o
+token compartilhado configurado na URL do webhook e atualiza o cache e o
+espelho local assim que um boleto é pago, cancelado ou vence.
+"""
+
+import hmac
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from .cache import BoletoBruto
+from .espelho import documento_do_boleto
+
+
+# Status resultante de cada tipo de evento
+STATUS_POR_EVENTO = {
+    'invoice.created': 'OPEN',
+    'invoice.paid': 'PAID',
+    'invoice.canceled': 'CANCELLED',
+    'invoice.cancelled': 'CANCELLED',
+    'invoice.overdue': 'LATE',
+    'invoice.late': 'LATE',
+}
+
+# Campos que um boleto completo (como em GET /v2/invoices/{id}) sempre traz;
+# sem eles, os dados do evento não substituem o boleto guardado no cache
+CAMPOS_BOLETO_COMPLETO = ('customer', 'services', 'payment_terms', 'payment_options')
+
+
+class ErroWebhook(ValueError):
+    """Evento de webhook inválido"""
+
+
+@dataclass
+class EventoWebhook:
+    """Representa um evento de boleto recebido por webhook"""
+    id: Optional[str]
+    tipo: str
+    invoice_id: str
+    status: Optional[str] = None
+    boleto: Optional[Dict[str, Any]] = None
+    completo: bool = False
+    recebido_em: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'))
+
+
+def verificar_token(recebido: Optional[str], esperado: str) -> bool:
+    """
+    Compara o token recebido com o configurado em tempo constante.
+
+    Args:
+        recebido (str): Token enviado na requisição (header ou query string)
+        esperado (str): Token configurado
+
+    Returns:
+        bool: True se os tokens forem iguais
+    """
+    if not recebido or not esperado:
+        return False
+    return hmac.compare_digest(recebido.encode('utf-8'), esperado.encode('utf-8'))
+
+
+def interpretar_evento(headers: Mapping[str, str], corpo: bytes) -> EventoWebhook:
+    """
+    Interpreta um evento de webhook.
+
+    A Cora informa o evento nos headers webhook-event-id, webhook-event-type e
+    webhook-resource-id; quando o corpo traz o boleto (ou {"type", "data"}),
+    seus dados também são usados.
+
+    Args:
+        headers: Headers da requisição
+        corpo (bytes): Corpo da requisição (pode ser vazio)
+
+    Returns:
+        EventoWebhook: Evento interpretado
+
+    Raises:
+        ErroWebhook: Se o corpo não for JSON válido ou faltar o tipo ou o boleto
+    """
+    dados: Dict[str, Any] = {}
+    if corpo and corpo.strip():
+        try:
+            dados = json.loads(corpo)
+        except ValueError as e:
+            raise ErroWebhook(f"Corpo do webhook não é um JSON válido: {str(e)}")
+        if not isinstance(dados, dict):
+            raise ErroWebhook("Corpo do webhook deve ser um objeto JSON")
+
+    boleto = dados.get('data') if isinstance(dados.get('data'), dict) else None
+    if boleto is None and 'status' in dados:
+        boleto = dados
+
+    tipo = headers.get('webhook-event-type') or dados.get('type') or dados.get('event')
+    invoice_id = headers.get('webhook-resource-id') or (boleto or {}).get('id')
+    if not tipo:
+        raise ErroWebhook("Tipo do evento não informado")
+    if not invoice_id:
+        raise ErroWebhook("ID do boleto não informado")
+
+    # Os dados só descrevem o boleto se tiverem ao menos ID e status
+    if boleto is not None and not (boleto.get('id') == invoice_id and boleto.get('status')):
+        boleto = None
+
+    status = boleto.get('status') if boleto else STATUS_POR_EVENTO.get(tipo)
+    return EventoWebhook(
+        id=headers.get('webhook-event-id') or (dados.get('id') if 'data' in dados else None),
+        tipo=tipo,
+        invoice_id=invoice_id,
+        status=status,
+        boleto=boleto,
+        completo=boleto is not None and all(campo in boleto for campo in CAMPOS_BOLETO_COMPLETO)
+    )
+
+
+class ProcessadorWebhook:
+    """
+    Aplica os eventos de webhook ao cache e ao espelho de uma ConsultaBoletos.
+    Eventos repetidos (mesmo webhook-event-id) são ignorados.
+    """
+
+    def __init__(self, consulta, token: str, eventos_lembrados: int = 10000):
+        """
+        Inicializa o processador.
+
+        Args:
+            consulta (ConsultaBoletos): Consulta cujo cache e espelho serão atualizados
+            token (str): Token compartilhado exigido em cada evento
+            eventos_lembrados (int): IDs de eventos guardados para descartar repetições
+        """
+        if not token:
+            raise ValueError("Token do webhook não pode ser vazio")
+        self.consulta = consulta
+        self.token = token
+        self.eventos_lembrados = eventos_lembrados
+        self._vistos: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def autenticar(self, token_recebido: Optional[str]) -> bool:
+        """Verifica o token enviado com o evento"""
+        return verificar_token(token_recebido, self.token)
+
+    def _repetido(self, evento_id: Optional[str]) -> bool:
+        with self._lock:
+            return evento_id is not None and evento_id in self._vistos
+
+    def _lembrar(self, evento_id: Optional[str]):
+        # Registrado só após o processamento, para que a Cora possa reenviar eventos que falharam
+        if evento_id is None:
+            return
+        with self._lock:
+            self._vistos[evento_id] = None
+            if len(self._vistos) > self.eventos_lembrados:
+                self._vistos.popitem(last=False)
+
+    def _documento(self, evento: EventoWebhook) -> Optional[str]:
+        """CPF/CNPJ do cliente do boleto: do evento, do espelho ou do cache"""
+        if evento.boleto is not None and documento_do_boleto(evento.boleto):
+            return documento_do_boleto(evento.boleto)
+        espelho = self.consulta.espelho
+        boleto = espelho.obter(evento.invoice_id) if espelho is not None else None
+        if boleto is None and self.consulta.cache is not None:
+            boleto = self.consulta.cache.obter(evento.invoice_id)
+            if isinstance(boleto, BoletoBruto):
+                boleto = boleto.dados()
+        return documento_do_boleto(boleto) if boleto is not None else None
+
+    def processar(self, evento: EventoWebhook) -> bool:
+        """
+        Atualiza o cache e o espelho com o evento.
+
+        Com o boleto completo no corpo, ele substitui a entrada do cache; sem
+        ele (ou com dados parciais), a entrada é removida e a próxima consulta
+        busca o boleto na API. No espelho, apenas o status é atualizado nesse
+        caso: o updated_at continua o da Cora, nunca o horário local de
+        recebimento. As listagens em cache do CPF/CNPJ do cliente também são
+        removidas (todas, se o documento não for conhecido).
+
+        Args:
+            evento (EventoWebhook): Evento interpretado
+
+        Returns:
+            bool: False se o evento já havia sido processado
+        """
+        if self._repetido(evento.id):
+            logging.info(f"Evento de webhook repetido ignorado: {evento.id}")
+            return False
+
+        logging.info(f"Evento de webhook {evento.tipo} para o boleto {evento.invoice_id} (status: {evento.status})")
+
+        documento = self._documento(evento)
+
+        cache = self.consulta.cache
+        if cache is not None:
+            if evento.completo:
+                cache.armazenar(evento.invoice_id, BoletoBruto.de_dados(evento.boleto), status=evento.status)
+            else:
+                cache.invalidar(evento.invoice_id)
+        self.consulta.invalidar_listagens(documento)
+
+        espelho = self.consulta.espelho
+        if espelho is not None:
+            boleto = evento.boleto if evento.completo else None
+            if boleto is None and evento.status:
+                boleto = espelho.obter(evento.invoice_id)
+                if boleto is not None:
+                    boleto = {**boleto, 'status': evento.status}
+            if boleto is not None:
+                espelho.gravar([boleto])
+
+        self._lembrar(evento.id)
+        return True
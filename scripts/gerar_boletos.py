@@ -10,6 +10,8 @@ from typing import Dict, Any
 from dotenv import load_dotenv
 from libs.auth import CoraAuth
 from libs.gerador import GeradorBoletos
+from libs.agendador import AgendadorEmissoes, LimitadorTaxa
+from libs.fila import FilaEmissao
 
 
 # Configuração global do logging
@@ -81,6 +83,11 @@ if __name__ == "__main__":
     KEY_PATH = config['certificates']['key_path']
     EXCEL_FILE = config['config']['excel_file']
     DEBUG = config['config']['debug']  # Obtém configuração de debug
+    DUPLICATAS = config['config'].get('duplicatas', 'sinalizar')  # sinalizar, remover ou ignorar
+    SOMENTE_VALIDAR = config['config'].get('somente_validar', False)  # dry-run, sem acessar a API
+    AGENDADOR = config.get('agendador', {})  # workers e taxa_por_segundo (opcional)
+    FILA = config.get('fila', {}).get('caminho')  # fila de emissão (opcional)
+    ARQUIVO_FALHAS = config['config'].get('arquivo_falhas')  # linhas com erro, para reenvio (opcional)
     
     # Configura o logging antes de qualquer operação
     configurar_logging(DEBUG)
@@ -94,12 +101,36 @@ if __name__ == "__main__":
         logging.debug(f"CERT_PATH: {CERT_PATH}")
         logging.debug(f"KEY_PATH: {KEY_PATH}")
         logging.debug(f"EXCEL_FILE: {EXCEL_FILE}")
+        logging.debug(f"DUPLICATAS: {DUPLICATAS}")
     
     # Inicializa autenticação
     auth = CoraAuth(AUTH_URL, CLIENT_ID, CERT_PATH, KEY_PATH, debug=DEBUG)
     
+    # Inicializa o agendador para emissão em paralelo, se configurado
+    agendador = None
+    if AGENDADOR.get('workers'):
+        taxa = AGENDADOR.get('taxa_por_segundo')
+        agendador = AgendadorEmissoes(
+            max_workers=AGENDADOR['workers'],
+            limitador=LimitadorTaxa(taxa) if taxa else None,
+            limite_fila_lote=AGENDADOR.get('limite_fila_lote')
+        )
+    
     # Inicializa o gerador de boletos com debug
-    gerador = GeradorBoletos(API_URL, auth, debug=DEBUG)
+    gerador = GeradorBoletos(API_URL, auth, debug=DEBUG, agendador=agendador)
+    
+    if FILA and not SOMENTE_VALIDAR:
+        # Apenas enfileira; os boletos são emitidos por `cora-boletos --fila ... --trabalhador`
+        gerador.enfileirar_arquivo(EXCEL_FILE, FilaEmissao(FILA), duplicatas=DUPLICATAS)
+    elif SOMENTE_VALIDAR:
+        # Apenas valida o arquivo Excel
+        relatorio = gerador.validar_arquivo(EXCEL_FILE)
+        if not relatorio.valido:
+            logging.error(f"Arquivo com {len(relatorio.linhas_invalidas)} linhas inválidas")
+    else:
+        # Processa o arquivo Excel
+        gerador.processar_arquivo(EXCEL_FILE, duplicatas=DUPLICATAS, arquivo_falhas=ARQUIVO_FALHAS)
     
-    # Processa o arquivo Excel
-    gerador.processar_arquivo(EXCEL_FILE) 
\ No newline at end of file
+    if agendador:
+        logging.info(f"Métricas do agendador: {agendador.metricas()}")
+        agendador.encerrar() 
\ No newline at end of file
@@ -56,6 +56,9 @@ setup(
             "sphinx>=4.0",
             "sphinx-rtd-theme>=1.0",
         ],
+        "http2": [
+            "httpx[http2]>=0.24",
+        ],
     },
     entry_points={
         "console_scripts": [
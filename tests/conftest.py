@@ -4,12 +4,65 @@ Configuração do pytest para os testes do sistema de geração de boletos Cora.
 
 import os
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
+
 # Adiciona o diretório raiz ao PYTHONPATH para importar os módulos
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# Vencimento futuro, aceito sem ajuste na emissão
+VENCIMENTO = (datetime.now().date() + timedelta(days=5)).strftime('%Y-%m-%d')
+
+
+class AuthFalsa:
+    """Autenticação sem acesso à API (certificados fictícios e token fixo)"""
+    cert_path = "certificados/certificate.pem"
+    key_path = "certificados/private-key.key"
+
+    def get_access_token(self):
+        return 'test-token-123'
+
+    def get_auth_headers(self):
+        return {'Authorization': 'Bearer test-token-123', 'Accept': 'application/json'}
+
+
+@pytest.fixture
+def auth_falsa():
+    """Autenticação falsa para GeradorBoletos e ConsultaBoletos"""
+    return AuthFalsa()
+
+
+@pytest.fixture
+def linha():
+    """
+    Fábrica de linhas válidas da planilha de emissão; os campos informados
+    substituem os padrões (ex: linha('A2', valor=200, documento='123')).
+    """
+    def criar(codigo='A1', **alteracoes):
+        dados = {
+            'codigo': codigo,
+            'nome': 'João da Silva',
+            'email': 'joao@email.com',
+            'documento': '123.456.789-09',
+            'servico_nome': 'Consultoria',
+            'servico_descricao': 'Consultoria mensal',
+            'valor': 'R$ 1.234,56',
+            'data_vencimento': VENCIMENTO,
+            'rua': 'Rua Exemplo',
+            'numero': '123',
+            'bairro': 'Centro',
+            'cidade': 'São Paulo',
+            'estado': 'SP',
+            'cep': '01234-567',
+        }
+        dados.update(alteracoes)
+        return dados
+    return criar
+
+
 # Configurações do pytest
 def pytest_configure(config):
     """Configurações adicionais do pytest"""
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Testes do agendador de emissões por prioridade.
+"""
+
+import threading
+import time
+
+import pytest
+
+from libs.agendador import AgendadorEmissoes, LimitadorTaxa
+
+
+class TestAgendadorEmissoes:
+    """Testes para AgendadorEmissoes"""
+
+    def test_interativa_passa_a_frente_do_lote(self):
+        """Testa que tarefas interativas são executadas antes das em lote pendentes"""
+        liberar = threading.Event()
+        ordem = []
+
+        with AgendadorEmissoes(max_workers=1) as agendador:
+            bloqueio = agendador.submeter(liberar.wait, classe='lote')
+            lote = [agendador.submeter(ordem.append, f"lote-{i}", classe='lote') for i in range(3)]
+            interativa = agendador.submeter(ordem.append, 'interativa', classe='interativa')
+            liberar.set()
+            for futuro in [bloqueio, interativa, *lote]:
+                futuro.result(timeout=5)
+
+        assert ordem == ['interativa', 'lote-0', 'lote-1', 'lote-2']
+
+    def test_metricas_por_classe(self):
+        """Testa contadores por classe, inclusive falhas"""
+        def falhar():
+            raise ValueError("erro")
+
+        with AgendadorEmissoes(max_workers=2) as agendador:
+            agendador.submeter(lambda: 1, classe='interativa').result(timeout=5)
+            with pytest.raises(ValueError):
+                agendador.submeter(falhar, classe='lote').result(timeout=5)
+
+        metricas = agendador.metricas()
+        assert metricas['interativa']['concluidas'] == 1
+        assert metricas['lote']['falhas'] == 1
+        assert metricas['lote']['em_fila'] == 0
+        assert metricas['interativa']['latencia_p95'] is not None
+
+    def test_classe_invalida(self):
+        """Testa classe de prioridade desconhecida"""
+        with AgendadorEmissoes(max_workers=1) as agendador:
+            with pytest.raises(ValueError, match="Classe de prioridade inválida"):
+                agendador.submeter(lambda: None, classe='urgente')
+
+    def test_limite_fila_lote_bloqueia_produtor(self):
+        """Testa que o produtor aguarda quando a fila de lote está cheia"""
+        liberar = threading.Event()
+        with AgendadorEmissoes(max_workers=1, limite_fila_lote=1) as agendador:
+            agendador.submeter(liberar.wait, classe='lote')
+            time.sleep(0.05)
+            agendador.submeter(lambda: None, classe='lote')
+
+            produtor = threading.Thread(target=agendador.submeter, args=(lambda: None,))
+            produtor.start()
+            produtor.join(timeout=0.1)
+            assert produtor.is_alive()
+
+            liberar.set()
+            produtor.join(timeout=5)
+            assert not produtor.is_alive()
+
+
+class TestLimitadorTaxa:
+    """Testes para LimitadorTaxa"""
+
+    def test_rajada_e_reabastecimento(self):
+        """Testa que apenas a capacidade está disponível de imediato"""
+        limitador = LimitadorTaxa(taxa_por_segundo=50, capacidade=2)
+        assert limitador.tentar_adquirir()
+        assert limitador.tentar_adquirir()
+        assert not limitador.tentar_adquirir()
+        limitador.aguardar()
+
+    def test_taxa_invalida(self):
+        """Testa taxa menor ou igual a zero"""
+        with pytest.raises(ValueError):
+            LimitadorTaxa(0)
@@ -81,7 +81,8 @@ class TestCoraAuth(unittest.TestCase):
                 'client_id': self.client_id
             },
             cert=(self.cert_path, self.key_path),
-            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            timeout=(5.0, 15.0)
         )
 
     @patch('requests.post')
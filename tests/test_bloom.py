@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Testes do filtro de Bloom.
+"""
+
+import pytest
+
+from libs.bloom import FiltroBloom
+
+
+class TestFiltroBloom:
+    """Testes para FiltroBloom"""
+
+    def test_sem_falsos_negativos(self):
+        """Testa que todo item adicionado é encontrado"""
+        documentos = [f'{i:011d}' for i in range(2000)]
+        filtro = FiltroBloom.de_itens(documentos, capacidade=2000)
+
+        assert all(documento in filtro for documento in documentos)
+        assert filtro.itens == 2000
+
+    def test_taxa_falsos_positivos(self):
+        """Testa que a taxa de falsos positivos fica perto da configurada"""
+        filtro = FiltroBloom.de_itens((f'{i:011d}' for i in range(5000)), capacidade=5000, taxa_falsos_positivos=0.01)
+
+        falsos_positivos = sum(f'{i:014d}' in filtro for i in range(10000))
+        assert falsos_positivos / 10000 < 0.03
+        assert filtro.tamanho_bytes() < 8 * 1024
+
+    def test_parametros_invalidos(self):
+        """Testa a validação da capacidade e da taxa"""
+        with pytest.raises(ValueError):
+            FiltroBloom(0)
+        with pytest.raises(ValueError):
+            FiltroBloom(100, taxa_falsos_positivos=1.5)
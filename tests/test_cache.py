@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Testes do cache em memória das consultas de boletos.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from libs.cache import BoletoBruto, CacheBoletos, CacheBoletosPersistente
+from libs.resumo import ResumoBoleto
+
+
+class TestCacheBoletos:
+    """Testes para CacheBoletos"""
+
+    def test_ttl_por_status(self):
+        """Testa que boletos pagos não expiram e pendentes expiram"""
+        cache = CacheBoletos(ttl_pendente=10)
+        with patch('libs.cache.time.monotonic', return_value=100.0):
+            cache.armazenar('pago', {'id': 'pago'}, status='PAID')
+            cache.armazenar('pendente', {'id': 'pendente'}, status='PENDING')
+
+        with patch('libs.cache.time.monotonic', return_value=1_000_000.0):
+            assert cache.obter('pago') == {'id': 'pago'}
+            assert cache.obter('pendente') is None
+
+        estatisticas = cache.estatisticas()
+        assert estatisticas['acertos'] == 1
+        assert estatisticas['falhas'] == 1
+        assert estatisticas['expirados'] == 1
+
+    def test_lru(self):
+        """Testa remoção da entrada menos usada quando o cache está cheio"""
+        cache = CacheBoletos(tamanho_maximo=2)
+        cache.armazenar('a', 1, status='PAID')
+        cache.armazenar('b', 2, status='PAID')
+        cache.obter('a')
+        cache.armazenar('c', 3, status='PAID')
+
+        assert cache.obter('b') is None
+        assert cache.obter('a') == 1
+        assert cache.obter('c') == 3
+        assert cache.estatisticas()['removidos'] == 1
+
+    def test_ttl_zero_desabilita(self):
+        """Testa que TTL zero não armazena boletos em aberto"""
+        cache = CacheBoletos(ttl_pendente=0)
+        cache.armazenar('a', 1, status='LATE')
+        assert len(cache) == 0
+
+    def test_tamanho_invalido(self):
+        """Testa tamanho máximo inválido"""
+        with pytest.raises(ValueError):
+            CacheBoletos(tamanho_maximo=0)
+
+    def test_limite_em_bytes(self):
+        """Testa remoção das entradas menos usadas ao exceder max_bytes"""
+        cache = CacheBoletos(tamanho_maximo=100, max_bytes=250)
+        for chave in 'abc':
+            cache.armazenar(chave, {'id': chave, 'dados': 'x' * 80}, status='PAID')
+
+        assert cache.obter('a') is None
+        assert cache.obter('c') is not None
+        assert cache.estatisticas()['bytes'] <= 250
+
+    def test_limite_em_bytes_com_acentos(self):
+        """Testa que o tamanho é medido em bytes UTF-8, não em caracteres"""
+        cache = CacheBoletos(max_bytes=1000)
+        cache.armazenar('a', {'nome': 'ç' * 100}, status='PAID')
+
+        assert cache.estatisticas()['bytes'] == len('{"nome":""}') + 200
+
+
+class TestBoletoBruto:
+    """Testes para BoletoBruto"""
+
+    def test_indice_e_dados(self):
+        """Testa o índice e a decodificação sob demanda"""
+        boleto = BoletoBruto.de_conteudo(b'{"id": "a", "status": "OPEN", "payment_terms": {"due_date": "2025-02-01"}}')
+        assert boleto.indice['id'] == 'a'
+        assert boleto.indice['status'] == 'OPEN'
+        assert boleto.indice['due_date'] == '2025-02-01'
+        assert boleto.dados() is not boleto.dados()
+        assert boleto.dados()['payment_terms'] == {'due_date': '2025-02-01'}
+
+    def test_decodifica_uma_vez(self):
+        """Testa que o JSON é decodificado só na criação da entrada"""
+        boleto = BoletoBruto.de_conteudo(b'{"id": "a", "status": "OPEN"}')
+        with patch('libs.cache.json.loads') as loads:
+            assert boleto.dados() == {'id': 'a', 'status': 'OPEN'}
+            boleto.dados()['status'] = 'PAID'
+            assert boleto.dados()['status'] == 'OPEN'
+        loads.assert_not_called()
+        assert BoletoBruto(b'{"id": "b"}', {}).dados() == {'id': 'b'}
+
+    def test_tamanho_inclui_copia_decodificada(self):
+        """Testa que o limite de bytes conta os bytes e a cópia decodificada"""
+        conteudo = b'{"id": "a", "status": "OPEN", "customer": {"name": "Jo\\u00e3o"}}'
+        cache = CacheBoletos(max_bytes=10 ** 6)
+        cache.armazenar('a', BoletoBruto.de_conteudo(conteudo))
+        com_copia = cache.estatisticas()['bytes']
+        assert com_copia > 2 * len(conteudo)
+
+        # Sem a cópia decodificada (decodificação sob demanda), contam só os bytes
+        cache.armazenar('b', BoletoBruto(conteudo, {}))
+        assert cache.estatisticas()['bytes'] == com_copia + len(conteudo)
+
+    def test_com_campos(self):
+        """Testa o acréscimo de campos sem reserializar o boleto"""
+        assert BoletoBruto(b'{}\n', {}).com_campos(esta_pago=False) == b'{"esta_pago":false}'
+        assert BoletoBruto(b'{"id":"a"}', {}).com_campos() == b'{"id":"a"}'
+
+    def test_conteudo_invalido(self):
+        """Testa resposta que não é um objeto JSON"""
+        with pytest.raises(ValueError):
+            BoletoBruto.de_conteudo(b'[1, 2]')
+
+
+class TestCacheBoletosPersistente:
+    """Testes para CacheBoletosPersistente"""
+
+    def test_novo_processo_le_do_disco(self, tmp_path):
+        """Testa que outra instância (reinício, outro worker) encontra as entradas"""
+        caminho = str(tmp_path / 'cache.db')
+        CacheBoletosPersistente(caminho).armazenar('inv_1', {'id': 'inv_1', 'status': 'PAID'}, status='PAID')
+
+        cache = CacheBoletosPersistente(caminho)
+        assert cache.obter('inv_1') == {'id': 'inv_1', 'status': 'PAID'}
+        assert cache.obter('inv_1') == {'id': 'inv_1', 'status': 'PAID'}
+
+        estatisticas = cache.estatisticas()
+        assert estatisticas['acertos_disco'] == 1
+        assert estatisticas['acertos'] == 2
+
+    def test_validade_preservada_no_disco(self, tmp_path):
+        """Testa que a entrada lida do disco mantém o TTL original"""
+        caminho = str(tmp_path / 'cache.db')
+        with patch('libs.cache.time.time', return_value=1000.0):
+            CacheBoletosPersistente(caminho, ttl_pendente=30).armazenar('inv_1', {'id': 'inv_1'}, status='OPEN')
+
+        cache = CacheBoletosPersistente(caminho, ttl_pendente=30)
+        with patch('libs.cache.time.time', return_value=1020.0):
+            assert cache.obter('inv_1') == {'id': 'inv_1'}
+
+        cache = CacheBoletosPersistente(caminho, ttl_pendente=30)
+        with patch('libs.cache.time.time', return_value=1040.0):
+            assert cache.obter('inv_1') is None
+            entrada = cache.obter_entrada('inv_1')
+        assert entrada.valor == {'id': 'inv_1'}
+        assert entrada.gravado_em == 1000.0
+
+    def test_invalidar_remove_do_disco(self, tmp_path):
+        """Testa que a invalidação vale para as próximas instâncias"""
+        caminho = str(tmp_path / 'cache.db')
+        cache = CacheBoletosPersistente(caminho)
+        cache.armazenar('inv_1', {'id': 'inv_1'}, status='PAID')
+        cache.invalidar('inv_1')
+
+        assert CacheBoletosPersistente(caminho).obter('inv_1') is None
+
+    def test_limite_de_entradas_no_disco(self, tmp_path):
+        """Testa que a limpeza periódica mantém as entradas mais recentes"""
+        cache = CacheBoletosPersistente(str(tmp_path / 'cache.db'), max_entradas_disco=10)
+        cache.INTERVALO_LIMPEZA = 5
+        for i in range(20):
+            cache.armazenar(f'inv_{i}', {'id': i}, status='PAID')
+
+        total = cache._conexao().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        assert total == 10
+
+    def test_boleto_bruto_no_disco(self, tmp_path):
+        """Testa que boletos brutos voltam do disco com os mesmos bytes"""
+        caminho = str(tmp_path / 'cache.db')
+        CacheBoletosPersistente(caminho).armazenar('inv_1', BoletoBruto.de_conteudo(b'{"id": "inv_1", "status": "PAID"}'), status='PAID')
+
+        boleto = CacheBoletosPersistente(caminho).obter('inv_1')
+        assert boleto.conteudo == b'{"id": "inv_1", "status": "PAID"}'
+        assert boleto.indice['status'] == 'PAID'
+
+    def test_tamanho_em_bytes_no_disco(self, tmp_path):
+        """Testa o tamanho em bytes UTF-8 na gravação e na leitura do disco"""
+        caminho = str(tmp_path / 'cache.db')
+        CacheBoletosPersistente(caminho).armazenar('a', {'nome': 'João' * 10}, status='PAID')
+        esperado = len('{"nome":""}'.encode('utf-8')) + len(('João' * 10).encode('utf-8'))
+
+        cache = CacheBoletosPersistente(caminho)
+        assert cache.obter('a') is not None
+        assert cache.estatisticas()['bytes'] == esperado
+
+    def test_invalidar_prefixo_no_disco(self, tmp_path):
+        """Testa que invalidar_prefixo remove as entradas da memória e do arquivo"""
+        caminho = str(tmp_path / 'cache.db')
+        cache = CacheBoletosPersistente(caminho)
+        cache.armazenar('listagem:1:page=1', {'data': []})
+        cache.armazenar('listagem:2:page=1', {'data': []})
+
+        cache.invalidar_prefixo('listagem:1:')
+
+        assert cache.obter('listagem:1:page=1') is None
+        assert CacheBoletosPersistente(caminho).obter('listagem:1:page=1') is None
+        assert CacheBoletosPersistente(caminho).obter('listagem:2:page=1') is not None
+
+    def test_resumo_no_disco(self, tmp_path):
+        """Testa que listagens com ResumoBoleto voltam do disco como resumos"""
+        caminho = str(tmp_path / 'cache.db')
+        resumo = ResumoBoleto(id='a', status='OPEN', documento='12345678909')
+        CacheBoletosPersistente(caminho).armazenar('listagem:a', {'data': [resumo], 'totalItems': 1})
+
+        valor = CacheBoletosPersistente(caminho).obter('listagem:a')
+        assert isinstance(valor['data'][0], ResumoBoleto)
+        assert dict(valor['data'][0]) == dict(resumo)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Testes da coalescência de consultas simultâneas.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from libs.coalescencia import ChamadasUnicas
+
+
+class TestChamadasUnicas:
+    """Testes para ChamadasUnicas"""
+
+    def test_chamadas_simultaneas_executam_uma_vez(self):
+        """Testa que threads com a mesma chave compartilham a execução"""
+        chamadas = ChamadasUnicas()
+        liberar = threading.Event()
+        execucoes = []
+
+        def buscar():
+            execucoes.append(1)
+            liberar.wait(5)
+            return {'id': 'inv_1'}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futuros = [executor.submit(chamadas.executar, 'inv_1', buscar) for _ in range(8)]
+            while chamadas.estatisticas()['chamadas'] < 8:
+                time.sleep(0.001)
+            liberar.set()
+            resultados = [f.result() for f in futuros]
+
+        assert len(execucoes) == 1
+        assert all(r == {'id': 'inv_1'} for r in resultados)
+        estatisticas = chamadas.estatisticas()
+        assert estatisticas['executadas'] == 1
+        assert estatisticas['coalescidas'] == 7
+        assert estatisticas['em_andamento'] == 0
+
+    def test_erro_propagado_para_todos(self):
+        """Testa que a exceção da chamada é levantada em todas as threads"""
+        chamadas = ChamadasUnicas()
+        liberar = threading.Event()
+
+        def buscar():
+            liberar.wait(5)
+            raise ValueError("Boleto não encontrado")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futuros = [executor.submit(chamadas.executar, 'inv_1', buscar) for _ in range(3)]
+            while chamadas.estatisticas()['chamadas'] < 3:
+                time.sleep(0.001)
+            liberar.set()
+            for futuro in futuros:
+                with pytest.raises(ValueError):
+                    futuro.result()
+
+    def test_chamadas_sequenciais_nao_coalescem(self):
+        """Testa que nada é reaproveitado depois da conclusão"""
+        chamadas = ChamadasUnicas()
+        assert chamadas.executar('a', lambda: 1) == 1
+        assert chamadas.executar('a', lambda: 2) == 2
+        assert chamadas.estatisticas()['coalescidas'] == 0
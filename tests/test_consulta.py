@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Testes da consulta de boletos na API da Cora.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from libs.cache import CacheBoletos
+from libs.consulta import ConsultaBoletos
+from libs.resumo import ResumoBoleto
+
+
+def _resposta(status_code=200, json_data=None):
+    resposta = MagicMock()
+    resposta.status_code = status_code
+    resposta.json.return_value = json_data
+    resposta.content = json.dumps(json_data).encode('utf-8')
+    resposta.iter_content.side_effect = lambda chunk_size=1: iter([resposta.content])
+    resposta.headers = {}
+    return resposta
+
+
+@pytest.fixture
+def consulta(auth_falsa):
+    return ConsultaBoletos(
+        "https://matls-clients.api.cora.com.br/v2/invoices",
+        auth_falsa,
+        cache=CacheBoletos(ttl_pendente=60)
+    )
+
+
+class TestConsultarBoletoPorId:
+    """Testes para ConsultaBoletos.consultar_boleto_por_id"""
+
+    def test_url_normalizada(self, consulta):
+        """Testa remoção de /v2/invoices da URL base"""
+        assert consulta.api_base_url == "https://matls-clients.api.cora.com.br"
+
+    def test_cache_evita_nova_requisicao(self, consulta):
+        """Testa que a segunda consulta é respondida pelo cache"""
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1', 'status': 'PAID'})) as mock_get:
+            primeiro = consulta.consultar_boleto_por_id('inv_1')
+            primeiro['esta_pago'] = True
+            segundo = consulta.consultar_boleto_por_id('inv_1')
+
+        mock_get.assert_called_once()
+        # Campos acrescentados por quem consulta não alteram o cache
+        assert segundo == {'id': 'inv_1', 'status': 'PAID'}
+        assert consulta.estatisticas_cache()['acertos'] == 1
+
+    def test_nao_encontrado(self, consulta):
+        """Testa boleto inexistente"""
+        with patch.object(consulta.session, 'get', return_value=_resposta(status_code=404)):
+            with pytest.raises(ValueError, match="Boleto não encontrado"):
+                consulta.consultar_boleto_por_id('inv_x')
+
+    def test_boleto_bruto_reenvia_bytes_da_api(self, consulta):
+        """Testa que o JSON da API é mantido e só recebe os campos calculados"""
+        resposta = _resposta()
+        resposta.content = b'{"id": "inv_1", "status": "PAID", "amount": 100}'
+        with patch.object(consulta.session, 'get', return_value=resposta) as mock_get:
+            bruto = consulta.consultar_boleto_bruto('inv_1')
+            boleto = consulta.consultar_boleto_por_id('inv_1')
+
+        mock_get.assert_called_once()
+        assert bruto.indice['status'] == 'PAID'
+        assert bruto.com_campos(esta_pago=True) == b'{"id": "inv_1", "status": "PAID", "amount": 100,"esta_pago":true}'
+        assert json.loads(bruto.com_campos(esta_pago=True))['esta_pago'] is True
+        assert boleto == {'id': 'inv_1', 'status': 'PAID', 'amount': 100}
+
+
+    def test_consultas_simultaneas_coalescidas(self, consulta):
+        """Testa que consultas simultâneas ao mesmo ID fazem uma única requisição"""
+        liberar = threading.Event()
+
+        def get_lento(*args, **kwargs):
+            liberar.wait(5)
+            return _resposta(json_data={'id': 'inv_1', 'status': 'PENDING'})
+
+        with patch.object(consulta.session, 'get', side_effect=get_lento) as mock_get:
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                futuros = [executor.submit(consulta.consultar_boleto_por_id, 'inv_1') for _ in range(5)]
+                while consulta.estatisticas_coalescencia()['chamadas'] < 5:
+                    time.sleep(0.001)
+                liberar.set()
+                resultados = [f.result() for f in futuros]
+
+        mock_get.assert_called_once()
+        assert all(r == {'id': 'inv_1', 'status': 'PENDING'} for r in resultados)
+        # Cada consulta recebe sua própria cópia
+        assert len({id(r) for r in resultados}) == 5
+        assert consulta.estatisticas_coalescencia()['coalescidas'] == 4
+
+
+class TestStatusPagamento:
+    """Testes para a verificação de pagamento sem requisições duplicadas"""
+
+    def test_esta_pago(self):
+        """Testa status pagos e em aberto"""
+        assert ConsultaBoletos.esta_pago({'status': 'PAID'})
+        assert ConsultaBoletos.esta_pago({'status': 'SETTLED'})
+        assert not ConsultaBoletos.esta_pago({'status': 'LATE'})
+        assert not ConsultaBoletos.esta_pago({})
+
+    def test_escopo_requisicao_uma_chamada(self, auth_falsa):
+        """Testa que consultas brutas, por ID e de pagamento fazem uma única requisição"""
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1', 'status': 'PENDING'})) as mock_get:
+            with consulta.escopo_requisicao():
+                assert consulta.consultar_boleto_bruto('inv_1').indice['status'] == 'PENDING'
+                consulta.consultar_boleto_por_id('inv_1')['extra'] = True
+                assert 'extra' not in consulta.consultar_boleto_por_id('inv_1')
+                assert not consulta.boleto_esta_pago('inv_1')
+            assert mock_get.call_count == 1
+
+            # Fora do escopo, sem cache, uma nova consulta vai à API
+            consulta.consultar_boleto_por_id('inv_1')
+            assert mock_get.call_count == 2
+
+
+def _paginas(total_itens, per_page, com_total=True):
+    """Simula a listagem paginada da API"""
+    def get(url, params=None, **kwargs):
+        pagina = params['page']
+        inicio = (pagina - 1) * per_page
+        itens = [{'id': f'inv_{i}'} for i in range(inicio, min(inicio + per_page, total_itens))]
+        resposta = {'items': itens}
+        if com_total:
+            resposta['totalItems'] = total_itens
+        return _resposta(json_data=resposta)
+    return get
+
+
+class TestIterarBoletosPorCpf:
+    """Testes para ConsultaBoletos.iterar_boletos_por_cpf"""
+
+    def test_todas_as_paginas_com_total(self, consulta):
+        """Testa que todas as páginas são percorridas em ordem"""
+        with patch.object(consulta.session, 'get', side_effect=_paginas(23, 5)) as mock_get:
+            boletos = list(consulta.iterar_boletos_por_cpf('123.456.789-09', per_page=5, paginas_antecipadas=3))
+
+        assert [b['id'] for b in boletos] == [f'inv_{i}' for i in range(23)]
+        assert mock_get.call_count == 5
+
+    def test_sem_total_segue_ate_pagina_incompleta(self, consulta):
+        """Testa a paginação sequencial quando os metadados não trazem o total"""
+        with patch.object(consulta.session, 'get', side_effect=_paginas(12, 5, com_total=False)) as mock_get:
+            boletos = list(consulta.iterar_boletos_por_cpf('12345678909', per_page=5))
+
+        assert len(boletos) == 12
+        assert mock_get.call_count == 3
+
+    def test_uma_pagina_uma_requisicao(self, consulta):
+        """Testa que listagens pequenas fazem uma única requisição"""
+        with patch.object(consulta.session, 'get', side_effect=_paginas(3, 50)) as mock_get:
+            boletos = list(consulta.iterar_boletos_por_cpf('12345678909'))
+
+        assert len(boletos) == 3
+        mock_get.assert_called_once()
+
+    def test_interrupcao_limita_paginas_buscadas(self, consulta):
+        """Testa que parar a iteração não busca o restante da conta"""
+        with patch.object(consulta.session, 'get', side_effect=_paginas(1000, 10)) as mock_get:
+            iterador = consulta.iterar_boletos_por_cpf('12345678909', per_page=10, paginas_antecipadas=2)
+            primeiros = [next(iterador) for _ in range(15)]
+            iterador.close()
+
+        assert primeiros[-1]['id'] == 'inv_14'
+        assert mock_get.call_count <= 4
+
+    def test_total_paginas_metadados(self):
+        """Testa a leitura do total em diferentes formatos de metadados"""
+        assert ConsultaBoletos._total_paginas({'totalPages': '4'}, 50) == 4
+        assert ConsultaBoletos._total_paginas({'meta': {'total': 101}}, 50) == 3
+        assert ConsultaBoletos._total_paginas({'data': []}, 50) is None
+
+
+class TestObterStatusEmLote:
+    """Testes para ConsultaBoletos.obter_status_em_lote"""
+
+    def test_status_erros_e_cache(self, consulta):
+        """Testa resultados, erros por ID e uso do cache"""
+        consulta.cache.armazenar('inv_cache', {'id': 'inv_cache', 'status': 'PAID'}, status='PAID')
+
+        def get(url, **kwargs):
+            invoice_id = url.rsplit('/', 1)[-1]
+            if invoice_id == 'inv_404':
+                return _resposta(status_code=404)
+            return _resposta(json_data={'id': invoice_id, 'status': 'PENDING'})
+
+        ids = ['inv_cache', 'inv_404'] + [f'inv_{i}' for i in range(30)]
+        with patch.object(consulta.session, 'get', side_effect=get) as mock_get:
+            resultados = {i: (status, erro) for i, status, erro in consulta.obter_status_em_lote(ids, max_workers=4)}
+
+        assert len(resultados) == 32
+        assert resultados['inv_cache'] == ('PAID', None)
+        assert resultados['inv_3'] == ('PENDING', None)
+        assert resultados['inv_404'][0] is None
+        assert isinstance(resultados['inv_404'][1], ValueError)
+        assert mock_get.call_count == 31
+
+    def test_sem_cache_mantem_entrada_em_caso_de_erro(self, consulta):
+        """Testa que usar_cache=False consulta a API e só substitui entradas com sucesso"""
+        consulta.cache.armazenar('inv_ok', {'id': 'inv_ok', 'status': 'OPEN'}, status='OPEN')
+        consulta.cache.armazenar('inv_fora', {'id': 'inv_fora', 'status': 'OPEN'}, status='OPEN')
+
+        def get(url, **kwargs):
+            if url.endswith('inv_fora'):
+                raise requests.exceptions.ConnectionError("API fora")
+            return _resposta(json_data={'id': 'inv_ok', 'status': 'PAID'})
+
+        with patch.object(consulta.session, 'get', side_effect=get) as mock_get:
+            resultados = {i: (status, erro) for i, status, erro in consulta.obter_status_em_lote(['inv_ok', 'inv_fora'], usar_cache=False)}
+
+        assert mock_get.call_count == 2
+        assert resultados['inv_ok'] == ('PAID', None)
+        assert isinstance(resultados['inv_fora'][1], requests.exceptions.ConnectionError)
+        assert consulta.cache.obter('inv_ok').dados()['status'] == 'PAID'
+        assert consulta.cache.obter('inv_fora') == {'id': 'inv_fora', 'status': 'OPEN'}
+
+    def test_respeita_limitador(self, consulta):
+        """Testa que cada requisição consome um token do limitador"""
+        consulta.limitador = MagicMock()
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'status': 'LATE'})):
+            list(consulta.obter_status_em_lote(['a', 'b', 'c']))
+
+        assert consulta.limitador.aguardar.call_count == 3
+
+
+class TestCacheDesatualizado:
+    """Testes do stale-while-revalidate e do uso do cache com a API fora"""
+
+    @pytest.fixture
+    def nova_consulta(self, auth_falsa):
+        def criar(**kwargs):
+            return ConsultaBoletos(
+                "https://matls-clients.api.cora.com.br",
+                auth_falsa,
+                cache=CacheBoletos(ttl_pendente=0.001),
+                **kwargs
+            )
+        return criar
+
+    def test_expirado_servido_e_revalidado(self, nova_consulta):
+        """Testa que a entrada expirada é servida na hora e atualizada em segundo plano"""
+        consulta = nova_consulta()
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1', 'status': 'OPEN'})):
+            consulta.consultar_boleto_por_id('inv_1')
+        time.sleep(0.01)
+
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1', 'status': 'PAID'})) as mock_get:
+            desatualizado = consulta.consultar_boleto_por_id('inv_1')
+            consulta._executor_revalidacao.shutdown(wait=True)
+
+        assert desatualizado['status'] == 'OPEN'
+        assert 'ultima_atualizacao' in desatualizado
+        mock_get.assert_called_once()
+        # TTL de boletos pagos não expira: a revalidação já está no cache
+        assert consulta.consultar_boleto_por_id('inv_1') == {'id': 'inv_1', 'status': 'PAID'}
+
+    def test_api_fora_serve_ultimo_dado(self, nova_consulta):
+        """Testa que uma falha da API devolve o último dado conhecido"""
+        consulta = nova_consulta(revalidar_em_segundo_plano=False)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1', 'status': 'OPEN'})):
+            consulta.consultar_boleto_por_id('inv_1')
+        time.sleep(0.01)
+
+        with patch.object(consulta.session, 'get', side_effect=requests.exceptions.ConnectionError("fora")):
+            boleto = consulta.consultar_boleto_por_id('inv_1')
+            with pytest.raises(requests.exceptions.ConnectionError):
+                consulta.consultar_boleto_por_id('inv_2')
+
+        assert boleto['status'] == 'OPEN'
+        assert boleto['ultima_atualizacao']
+
+    def test_listagem_desatualizada_marca_boletos(self, nova_consulta):
+        """Testa que a listagem servida do cache marca cada boleto"""
+        consulta = nova_consulta(revalidar_em_segundo_plano=False)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'items': [{'id': 'a'}]})):
+            consulta.listar_boletos_por_cpf('12345678909')
+        time.sleep(0.01)
+
+        with patch.object(consulta.session, 'get', side_effect=requests.exceptions.Timeout("lenta")):
+            boletos = list(consulta.iterar_boletos_por_cpf('12345678909'))
+
+        assert boletos[0]['id'] == 'a'
+        assert 'ultima_atualizacao' in boletos[0]
+
+
+class TestCacheNegativo:
+    """Testes do cache de CPFs/CNPJs sem boletos"""
+
+    def test_documento_sem_boletos_nao_repete_consulta(self, consulta):
+        """Testa que um 404 na listagem é lembrado pelo ttl_negativo"""
+        with patch.object(consulta.session, 'get', return_value=_resposta(status_code=404)) as mock_get:
+            for _ in range(3):
+                with pytest.raises(ValueError, match="Nenhum boleto"):
+                    consulta.listar_boletos_por_cpf('123.456.789-09')
+            with pytest.raises(ValueError, match="Nenhum boleto"):
+                list(consulta.iterar_boletos_por_cpf('12345678909'))
+
+        assert mock_get.call_count == 1
+        assert consulta.estatisticas_cache()['sem_boletos']['acertos'] == 3
+
+    def test_cache_negativo_desabilitado(self, auth_falsa):
+        """Testa que ttl_negativo=0 sempre consulta a API"""
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, ttl_negativo=0)
+        with patch.object(consulta.session, 'get', return_value=_resposta(status_code=404)) as mock_get:
+            for _ in range(2):
+                with pytest.raises(ValueError):
+                    consulta.listar_boletos_por_cpf('12345678909')
+
+        assert mock_get.call_count == 2
+
+
+class TestAnteciparDetalhes:
+    """Testes da busca antecipada dos detalhes de uma listagem"""
+
+    def test_aquece_cache_ignorando_os_ja_em_cache(self, auth_falsa):
+        """Testa que só os boletos ausentes do cache são buscados, até o limite"""
+        consulta = ConsultaBoletos(
+            "https://matls-clients.api.cora.com.br", auth_falsa,
+            cache=CacheBoletos(ttl_pendente=60), antecipar_detalhes=3
+        )
+        consulta.cache.armazenar('inv_1', {'id': 'inv_1', 'status': 'OPEN'}, status='OPEN')
+
+        def get(url, **kwargs):
+            invoice_id = url.rsplit('/', 1)[-1]
+            return _resposta(json_data={'id': invoice_id, 'status': 'OPEN'})
+
+        with patch.object(consulta.session, 'get', side_effect=get) as mock_get:
+            agendados = consulta.antecipar_detalhes(['inv_1', 'inv_2', 'inv_3', 'inv_4'])
+            consulta._executor_antecipacao.shutdown(wait=True)
+            boleto = consulta.consultar_boleto_por_id('inv_2')
+
+        assert agendados == 2
+        assert mock_get.call_count == 2
+        assert boleto == {'id': 'inv_2', 'status': 'OPEN'}
+        assert 'inv_4' not in consulta.cache
+
+    def test_desabilitado_sem_cache(self, auth_falsa):
+        """Testa que nada é agendado sem cache ou com limite zero"""
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, antecipar_detalhes=5)
+        assert consulta.antecipar_detalhes(['inv_1']) == 0
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, cache=CacheBoletos())
+        assert consulta.antecipar_detalhes(['inv_1']) == 0
+
+
+class TestListagemIncremental:
+    """Testes da leitura da listagem em blocos"""
+
+    def test_listagem_em_blocos(self, auth_falsa):
+        """Testa a leitura em blocos e o fechamento da resposta"""
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa)
+        resposta = _resposta(json_data={'items': [{'id': 'a', 'status': 'OPEN', 'pix': {'emv': 'x'}}], 'totalItems': 1})
+        with patch.object(consulta.session, 'get', return_value=resposta) as mock_get:
+            resultado = consulta.listar_boletos(page=1)
+
+        assert resultado == {'data': [{'id': 'a', 'status': 'OPEN', 'pix': {'emv': 'x'}}], 'totalItems': 1}
+        assert mock_get.call_args.kwargs['stream'] is True
+        resposta.close.assert_called_once()
+
+    def test_json_invalido_nao_e_nenhum_boleto(self, consulta):
+        """Testa que um corpo inválido é erro da API, não ausência de boletos"""
+        resposta = _resposta()
+        resposta.content = b'{"items": [{"id": "a"'
+        with patch.object(consulta.session, 'get', return_value=resposta):
+            with pytest.raises(requests.exceptions.InvalidJSONError):
+                consulta.listar_boletos_por_cpf('12345678909')
+
+    def test_listagem_resumida(self, auth_falsa):
+        """Testa que a listagem guarda ResumoBoleto, inclusive no cache"""
+        consulta = ConsultaBoletos(
+            "https://matls-clients.api.cora.com.br", auth_falsa,
+            cache=CacheBoletos(ttl_pendente=60), resumir_listagem=True
+        )
+        dados = {'data': [{'id': 'a', 'status': 'OPEN', 'pix': {'emv': 'x'}, 'customer': {'name': 'J'}}], 'meta': {'totalItems': 1}}
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data=dados)) as mock_get:
+            primeira = consulta.listar_boletos_por_cpf('12345678909')
+            segunda = consulta.listar_boletos_por_cpf('12345678909')
+
+        mock_get.assert_called_once()
+        assert segunda == primeira
+        assert isinstance(primeira['data'][0], ResumoBoleto)
+        assert dict(primeira['data'][0]) == {'id': 'a', 'status': 'OPEN', 'customer': {'name': 'J'}}
+
+    def test_listagem_completa_para_api(self, auth_falsa):
+        """Testa que resumir=False devolve os boletos da API, em cache separado"""
+        consulta = ConsultaBoletos(
+            "https://matls-clients.api.cora.com.br", auth_falsa,
+            cache=CacheBoletos(ttl_pendente=60), resumir_listagem=True
+        )
+        boleto = {'id': 'a', 'status': 'OPEN', 'total_amount': 1000, 'pix': {'emv': 'x'}}
+        dados = {'data': [boleto], 'meta': {'totalItems': 1}}
+        with patch.object(consulta.session, 'get', side_effect=lambda *a, **k: _resposta(json_data=dados)) as mock_get:
+            resumida = consulta.listar_boletos_por_cpf('12345678909')
+            completa = consulta.listar_boletos_por_cpf('12345678909', resumir=False)
+            consulta.listar_boletos_por_cpf('12345678909', resumir=False)
+
+        assert mock_get.call_count == 2
+        assert isinstance(resumida['data'][0], ResumoBoleto)
+        assert completa['data'] == [boleto]
+
+    def test_invalidar_listagens_do_documento(self, auth_falsa):
+        """Testa que invalidar_listagens remove as páginas resumidas e completas do documento"""
+        consulta = ConsultaBoletos(
+            "https://matls-clients.api.cora.com.br", auth_falsa,
+            cache=CacheBoletos(ttl_pendente=60), resumir_listagem=True
+        )
+        dados = {'data': [{'id': 'a', 'status': 'OPEN'}], 'meta': {'totalItems': 1}}
+        with patch.object(consulta.session, 'get', side_effect=lambda *a, **k: _resposta(json_data=dados)) as mock_get:
+            for _ in range(2):
+                consulta.listar_boletos_por_cpf('12345678909')
+                consulta.listar_boletos_por_cpf('12345678909', resumir=False)
+                consulta.invalidar_listagens('12345678909')
+
+        assert mock_get.call_count == 4
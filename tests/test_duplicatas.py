@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Testes da detecção de boletos duplicados antes da emissão.
+"""
+
+import pandas as pd
+
+from libs.duplicatas import IndiceDuplicatas, detectar_duplicatas, normalizar_vencimento
+from libs.gerador import GeradorBoletos
+
+
+def _formatar_valor(valor):
+    return GeradorBoletos._formatar_valor_monetario(None, valor)
+
+
+class TestDetectarDuplicatas:
+    """Testes para detectar_duplicatas"""
+
+    def test_sem_duplicatas(self, linha):
+        """Testa arquivo sem linhas repetidas"""
+        df = pd.DataFrame([linha('A1'), linha('A2', valor=200)])
+        assert detectar_duplicatas(df, _formatar_valor) == []
+
+    def test_codigo_repetido(self, linha):
+        """Testa linhas com o mesmo código"""
+        df = pd.DataFrame([linha('A1'), linha(' A1 ', valor=200)])
+        duplicatas = detectar_duplicatas(df, _formatar_valor)
+        assert len(duplicatas) == 1
+        assert duplicatas[0].linha == 1
+        assert duplicatas[0].motivo == 'codigo'
+        assert duplicatas[0].linha_original == 0
+
+    def test_conteudo_repetido_com_formatos_diferentes(self, linha):
+        """Testa mesmo documento/valor/vencimento em formatos diferentes"""
+        df = pd.DataFrame([
+            linha('A1', documento='123.456.789-09', valor='R$ 1.234,56', data_vencimento='2030-01-10'),
+            linha('A2', documento='12345678909', valor='1234.56', data_vencimento='2030-01-10'),
+        ])
+        duplicatas = detectar_duplicatas(df, _formatar_valor)
+        assert len(duplicatas) == 1
+        assert duplicatas[0].motivo == 'conteudo'
+        assert duplicatas[0].chave == ('12345678909', 123456, '2030-01-10')
+
+    def test_valor_invalido_compara_apenas_codigo(self, linha):
+        """Testa que valores não numéricos não interrompem a verificação"""
+        df = pd.DataFrame([linha('A1', valor='abc'), linha('A2', valor='abc')])
+        assert detectar_duplicatas(df, _formatar_valor) == []
+
+    def test_ja_emitidos(self, linha):
+        """Testa verificação cruzada com boletos já emitidos"""
+        emitido = {
+            'code': 'ANTIGO',
+            'customer': {'document': {'identity': '12345678909'}},
+            'services': [{'amount': 10050}],
+            'payment_terms': {'due_date': '2030-01-10'},
+        }
+        df = pd.DataFrame([linha('NOVO', valor=100.50, data_vencimento='2030-01-10'), linha('ANTIGO', valor=300)])
+        duplicatas = detectar_duplicatas(df, _formatar_valor, [emitido])
+        assert [d.linha for d in duplicatas] == [0, 1]
+        assert all(d.ja_emitido for d in duplicatas)
+
+    def test_vencimento_como_timestamp(self, linha):
+        """Testa célula de data do Excel (Timestamp) contra o due_date já emitido"""
+        emitido = {
+            'code': 'ANTIGO',
+            'customer': {'document': {'identity': '12345678909'}},
+            'services': [{'amount': 10050}],
+            'payment_terms': {'due_date': '2030-01-10'},
+        }
+        df = pd.DataFrame([
+            linha('NOVO', valor=100.50, data_vencimento=pd.Timestamp('2030-01-10')),
+            linha('SEM_DATA', valor=100.50, data_vencimento=float('nan')),
+        ])
+        duplicatas = detectar_duplicatas(df, _formatar_valor, [emitido])
+        assert len(duplicatas) == 1
+        assert duplicatas[0].linha == 0
+        assert duplicatas[0].chave == ('12345678909', 10050, '2030-01-10')
+
+
+class TestNormalizarVencimento:
+    """Testes para normalizar_vencimento"""
+
+    def test_formatos(self):
+        """Testa texto, texto com horário, Timestamp e valores vazios"""
+        assert normalizar_vencimento('2030-01-10') == '2030-01-10'
+        assert normalizar_vencimento(' 2030-01-10 00:00:00 ') == '2030-01-10'
+        assert normalizar_vencimento(pd.Timestamp('2030-01-10')) == '2030-01-10'
+        assert normalizar_vencimento(float('nan')) is None
+        assert normalizar_vencimento(pd.NaT) is None
+        assert normalizar_vencimento('10/01/2030') is None
+
+
+class TestIndiceDuplicatas:
+    """Testes para IndiceDuplicatas"""
+
+    def test_primeira_ocorrencia_registrada(self):
+        """Testa que a primeira ocorrência é mantida e as demais reportadas"""
+        indice = IndiceDuplicatas()
+        assert indice.verificar(0, 'A1', None) is None
+        assert indice.verificar(1, 'A1', None).linha_original == 0
+        assert indice.verificar(2, 'A1', None).linha_original == 0
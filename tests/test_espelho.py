@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Testes do espelho local dos boletos.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.consulta import ConsultaBoletos
+from libs.espelho import EspelhoBoletos, documento_do_boleto
+from libs.resumo import ResumoBoleto
+
+
+def _boleto(id_, documento='12345678909', status='OPEN', criado='2025-01-01', atualizado='2025-01-01T00:00:00', **extras):
+    return {
+        'id': id_,
+        'code': f'C{id_}',
+        'status': status,
+        'created_at': criado,
+        'updated_at': atualizado,
+        'customer': {'name': 'João', 'document': {'identity': documento, 'type': 'CPF'}},
+        'payment_terms': {'due_date': '2025-02-01'},
+        **extras
+    }
+
+
+class _ConsultaFalsa:
+    """Consulta que lista boletos fixos, aplicando o filtro start como a API"""
+
+    def __init__(self, boletos):
+        self.boletos = boletos
+        self.lidos = 0
+        self.filtros = None
+
+    def iterar_boletos(self, per_page=100, **filtros):
+        self.filtros = filtros
+        for boleto in self.boletos:
+            if 'start' in filtros and boleto['updated_at'][:10] < filtros['start']:
+                continue
+            self.lidos += 1
+            yield boleto
+
+
+@pytest.fixture
+def espelho(tmp_path):
+    return EspelhoBoletos(str(tmp_path / 'espelho.db'))
+
+
+class TestEspelhoBoletos:
+    """Testes para EspelhoBoletos"""
+
+    def test_documento_do_boleto(self):
+        """Testa a extração do CPF/CNPJ do cliente"""
+        assert documento_do_boleto(_boleto('1', documento='123.456.789-09')) == '12345678909'
+        assert documento_do_boleto({'customer': {'document': '12.345.678/0001-90'}}) == '12345678000190'
+        assert documento_do_boleto({'id': '1'}) is None
+
+    def test_consultas_por_indice(self, espelho):
+        """Testa buscas por documento, código e status"""
+        espelho.gravar([
+            _boleto('1', criado='2025-01-01'),
+            _boleto('2', criado='2025-03-01', status='PAID'),
+            _boleto('3', documento='98765432100'),
+        ])
+
+        assert [b['id'] for b in espelho.listar_por_documento('12345678909')] == ['2', '1']
+        assert [b['id'] for b in espelho.listar_por_documento('12345678909', limite=1, deslocamento=1)] == ['1']
+        assert espelho.contar_por_documento('12345678909') == 2
+        assert espelho.buscar_por_codigo('C3')['id'] == '3'
+        assert [b['id'] for b in espelho.listar_por_status('OPEN', vencimento_ate='2025-02-01')] == ['1', '3']
+        assert espelho.obter('inexistente') is None
+
+    def test_versao_antiga_nao_sobrescreve(self, espelho):
+        """Testa que atualizações fora de ordem não regridem o boleto"""
+        espelho.gravar([_boleto('1', status='PAID', atualizado='2025-01-02T00:00:00')])
+        espelho.gravar([_boleto('1', status='OPEN', atualizado='2025-01-01T00:00:00')])
+
+        assert espelho.obter('1')['status'] == 'PAID'
+
+    def test_sincronizacao_incremental_grava_apenas_alterados(self, espelho):
+        """Testa que a incremental filtra a listagem pela marca e grava só os boletos alterados"""
+        antigos = [_boleto(str(i), atualizado='2025-01-01T00:00:00') for i in range(50)]
+        assert espelho.sincronizar_completo(_ConsultaFalsa(antigos)) == 50
+
+        novo = _boleto('novo', atualizado='2025-02-01T00:00:00')
+        # A listagem não é ordenada por updated_at: um boleto antigo pago hoje
+        # pode vir depois de muitos sem alteração
+        alterado = _boleto('7', status='PAID', atualizado='2025-02-01T00:00:00')
+        # Mesmo dia da marca, mas não posterior a ela: vem da API e é ignorado
+        mesmo_dia = _boleto('8', status='PAID', atualizado='2025-01-01T00:00:00')
+        consulta = _ConsultaFalsa([novo] + antigos + [alterado, mesmo_dia])
+        assert espelho.sincronizar_incremental(consulta, per_page=10) == 2
+
+        assert consulta.filtros == {'start': '2025-01-01'}
+        assert espelho.obter('8')['status'] == 'OPEN'
+        assert espelho.obter('7')['status'] == 'PAID'
+        assert espelho.total() == 51
+        assert espelho.ultima_atualizacao() == '2025-02-01T00:00:00'
+
+        # Na próxima, os boletos anteriores ao dia da nova marca nem são listados
+        consulta = _ConsultaFalsa([novo] + antigos + [alterado])
+        assert espelho.sincronizar_incremental(consulta, per_page=10) == 0
+        assert consulta.filtros == {'start': '2025-02-01'}
+        assert consulta.lidos == 2
+
+    def test_marca_ignora_gravacoes_fora_da_sincronizacao(self, espelho):
+        """Testa que gravações de webhook/monitor não avançam a marca da incremental"""
+        espelho.sincronizar_completo(_ConsultaFalsa([_boleto('1', atualizado='2025-01-01T00:00:00')]))
+        espelho.gravar([_boleto('2', atualizado='2030-01-01T00:00:00')])
+
+        assert espelho.ultima_atualizacao() == '2025-01-01T00:00:00'
+
+
+class TestConsultaComEspelho:
+    """Testes da busca por CPF/CNPJ usando o espelho"""
+
+    def test_documento_no_espelho_nao_chama_api(self, espelho):
+        """Testa que documentos espelhados são respondidos localmente"""
+        espelho.gravar([_boleto('1'), _boleto('2', criado='2025-02-01')])
+        espelho._marcar('sincronizacao_incremental', time.time())
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth=None, espelho=espelho)
+
+        with patch.object(consulta.session, 'get') as mock_get:
+            resposta = consulta.listar_boletos_por_cpf('123.456.789-09', per_page=1)
+            boletos = list(consulta.iterar_boletos_por_cpf('12345678909'))
+
+        mock_get.assert_not_called()
+        assert resposta['totalItems'] == 2
+        assert [b['id'] for b in resposta['data']] == ['2']
+        assert [b['id'] for b in boletos] == ['2', '1']
+
+    def test_documento_ausente_usa_api(self, espelho, auth_falsa):
+        """Testa o fallback para a API quando o documento não está no espelho"""
+        from tests.test_consulta import _resposta
+
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, espelho=espelho)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'items': [{'id': 'x'}]})) as mock_get:
+            resposta = consulta.listar_boletos_por_cpf('98765432100')
+
+        mock_get.assert_called_once()
+        assert resposta['data'] == [{'id': 'x'}]
+
+    def test_espelho_desatualizado_usa_api(self, espelho, auth_falsa):
+        """Testa o fallback para a API quando a última sincronização é antiga"""
+        from tests.test_consulta import _resposta
+
+        espelho.gravar([_boleto('1')])
+        espelho._marcar('sincronizacao_completa', time.time() - 2 * espelho.idade_maxima)
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, espelho=espelho)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'items': [{'id': 'x'}]})) as mock_get:
+            resposta = consulta.listar_boletos_por_cpf('12345678909')
+            assert consulta.listar_boletos_por_cpf('98765432100')['data'] == [{'id': 'x'}]
+
+        assert mock_get.call_count == 2
+        assert resposta['data'] == [{'id': 'x'}]
+
+    def test_espelho_resumido_nao_responde_boletos_completos(self, tmp_path, auth_falsa):
+        """Testa que resumir=False não usa um espelho que guarda apenas resumos"""
+        from tests.test_consulta import _resposta
+
+        espelho = EspelhoBoletos(str(tmp_path / 'espelho.db'), resumido=True)
+        espelho.gravar([_boleto('1')])
+        espelho._marcar('sincronizacao_completa', time.time())
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, espelho=espelho)
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'items': [_boleto('1')]})) as mock_get:
+            assert consulta.listar_boletos_por_cpf('12345678909')['data'][0]['id'] == '1'
+            mock_get.assert_not_called()
+            assert consulta.listar_boletos_por_cpf('12345678909', resumir=False)['data'] == [_boleto('1')]
+
+        mock_get.assert_called_once()
+
+    def test_documento_fora_do_espelho_completo_nao_chama_api(self, espelho):
+        """Testa que, após a sincronização completa, documentos ausentes não chamam a API"""
+        espelho.gravar([_boleto('1')])
+        espelho._marcar('sincronizacao_completa', time.time())
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth=None, espelho=espelho)
+
+        with patch.object(consulta.session, 'get') as mock_get:
+            with pytest.raises(ValueError, match="Nenhum boleto"):
+                consulta.listar_boletos_por_cpf('98765432100')
+            with pytest.raises(ValueError, match="Nenhum boleto"):
+                list(consulta.iterar_boletos_por_cpf('98765432100'))
+
+        mock_get.assert_not_called()
+        assert espelho.pode_possuir_documento('12345678909')
+
+    def test_filtro_inclui_boletos_gravados_depois(self, espelho):
+        """Testa que boletos novos (webhook, sincronização) entram no filtro"""
+        espelho.gravar([_boleto('1')])
+        espelho._marcar('sincronizacao_completa', time.time())
+        assert not espelho.pode_possuir_documento('98765432100')
+
+        espelho.gravar([_boleto('2', documento='98765432100')])
+        assert espelho.pode_possuir_documento('98765432100')
+
+    def test_grava_resumo_ou_boleto_completo(self, tmp_path):
+        """Testa os dois formatos de gravação no mesmo arquivo"""
+        caminho = str(tmp_path / 'espelho.db')
+        EspelhoBoletos(caminho).gravar([_boleto('1', pix={'emv': 'x'})])
+        espelho = EspelhoBoletos(caminho, resumido=True)
+        espelho.gravar([_boleto('2')])
+
+        completo, resumo = espelho.obter('1'), espelho.obter('2')
+        assert completo['pix'] == {'emv': 'x'}
+        assert isinstance(resumo, ResumoBoleto)
+        assert resumo['customer']['document'] == '12345678909'
+        assert sorted(b['id'] for b in espelho.listar_por_documento('12345678909')) == ['1', '2']
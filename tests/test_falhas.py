@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Testes do arquivo de falhas (dead-letter) e do reprocessamento.
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+
+from libs.falhas import carregar_falhas
+from libs.gerador import ErroEmissao, GeradorBoletos
+
+
+def _enviar_falhando(codigos):
+    """Simula a API recusando os códigos informados com erro 503"""
+    def enviar(payload, idempotency_key=None):
+        if payload['code'] in codigos:
+            raise ErroEmissao("Serviço indisponível", status_code=503)
+        return {'id': f"inv_{payload['code']}"}
+    return enviar
+
+
+class TestArquivoFalhas:
+    """Testes para o arquivo de falhas de processar_arquivo"""
+
+    def test_falhas_gravadas_e_reprocessadas(self, tmp_path, linha, auth_falsa):
+        """Testa gravação das falhas e reenvio com as mesmas chaves de idempotência"""
+        caminho = str(tmp_path / 'falhas.jsonl')
+        gerador = GeradorBoletos("https://api.exemplo.com", auth_falsa)
+        df = pd.DataFrame([linha('OK'), linha('API'), linha('DOC', documento='123')])
+
+        with patch.object(GeradorBoletos, '_ler_arquivo', return_value=df), \
+                patch.object(GeradorBoletos, '_enviar_boleto', side_effect=_enviar_falhando({'API'})):
+            resultados = gerador.processar_arquivo('clientes.xlsx', arquivo_falhas=caminho)
+
+        assert resultados == {'sucessos': [1], 'erros': [2, 3]}
+        falha_api, falha_doc = carregar_falhas(caminho)
+        assert falha_api.linha == 2
+        assert falha_api.erro_classe == 'ErroEmissao'
+        assert falha_api.status_http == 503
+        assert falha_api.payload['code'] == 'API'
+        assert falha_doc.erro_classe == 'ValueError'
+        assert falha_doc.payload is None
+        assert falha_doc.dados['codigo'] == 'DOC'
+
+        with patch.object(GeradorBoletos, '_enviar_boleto', side_effect=_enviar_falhando(set())) as mock_enviar:
+            resultados = gerador.reprocessar_falhas(caminho)
+
+        # Apenas a linha que chegou à API é reenviada, com a chave original
+        mock_enviar.assert_called_once_with(falha_api.payload, falha_api.idempotency_key)
+        assert resultados == {'sucessos': [falha_api.idempotency_key], 'erros': [falha_doc.idempotency_key]}
+        assert [r.linha for r in carregar_falhas(caminho)] == [3]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes da fila durável de emissão (outbox).
+"""
+
+from concurrent.futures import Future
+
+from libs.fila import FilaEmissao, TrabalhadorFila
+from libs.gerador import ErroEmissao
+
+
+def _payload(codigo):
+    return {'code': codigo, 'customer': {'name': 'João'}}
+
+
+class _GeradorFalso:
+    """Gerador que registra os envios e falha para códigos configurados"""
+
+    def __init__(self, falhas=None):
+        self.falhas = falhas or {}
+        self.envios = []
+        self.auth = type('Auth', (), {'get_access_token': lambda self: 'token'})()
+
+    def _enviar(self, payload, classe, idempotency_key=None):
+        self.envios.append((payload['code'], classe, idempotency_key))
+        envio = Future()
+        if payload['code'] in self.falhas:
+            envio.set_exception(ErroEmissao("erro", status_code=self.falhas[payload['code']]))
+        else:
+            envio.set_result({'id': f"inv_{payload['code']}"})
+        return envio
+
+
+class TestFilaEmissao:
+    """Testes para FilaEmissao"""
+
+    def test_reserva_por_prioridade(self, tmp_path):
+        """Testa que itens interativos são reservados antes dos em lote"""
+        fila = FilaEmissao(str(tmp_path / 'fila.db'))
+        fila.enfileirar_varios([_payload('L1'), _payload('L2')])
+        chave = fila.enfileirar(_payload('I1'), classe='interativa', idempotency_key='chave-i1')
+
+        itens = fila.reservar('teste', limite=2)
+        assert chave == 'chave-i1'
+        assert [item.payload['code'] for item in itens] == ['I1', 'L1']
+        assert itens[0].idempotency_key == 'chave-i1'
+        assert fila.contagem() == {'pendente': 1, 'processando': 2}
+
+    def test_reserva_expirada_volta_para_fila(self, tmp_path):
+        """Testa que itens de um trabalhador que caiu são reservados de novo"""
+        fila = FilaEmissao(str(tmp_path / 'fila.db'), tempo_reserva=-1)
+        fila.enfileirar(_payload('L1'))
+        primeira = fila.reservar('a')
+        segunda = fila.reservar('b')
+        assert primeira[0].idempotency_key == segunda[0].idempotency_key
+        assert segunda[0].tentativas == 2
+
+    def test_chave_repetida_ignorada(self, tmp_path):
+        """Testa que reenfileirar a mesma chave de idempotência não duplica o item"""
+        fila = FilaEmissao(str(tmp_path / 'fila.db'))
+        fila.enfileirar(_payload('L1'), idempotency_key='k')
+        fila.enfileirar(_payload('L1'), idempotency_key='k')
+        assert fila.contagem() == {'pendente': 1}
+
+    def test_payloads_registrados(self, tmp_path):
+        """Testa que falhas definitivas não contam como emitidas"""
+        fila = FilaEmissao(str(tmp_path / 'fila.db'))
+        fila.enfileirar_varios([_payload('L1'), _payload('L2')])
+        item = fila.reservar('teste', limite=1)[0]
+        fila.falhar(item.id, "erro", status_http=400)
+        assert [p['code'] for p in fila.payloads_registrados()] == ['L2']
+
+
+class TestTrabalhadorFila:
+    """Testes para TrabalhadorFila"""
+
+    def test_drena_fila(self, tmp_path):
+        """Testa emissão com sucesso, falha definitiva e falha temporária"""
+        fila = FilaEmissao(str(tmp_path / 'fila.db'))
+        chaves = fila.enfileirar_varios([_payload('OK'), _payload('400'), _payload('503')])
+        gerador = _GeradorFalso(falhas={'400': 400, '503': 503})
+
+        trabalhador = TrabalhadorFila(fila, gerador, max_tentativas=2)
+        trabalhador.executar(ate_esvaziar=True)
+
+        assert fila.contagem() == {'concluido': 1, 'falha': 2}
+        # O item com erro 503 foi reenviado com a mesma chave de idempotência
+        envios_503 = [envio for envio in gerador.envios if envio[0] == '503']
+        assert envios_503 == [('503', 'lote', chaves[2])] * 2
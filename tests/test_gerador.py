@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from libs.gerador import GeradorBoletos, BoletoData
 from libs.auth import CoraAuth
 import json
+from unittest.mock import patch
 from datetime import datetime, timedelta
 
 class TestGeradorBoletos(unittest.TestCase):
@@ -290,5 +291,26 @@ class TestGeradorBoletos(unittest.TestCase):
         
         self.assertIn("Documento inválido", str(context.exception))
 
+    def test_processar_arquivo_remove_duplicatas(self):
+        """Testa que linhas duplicadas não são emitidas no modo 'remover'"""
+        dados = {
+            'codigo': '12345',
+            'nome': 'João da Silva',
+            'email': 'joao@email.com',
+            'documento': '123.456.789-09',  # CPF válido
+            'servico_nome': 'Consultoria',
+            'servico_descricao': 'Consultoria mensal',
+            'valor': 100.00,
+            'data_vencimento': self.data_vencimento
+        }
+        df = pd.DataFrame([dados, dados, {**dados, 'codigo': '67890', 'valor': 50.00}])
+
+        with patch.object(GeradorBoletos, '_ler_arquivo', return_value=df), \
+                patch.object(GeradorBoletos, '_enviar_boleto', return_value={}) as mock_gerar:
+            self.gerador.processar_arquivo('clientes.xlsx', duplicatas='remover')
+
+        codigos = [chamada.args[0]['code'] for chamada in mock_gerar.call_args_list]
+        self.assertEqual(codigos, ['12345', '67890'])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
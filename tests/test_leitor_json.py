@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura incremental das listagens.
+"""
+
+import json
+
+import pytest
+
+from libs.leitor_json import LeitorListagem
+
+
+def _blocos(dados, tamanho=7):
+    conteudo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+    return [conteudo[i:i + tamanho] for i in range(0, len(conteudo), tamanho)]
+
+
+class TestLeitorListagem:
+    """Testes para LeitorListagem"""
+
+    def test_itens_e_metadados_em_blocos(self):
+        """Testa a leitura com blocos que cortam chaves, números e caracteres UTF-8"""
+        dados = {
+            'totalItems': 12345,
+            'items': [{'id': str(i), 'customer': {'name': 'João Ção'}, 'amount': 1000 + i} for i in range(20)],
+            'page': 1,
+        }
+        leitor = LeitorListagem(_blocos(dados))
+
+        assert list(leitor.itens()) == dados['items']
+        assert leitor.chave_lista == 'items'
+        assert leitor.metadados == {'totalItems': 12345, 'page': 1}
+
+    def test_itens_sob_demanda(self):
+        """Testa que os boletos são entregues antes de o corpo inteiro ser lido"""
+        blocos = _blocos({'data': [{'id': str(i)} for i in range(100)]}, tamanho=16)
+        lidos = []
+
+        def partes():
+            for bloco in blocos:
+                lidos.append(bloco)
+                yield bloco
+
+        primeiro = next(LeitorListagem(partes()).itens())
+        assert primeiro == {'id': '0'}
+        assert len(lidos) < len(blocos)
+
+    def test_lista_na_raiz_e_vazia(self):
+        """Testa lista na raiz e lista vazia"""
+        leitor = LeitorListagem([b' [ {"id": "a"} , {"id": "b"} ] '])
+        assert [b['id'] for b in leitor.itens()] == ['a', 'b']
+        assert leitor.chave_lista == ''
+
+        leitor = LeitorListagem([b'{"data": [], "meta": {"total": 0}}'])
+        assert list(leitor.itens()) == []
+        assert leitor.metadados == {'meta': {'total': 0}}
+
+    def test_inicio_para_debug(self):
+        """Testa a prévia do início do corpo"""
+        leitor = LeitorListagem(_blocos({'data': [{'id': 'x' * 50}]}), tamanho_inicio=20)
+        list(leitor.itens())
+        assert leitor.inicio == '{"data": [{"id": "xx'
+
+    def test_json_invalido(self):
+        """Testa corpo truncado"""
+        with pytest.raises(ValueError):
+            list(LeitorListagem([b'{"data": [{"id": "a"}, {"id"']).itens())
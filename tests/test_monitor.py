@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Testes do monitoramento de pagamentos por consulta periódica.
+"""
+
+from datetime import date, timedelta
+
+from libs.cache import CacheBoletos
+from libs.espelho import EspelhoBoletos
+from libs.monitor import FAIXAS_INTERVALO, MonitorPagamentos, intervalo_verificacao
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def __call__(self):
+        return self.agora
+
+
+class _ConsultaFalsa:
+    """Consulta que responde status configurados e registra os lotes"""
+
+    def __init__(self, status=None):
+        self.status = status or {}
+        self.cache = CacheBoletos()
+        self.espelho = None
+        self.lotes = []
+
+    def obter_status_em_lote(self, ids, max_workers=8, usar_cache=True):
+        self.lotes.append(list(ids))
+        self.usar_cache = usar_cache
+        for invoice_id in ids:
+            status = self.status.get(invoice_id, 'OPEN')
+            if isinstance(status, Exception):
+                yield invoice_id, None, status
+            else:
+                yield invoice_id, status, None
+
+
+class TestIntervaloVerificacao:
+    """Testes para intervalo_verificacao"""
+
+    def test_frequente_perto_do_vencimento(self):
+        """Testa que o intervalo diminui perto do vencimento"""
+        hoje = date(2025, 6, 1)
+        distante = intervalo_verificacao(hoje + timedelta(days=60), hoje)
+        semana = intervalo_verificacao(hoje + timedelta(days=5), hoje)
+        vencimento = intervalo_verificacao(hoje, hoje)
+        atrasado = intervalo_verificacao(hoje - timedelta(days=3), hoje)
+
+        assert distante > semana > vencimento
+        assert vencimento < atrasado
+        assert vencimento == FAIXAS_INTERVALO[3][1]
+
+    def test_vencimento_invalido(self):
+        """Testa boletos sem vencimento conhecido"""
+        assert intervalo_verificacao('sem-data') == intervalo_verificacao(None) > 0
+
+
+class TestMonitorPagamentos:
+    """Testes para MonitorPagamentos"""
+
+    def test_verificacoes_vencidas_em_lote(self):
+        """Testa que só os boletos com verificação vencida são consultados, em lotes"""
+        relogio = _Relogio()
+        consulta = _ConsultaFalsa()
+        monitor = MonitorPagamentos(consulta, tamanho_lote=2, relogio=relogio)
+        for i in range(3):
+            monitor.adicionar(f'inv_{i}', proxima=relogio.agora)
+        monitor.adicionar('inv_futuro', proxima=relogio.agora + 3600)
+
+        assert monitor.executar_pendentes() == 3
+        assert consulta.lotes == [['inv_0', 'inv_1'], ['inv_2']]
+        assert monitor.executar_pendentes() == 0
+        assert monitor.total() == 4
+
+    def test_pagamento_encerra_monitoramento(self):
+        """Testa a notificação de mudança e a remoção de boletos pagos"""
+        relogio = _Relogio()
+        mudancas = []
+        consulta = _ConsultaFalsa({'inv_1': 'PAID'})
+        monitor = MonitorPagamentos(consulta, ao_mudar=lambda *m: mudancas.append(m), relogio=relogio)
+        monitor.adicionar('inv_1', date.today(), status='OPEN', proxima=relogio.agora)
+        monitor.adicionar('inv_2', date.today(), status='OPEN', proxima=relogio.agora)
+
+        monitor.executar_pendentes()
+
+        assert mudancas == [('inv_1', 'OPEN', 'PAID')]
+        assert 'inv_1' not in monitor
+        assert 'inv_2' in monitor
+        # Boletos ainda em aberto voltam ao heap conforme o vencimento
+        assert monitor.proxima_verificacao() == relogio.agora + intervalo_verificacao(date.today())
+
+    def test_mudanca_grava_apenas_status_no_espelho(self, tmp_path):
+        """Testa que o monitor não inventa updated_at nem avança a marca da sincronização"""
+        relogio = _Relogio()
+        consulta = _ConsultaFalsa({'inv_1': 'PAID'})
+        consulta.espelho = EspelhoBoletos(str(tmp_path / 'espelho.db'))
+        consulta.espelho.gravar([{'id': 'inv_1', 'status': 'OPEN', 'updated_at': '2025-01-01T00:00:00'}])
+        monitor = MonitorPagamentos(consulta, relogio=relogio)
+        monitor.adicionar('inv_1', date.today(), status='OPEN', proxima=relogio.agora)
+
+        monitor.executar_pendentes()
+
+        boleto = consulta.espelho.obter('inv_1')
+        assert boleto['status'] == 'PAID'
+        assert boleto['updated_at'] == '2025-01-01T00:00:00'
+        assert consulta.espelho.ultima_atualizacao() is None
+
+    def test_erro_reagenda_mais_cedo(self):
+        """Testa que falhas de consulta são tentadas de novo em pouco tempo"""
+        relogio = _Relogio()
+        consulta = _ConsultaFalsa({'inv_1': ConnectionError('falha')})
+        monitor = MonitorPagamentos(consulta, relogio=relogio)
+        monitor.adicionar('inv_1', date.today() + timedelta(days=90), proxima=relogio.agora)
+
+        monitor.executar_pendentes()
+
+        assert monitor.estatisticas()['erros'] == 1
+        assert monitor.proxima_verificacao() - relogio.agora <= 15 * 60
+
+    def test_erro_mantem_cache(self):
+        """Testa que a verificação ignora o cache sem apagá-lo, mesmo com a API fora"""
+        relogio = _Relogio()
+        consulta = _ConsultaFalsa({'inv_1': ConnectionError('falha')})
+        consulta.cache.armazenar('inv_1', {'id': 'inv_1', 'status': 'OPEN'}, status='OPEN')
+        monitor = MonitorPagamentos(consulta, relogio=relogio)
+        monitor.adicionar('inv_1', date.today() + timedelta(days=90), proxima=relogio.agora)
+
+        monitor.executar_pendentes()
+
+        assert consulta.usar_cache is False
+        assert consulta.cache.obter('inv_1') == {'id': 'inv_1', 'status': 'OPEN'}
+
+    def test_carregar_ignora_pagos_e_repetidos(self):
+        """Testa a carga de boletos em aberto de uma listagem"""
+        monitor = MonitorPagamentos(_ConsultaFalsa())
+        boletos = [
+            {'id': 'a', 'status': 'OPEN', 'payment_terms': {'due_date': '2030-01-01'}},
+            {'id': 'b', 'status': 'PAID'},
+        ]
+
+        assert monitor.carregar_boletos(boletos) == 1
+        assert monitor.carregar_boletos(boletos) == 0
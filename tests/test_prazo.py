@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Testes dos tempos limite e do prazo das chamadas à API.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.agendador import AgendadorEmissoes
+from libs.coalescencia import ChamadasUnicas
+from libs.consulta import ConsultaBoletos
+from libs.prazo import PrazoEsgotado, TemposLimite, com_prazo, restante, verificar
+from tests.test_consulta import _resposta
+
+
+class TestPrazo:
+    """Testes do prazo e de TemposLimite"""
+
+    def test_sem_prazo(self):
+        """Testa que, sem prazo, valem os tempos configurados"""
+        assert restante() is None
+        verificar()
+        assert TemposLimite(conexao=3, leitura=10).para_requisicao() == (3, 10)
+
+    def test_prazo_reduz_tempos(self):
+        """Testa que os tempos são limitados ao que resta do prazo"""
+        with com_prazo(2.0):
+            conexao, leitura = TemposLimite(conexao=5, leitura=30).para_requisicao()
+        assert 0 < conexao <= 2.0
+        assert 0 < leitura <= 2.0
+        assert restante() is None
+
+    def test_prazo_interno_nao_estende_externo(self):
+        """Testa que vale o prazo que terminar primeiro"""
+        with com_prazo(1.0):
+            with com_prazo(60.0):
+                assert restante() <= 1.0
+            with com_prazo(0.5):
+                assert restante() <= 0.5
+
+    def test_prazo_esgotado(self):
+        """Testa que a operação é abandonada após o prazo"""
+        with com_prazo(0.0):
+            with pytest.raises(PrazoEsgotado):
+                TemposLimite().para_requisicao('consultar o boleto')
+
+    def test_de_config(self):
+        """Testa a leitura da seção tempos_limite"""
+        assert TemposLimite.de_config(None) is None
+        assert TemposLimite.de_config({'requisicao': 20}) is None
+        assert TemposLimite.de_config({'leitura': 10}) == TemposLimite(conexao=5.0, leitura=10)
+
+
+class TestPropagacaoDoPrazo:
+    """Testes do prazo nos componentes que chamam a API"""
+
+    def test_agendador_abandona_tarefa_fora_do_prazo(self):
+        """Testa que tarefas que saem da fila após o prazo não são executadas"""
+        liberar = threading.Event()
+        executadas = []
+
+        with AgendadorEmissoes(max_workers=1) as agendador:
+            bloqueio = agendador.submeter(liberar.wait, 5, classe='lote')
+            with com_prazo(0.05):
+                atrasada = agendador.submeter(executadas.append, 'atrasada', classe='lote')
+            time.sleep(0.1)
+            liberar.set()
+            bloqueio.result(timeout=5)
+            with pytest.raises(PrazoEsgotado):
+                atrasada.result(timeout=5)
+
+        assert executadas == []
+
+    def test_coalescida_desiste_no_prazo(self):
+        """Testa que quem aguarda a chamada de outra thread desiste no prazo"""
+        chamadas = ChamadasUnicas()
+        liberar = threading.Event()
+        lider = threading.Thread(target=chamadas.executar, args=('inv_1', liberar.wait, 5))
+        lider.start()
+        while chamadas.estatisticas()['em_andamento'] == 0:
+            time.sleep(0.001)
+
+        try:
+            with com_prazo(0.05):
+                with pytest.raises(PrazoEsgotado):
+                    chamadas.executar('inv_1', lambda: 'nunca')
+        finally:
+            liberar.set()
+            lider.join(5)
+
+    def test_consulta_usa_tempos_do_prazo(self, auth_falsa):
+        """Testa que a consulta por ID passa os tempos limitados pelo prazo"""
+        consulta = ConsultaBoletos(
+            "https://matls-clients.api.cora.com.br", auth_falsa, tempos_limite=TemposLimite(conexao=2, leitura=8)
+        )
+        with patch.object(consulta.session, 'get', return_value=_resposta(json_data={'id': 'inv_1'})) as mock_get:
+            consulta.consultar_boleto_por_id('inv_1')
+            assert mock_get.call_args.kwargs['timeout'] == (2, 8)
+
+            with com_prazo(1.0):
+                consulta.consultar_boleto_por_id('inv_2')
+            assert all(0 < t <= 1.0 for t in mock_get.call_args.kwargs['timeout'])
+
+            with com_prazo(0.0):
+                with pytest.raises(PrazoEsgotado):
+                    consulta.consultar_boleto_por_id('inv_3')
+
+        assert mock_get.call_count == 2
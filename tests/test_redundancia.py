@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Testes das requisições redundantes (hedged requests).
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.consulta import ConsultaBoletos
+from libs.redundancia import RequisicoesRedundantes
+from tests.test_consulta import _resposta
+
+
+class TestRequisicoesRedundantes:
+    """Testes para RequisicoesRedundantes"""
+
+    def test_resposta_rapida_sem_copia(self):
+        """Testa que respostas dentro do atraso não disparam cópia"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=5.0)
+        chamadas = []
+
+        def buscar(invoice_id):
+            chamadas.append(invoice_id)
+            return {'id': invoice_id}
+
+        assert redundancia.executar(buscar, 'inv_1') == {'id': 'inv_1'}
+        assert chamadas == ['inv_1']
+        assert redundancia.estatisticas()['redundantes'] == 0
+
+    def test_copia_vence_requisicao_lenta(self):
+        """Testa que a cópia é disparada após o atraso e sua resposta é usada"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=0.01)
+        liberar = threading.Event()
+        chamadas = []
+
+        def buscar():
+            chamadas.append(1)
+            if len(chamadas) == 1:
+                liberar.wait(5)
+                return 'lenta'
+            return 'copia'
+
+        try:
+            assert redundancia.executar(buscar) == 'copia'
+        finally:
+            liberar.set()
+        estatisticas = redundancia.estatisticas()
+        assert estatisticas['redundantes'] == 1
+        assert estatisticas['vencidas_pela_copia'] == 1
+
+    def test_copia_responde_antes_da_original_lenta_com_sucesso(self):
+        """Testa que a cópia vence uma original que passa do atraso mas termina com sucesso"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=0.01)
+        chamadas = []
+
+        def buscar():
+            chamadas.append(1)
+            if len(chamadas) == 1:
+                time.sleep(0.3)
+                return 'original'
+            return 'copia'
+
+        inicio = time.monotonic()
+        assert redundancia.executar(buscar) == 'copia'
+        assert time.monotonic() - inicio < 0.3
+        assert redundancia.estatisticas()['vencidas_pela_copia'] == 1
+
+    def test_taxa_maxima_limita_copias(self):
+        """Testa que nenhuma cópia é disparada além da taxa máxima"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=0.5, atraso_inicial=0.001)
+        liberar = threading.Event()
+        chamadas = []
+
+        def buscar():
+            chamadas.append(1)
+            liberar.wait(0.05)
+            return 'ok'
+
+        try:
+            for _ in range(4):
+                assert redundancia.executar(buscar) == 'ok'
+        finally:
+            liberar.set()
+        estatisticas = redundancia.estatisticas()
+        assert estatisticas['redundantes'] == 2
+        assert estatisticas['descartadas_por_taxa'] == 2
+
+    def test_erro_da_original_aguarda_copia(self):
+        """Testa que a falha de uma das requisições não descarta a outra"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=0.01)
+        liberar = threading.Event()
+        chamadas = []
+
+        def buscar():
+            chamadas.append(1)
+            if len(chamadas) == 1:
+                liberar.wait(5)
+                raise ConnectionError("conexão perdida")
+            liberar.set()
+            return 'copia'
+
+        assert redundancia.executar(buscar) == 'copia'
+
+    def test_erro_das_duas_requisicoes(self):
+        """Testa que o erro é levantado quando nenhuma requisição tem sucesso"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=0.01)
+        liberar = threading.Event()
+
+        def buscar():
+            liberar.wait(0.05)
+            raise ValueError("Boleto não encontrado")
+
+        with pytest.raises(ValueError):
+            redundancia.executar(buscar)
+
+    def test_atraso_pelo_percentil(self):
+        """Testa que o atraso acompanha o percentil das latências observadas"""
+        redundancia = RequisicoesRedundantes(percentil=0.95, atraso_minimo=0.0, amostras_minimas=20)
+        assert redundancia.atraso() == 1.0
+        for i in range(1, 101):
+            redundancia._registrar(i / 100)
+        assert redundancia.atraso() == pytest.approx(0.95)
+
+    def test_parametros_invalidos(self):
+        """Testa a validação do percentil e da taxa"""
+        with pytest.raises(ValueError):
+            RequisicoesRedundantes(percentil=0)
+        with pytest.raises(ValueError):
+            RequisicoesRedundantes(taxa_maxima=1.5)
+
+
+class TestConsultaRedundante:
+    """Testes da consulta por ID com requisição redundante"""
+
+    def test_consulta_por_id_usa_redundancia(self, auth_falsa):
+        """Testa que a consulta por ID passa pela política de redundância"""
+        redundancia = RequisicoesRedundantes(taxa_maxima=1.0, atraso_inicial=5.0)
+        consulta = ConsultaBoletos("https://matls-clients.api.cora.com.br", auth_falsa, redundancia=redundancia)
+        resposta = _resposta(json_data={'id': 'inv_1', 'status': 'OPEN'})
+
+        with patch.object(consulta.session, 'get', return_value=resposta) as mock_get:
+            boleto = consulta.consultar_boleto_por_id('inv_1')
+
+        assert boleto['status'] == 'OPEN'
+        mock_get.assert_called_once()
+        assert redundancia.estatisticas()['consultas'] == 1
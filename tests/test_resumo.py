@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Testes do resumo compacto dos boletos.
+"""
+
+import json
+import sys
+
+from libs.resumo import ResumoBoleto
+
+
+def _boleto():
+    return {
+        'id': 'inv_1',
+        'code': 'A1',
+        'status': 'OPEN',
+        'total_amount': 12345,
+        'payment_terms': {'due_date': '2025-02-01', 'fine': {'amount': 200}},
+        'customer': {'name': 'João', 'email': 'j@x.com', 'document': {'identity': '123.456.789-09', 'type': 'CPF'}},
+        'services': [{'name': 'Mensalidade', 'amount': 12345}, {}],
+        'payment_options': {'bank_slip': {'digitable': '1' * 47, 'barcode': '2' * 44, 'url': 'https://pdf'}},
+        'pix': {'emv': 'x' * 200},
+        'created_at': '2025-01-01T10:00:00',
+        'updated_at': '2025-01-02T10:00:00',
+    }
+
+
+class TestResumoBoleto:
+    """Testes para ResumoBoleto"""
+
+    def test_leitura_como_boleto_da_api(self):
+        """Testa as chaves da API montadas a partir do resumo"""
+        resumo = ResumoBoleto.de_boleto(_boleto())
+
+        assert resumo['id'] == 'inv_1'
+        assert resumo.get('amount') == 12345
+        assert resumo.get('due_date') == '2025-02-01'
+        assert resumo['payment_terms'] == {'due_date': '2025-02-01'}
+        assert resumo['customer'] == {'name': 'João', 'document': '12345678909'}
+        assert resumo['services'] == [{'description': 'Mensalidade'}]
+        assert resumo.get('occurrence_date') is None
+        assert 'pix' not in resumo
+        assert {**resumo, 'status': 'PAID'}['status'] == 'PAID'
+
+    def test_forma_compacta(self):
+        """Testa a ida e volta pela lista JSON e a ausência de __dict__"""
+        resumo = ResumoBoleto.de_boleto(_boleto())
+        copia = ResumoBoleto.de_lista(json.loads(json.dumps(resumo.para_lista())))
+
+        assert dict(copia) == dict(resumo)
+        assert not hasattr(resumo, '__dict__')
+        assert ResumoBoleto.de_boleto(resumo) is resumo
+        assert sys.getsizeof(json.dumps(resumo.para_lista())) * 2 < sys.getsizeof(json.dumps(_boleto()))
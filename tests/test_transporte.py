@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes do transporte HTTP (HTTP/1.1 e HTTP/2 opcional).
+"""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from libs import transporte
+from libs.transporte import criar_sessao, http2_disponivel
+
+
+class TestCriarSessao:
+    """Testes para criar_sessao"""
+
+    def test_http11_por_padrao(self):
+        """Testa que a sessão padrão é um requests.Session com pool"""
+        sessao = criar_sessao(pool_maxsize=7)
+        assert isinstance(sessao, requests.Session)
+        assert sessao.get_adapter('https://x')._pool_maxsize == 7
+
+    def test_http2_sem_httpx_usa_http11(self, caplog):
+        """Testa o retorno a HTTP/1.1 quando httpx[http2] não está instalado"""
+        with patch.object(transporte, 'httpx', None), caplog.at_level(logging.WARNING):
+            sessao = criar_sessao(http2=True)
+        assert isinstance(sessao, requests.Session)
+        assert 'HTTP/1.1' in caplog.text
+
+
+@pytest.mark.skipif(not http2_disponivel(), reason="httpx[http2] não instalado")
+class TestSessaoHttp2:
+    """Testes para SessaoHttp2 (com httpx[http2] instalado)"""
+
+    def _sessao(self, tratar):
+        import httpx
+        sessao = criar_sessao(http2=True)
+        sessao._novo_cliente = lambda cert, verify: httpx.Client(transport=httpx.MockTransport(tratar))
+        return sessao
+
+    def test_resposta_com_interface_do_requests(self):
+        """Testa status, corpo, JSON e leitura em blocos"""
+        import httpx
+        sessao = self._sessao(lambda requisicao: httpx.Response(200, json={'data': [1, 2]}))
+
+        resposta = sessao.get('https://api/v2/invoices', params={'page': 1}, cert=('c', 'k'), timeout=(2, 8))
+        assert resposta.status_code == 200
+        assert resposta.json() == {'data': [1, 2]}
+
+        resposta = sessao.get('https://api/v2/invoices', timeout=(2, 8), stream=True)
+        assert b''.join(resposta.iter_content(chunk_size=4)) == b'{"data":[1,2]}'
+
+    def test_erros_convertidos_para_requests(self):
+        """Testa que timeouts e erros de conexão viram exceções do requests"""
+        import httpx
+
+        def tratar(requisicao):
+            raise httpx.ReadTimeout("lento", request=requisicao)
+
+        with pytest.raises(requests.exceptions.Timeout):
+            self._sessao(tratar).get('https://api/v2/invoices/inv_1', timeout=1)
+
+        resposta = self._sessao(lambda requisicao: httpx.Response(404)).get('https://api/v2/invoices/x')
+        with pytest.raises(requests.exceptions.HTTPError):
+            resposta.raise_for_status()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Testes da validação de arquivos sem acesso à API (dry-run).
+"""
+
+import pandas as pd
+
+from libs.gerador import GeradorBoletos
+from libs.validacao import validar_dataframe
+
+
+class TestValidarDataframe:
+    """Testes para validar_dataframe"""
+
+    def test_arquivo_valido(self, linha):
+        """Testa arquivo sem erros"""
+        df = pd.DataFrame([linha(), linha(documento='11.222.333/0001-81', valor=10)])
+        relatorio = validar_dataframe(df)
+        assert relatorio.valido
+        assert relatorio.total_linhas == 2
+
+    def test_erros_agregados_por_tipo(self, linha):
+        """Testa contagem de erros por tipo e índices das linhas"""
+        df = pd.DataFrame([
+            linha(),
+            linha(documento='123.456.789-10'),
+            linha(documento='11.222.333/0001-82', email='invalido'),
+            linha(cep='123'),
+            linha(documento='123', valor='0,00'),
+        ])
+        relatorio = validar_dataframe(df)
+        assert relatorio.erros == {
+            'cpf_invalido': [1],
+            'cnpj_invalido': [2],
+            'email_invalido': [2],
+            'cep_invalido': [3],
+            'documento_tamanho': [4],
+            'valor_invalido': [4],
+        }
+        assert relatorio.contagem_erros()['cpf_invalido'] == 1
+        assert relatorio.linhas_invalidas == [1, 2, 3, 4]
+
+    def test_documentos_repetidos(self, linha):
+        """Testa CPF/CNPJ com todos os dígitos iguais"""
+        df = pd.DataFrame([linha(documento='111.111.111-11'), linha(documento='00000000000000')])
+        relatorio = validar_dataframe(df)
+        assert relatorio.erros == {'cpf_invalido': [0], 'cnpj_invalido': [1]}
+
+    def test_juros_e_multa(self, linha):
+        """Testa juros fora do intervalo e multa negativa"""
+        df = pd.DataFrame([
+            linha(juros_mensal=2.5, multa='10,00'),
+            linha(juros_mensal=150, multa='-1'),
+        ])
+        relatorio = validar_dataframe(df)
+        assert relatorio.erros == {'juros_invalido': [1], 'multa_invalida': [1]}
+
+    def test_coluna_ausente(self, linha):
+        """Testa arquivo sem coluna obrigatória"""
+        df = pd.DataFrame([linha()]).drop(columns=['email'])
+        relatorio = validar_dataframe(df)
+        assert relatorio.erros == {'coluna_ausente:email': [0]}
+
+    def test_avisos_data_vencimento(self, linha):
+        """Testa que datas ajustadas na emissão são avisos, não erros"""
+        df = pd.DataFrame([linha(data_vencimento='10/01/2030'), linha(data_vencimento='2000-01-01')])
+        relatorio = validar_dataframe(df)
+        assert relatorio.valido
+        assert relatorio.avisos == {
+            'data_vencimento_invalida': [0],
+            'data_vencimento_passada': [1],
+        }
+
+    def test_consistente_com_gerar_payload(self, linha, auth_falsa):
+        """Testa que as linhas inválidas são as mesmas rejeitadas por _gerar_payload"""
+        df = pd.DataFrame([
+            linha(),
+            linha(documento='123.456.789-10'),
+            linha(email='sem-arroba'),
+            linha(cep='1234-56'),
+            linha(nome='   '),
+            linha(valor='-5'),
+            linha(estado=''),
+            linha(documento='11.222.333/0001-81', multa='R$ 2,00', juros_mensal=3),
+        ])
+
+        gerador = GeradorBoletos("https://api.exemplo.com", auth_falsa)
+        rejeitadas = []
+        for indice, row in df.iterrows():
+            try:
+                gerador._gerar_payload(row)
+            except ValueError:
+                rejeitadas.append(indice)
+
+        assert validar_dataframe(df).linhas_invalidas == rejeitadas
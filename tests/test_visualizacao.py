@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Testes dos dados de exibição dos boletos.
+"""
+
+from unittest.mock import patch
+
+from libs.cache import BoletoBruto
+from libs.visualizacao import CacheVisualizacoes, formatar_valor, montar_item_listagem, montar_visualizacao
+
+
+def _boleto(status='OPEN', atualizado='2025-01-02T00:00:00'):
+    return {
+        'id': 'inv_1',
+        'code': 'A1',
+        'status': status,
+        'amount': 123456,
+        'services': [{'description': 'Mensalidade'}, {'name': 'Taxa'}, {}],
+        'payment_terms': {'due_date': '2025-02-01'},
+        'payment_options': {'bank_slip': {'digitable': '123', 'url': 'https://pdf', 'barcode': '456'}},
+        'pix': {'emv': 'emv'},
+        'customer': {'name': 'João'},
+        'occurrence_date': '2025-01-30',
+        'created_at': '2025-01-01',
+        'updated_at': atualizado,
+    }
+
+
+class TestMontagem:
+    """Testes da montagem dos dados de exibição"""
+
+    def test_formatar_valor(self):
+        """Testa o formato brasileiro"""
+        assert formatar_valor(123456) == "R$ 1.234,56"
+        assert formatar_valor(5) == "R$ 0,05"
+
+    def test_visualizacao(self):
+        """Testa os campos da página do boleto"""
+        dados = montar_visualizacao(_boleto())
+        assert dados['valor_formatado'] == "R$ 1.234,56"
+        assert dados['descricao'] == "Mensalidade | Taxa"
+        assert dados['due_date'] == '2025-02-01'
+        assert dados['linha_digitavel'] == '123'
+        assert dados['pix_emv'] == 'emv'
+        assert not dados['esta_pago']
+        assert dados['data_pagamento'] is None
+
+        pago = montar_visualizacao(_boleto(status='PAID'))
+        assert pago['esta_pago']
+        assert pago['data_pagamento'] == '2025-01-30'
+
+    def test_item_listagem(self):
+        """Testa os campos da busca por CPF/CNPJ"""
+        dados = montar_item_listagem(_boleto())
+        assert dados['nome_cliente'] == 'João'
+        assert dados['due_date'] == '2025-02-01'
+        assert dados['descricao'] == "Mensalidade | Taxa"
+
+
+class TestCacheVisualizacoes:
+    """Testes para CacheVisualizacoes"""
+
+    def test_reaproveita_por_versao(self):
+        """Testa que a montagem acontece uma vez por versão do boleto"""
+        cache = CacheVisualizacoes()
+        with patch('libs.visualizacao.montar_visualizacao', side_effect=montar_visualizacao) as montar:
+            cache.visualizacao(BoletoBruto.de_dados(_boleto()))
+            cache.visualizacao(BoletoBruto.de_dados(_boleto()))
+            assert montar.call_count == 1
+
+            cache.visualizacao(BoletoBruto.de_dados(_boleto(status='PAID', atualizado='2025-01-30T10:00:00')))
+            assert montar.call_count == 2
+
+        assert cache.estatisticas() == {'acertos': 1, 'falhas': 2, 'tamanho': 2}
+
+    def test_ultima_atualizacao_por_exibicao(self):
+        """Testa que a data de dados desatualizados não fica no cache"""
+        cache = CacheVisualizacoes()
+        desatualizado = cache.visualizacao(BoletoBruto.de_dados({**_boleto(), 'ultima_atualizacao': '2025-01-03T00:00:00'}))
+        atual = cache.visualizacao(BoletoBruto.de_dados(_boleto()))
+
+        assert desatualizado['ultima_atualizacao'] == '2025-01-03T00:00:00'
+        assert atual['ultima_atualizacao'] is None
+
+    def test_sem_updated_at_nao_guarda(self):
+        """Testa que boletos sem updated_at são sempre montados"""
+        cache = CacheVisualizacoes(tamanho_maximo=1)
+        cache.item_listagem({'id': 'a', 'status': 'OPEN'})
+        cache.item_listagem({**_boleto(), 'id': 'b'})
+        cache.item_listagem({**_boleto(), 'id': 'c'})
+
+        assert cache.estatisticas()['tamanho'] == 1
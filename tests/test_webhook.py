@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Testes do recebimento de webhooks de boletos.
+"""
+
+import json
+
+import pytest
+
+from libs.cache import CacheBoletos
+from libs.consulta import ConsultaBoletos
+from libs.espelho import EspelhoBoletos
+from libs.webhook import ErroWebhook, ProcessadorWebhook, interpretar_evento, verificar_token
+
+
+def _consulta(cache=None, espelho=None):
+    return ConsultaBoletos("https://matls-clients.api.cora.com.br", auth=None, cache=cache, espelho=espelho)
+
+
+def _boleto_completo(status='PAID'):
+    return {
+        'id': 'inv_1',
+        'status': status,
+        'customer': {'name': 'João', 'document': {'identity': '12345678909', 'type': 'CPF'}},
+        'services': [{'name': 'Consultoria', 'amount': 10000}],
+        'payment_terms': {'due_date': '2025-02-01'},
+        'payment_options': {'bank_slip': {'digitable': '123'}},
+    }
+
+
+def _headers(tipo='invoice.paid', invoice_id='inv_1', evento_id='evt_1'):
+    return {'webhook-event-id': evento_id, 'webhook-event-type': tipo, 'webhook-resource-id': invoice_id}
+
+
+class TestInterpretarEvento:
+    """Testes para interpretar_evento"""
+
+    def test_evento_por_headers(self):
+        """Testa eventos da Cora com corpo vazio"""
+        evento = interpretar_evento(_headers(), b'')
+
+        assert evento.id == 'evt_1'
+        assert evento.invoice_id == 'inv_1'
+        assert evento.status == 'PAID'
+        assert evento.boleto is None
+
+    def test_evento_com_boleto_no_corpo(self):
+        """Testa eventos que trazem o boleto completo"""
+        corpo = json.dumps({'id': 'evt_2', 'type': 'invoice.paid', 'data': {'id': 'inv_1', 'status': 'PAID', 'amount': 100}})
+        evento = interpretar_evento({}, corpo.encode())
+
+        assert evento.id == 'evt_2'
+        assert evento.boleto == {'id': 'inv_1', 'status': 'PAID', 'amount': 100}
+
+    @pytest.mark.parametrize('headers,corpo', [
+        ({}, b'nao-json'),
+        ({}, b'[]'),
+        ({'webhook-resource-id': 'inv_1'}, b''),
+        ({'webhook-event-type': 'invoice.paid'}, b''),
+    ])
+    def test_eventos_invalidos(self, headers, corpo):
+        """Testa corpos e headers inválidos"""
+        with pytest.raises(ErroWebhook):
+            interpretar_evento(headers, corpo)
+
+    def test_verificar_token(self):
+        """Testa a comparação do token compartilhado"""
+        assert verificar_token('segredo', 'segredo')
+        assert not verificar_token('outro', 'segredo')
+        assert not verificar_token(None, 'segredo')
+
+
+class TestProcessadorWebhook:
+    """Testes para ProcessadorWebhook"""
+
+    def test_pagamento_atualiza_cache_e_espelho(self, tmp_path):
+        """Testa que o pagamento aparece sem nova consulta à API"""
+        cache = CacheBoletos(ttl_pendente=3600)
+        cache.armazenar('inv_1', {'id': 'inv_1', 'status': 'OPEN'}, status='OPEN')
+        espelho = EspelhoBoletos(str(tmp_path / 'espelho.db'))
+        espelho.gravar([{'id': 'inv_1', 'status': 'OPEN', 'updated_at': '2025-01-01T00:00:00'}])
+        processador = ProcessadorWebhook(_consulta(cache, espelho), token='segredo')
+
+        assert processador.processar(interpretar_evento(_headers(), b''))
+
+        # Sem o boleto no corpo, o cache é invalidado e o espelho recebe o novo status
+        assert cache.obter('inv_1') is None
+        assert espelho.obter('inv_1')['status'] == 'PAID'
+        # O updated_at da Cora é mantido e a marca da sincronização não avança
+        assert espelho.obter('inv_1')['updated_at'] == '2025-01-01T00:00:00'
+        assert espelho.ultima_atualizacao() is None
+
+    def test_boleto_no_corpo_vai_para_o_cache(self):
+        """Testa que o boleto completo substitui a entrada do cache"""
+        cache = CacheBoletos()
+        processador = ProcessadorWebhook(_consulta(cache), token='segredo')
+        corpo = json.dumps({'type': 'invoice.paid', 'data': _boleto_completo()}).encode()
+
+        processador.processar(interpretar_evento({}, corpo))
+
+        assert cache.obter('inv_1').dados() == _boleto_completo()
+
+    def test_dados_parciais_invalidam_o_cache(self):
+        """Testa que um evento com dados parciais não substitui o boleto completo"""
+        cache = CacheBoletos()
+        cache.armazenar('inv_1', _boleto_completo('OPEN'), status='OPEN')
+        processador = ProcessadorWebhook(_consulta(cache), token='segredo')
+        corpo = json.dumps({'type': 'invoice.paid', 'data': {'id': 'inv_1', 'status': 'PAID'}}).encode()
+
+        evento = interpretar_evento({}, corpo)
+        processador.processar(evento)
+
+        assert not evento.completo
+        assert cache.obter('inv_1') is None
+
+    def test_listagens_do_cliente_invalidadas(self):
+        """Testa que as listagens em cache do CPF/CNPJ do boleto são removidas"""
+        cache = CacheBoletos()
+        cache.armazenar('inv_1', _boleto_completo('OPEN'), status='OPEN')
+        for chave in ('listagem:12345678909:page=1&perPage=50', 'listagem-completa:12345678909:page=1&perPage=50',
+                      'listagem:98765432100:page=1&perPage=50'):
+            cache.armazenar(chave, {'data': []})
+        processador = ProcessadorWebhook(_consulta(cache), token='segredo')
+
+        processador.processar(interpretar_evento(_headers(), b''))
+
+        assert 'listagem:12345678909:page=1&perPage=50' not in cache
+        assert 'listagem-completa:12345678909:page=1&perPage=50' not in cache
+        assert 'listagem:98765432100:page=1&perPage=50' in cache
+
+    def test_evento_repetido_ignorado(self):
+        """Testa que reenvios do mesmo evento não são reprocessados"""
+        processador = ProcessadorWebhook(_consulta(CacheBoletos()), token='segredo')
+
+        assert processador.processar(interpretar_evento(_headers(), b''))
+        assert not processador.processar(interpretar_evento(_headers(), b''))
+
+    def test_token_obrigatorio(self):
+        """Testa que o processador exige token"""
+        with pytest.raises(ValueError):
+            ProcessadorWebhook(_consulta(), token='')